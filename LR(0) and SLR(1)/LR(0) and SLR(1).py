@@ -1,24 +1,53 @@
+import argparse
+import hashlib
+import os
 import sys
+import time
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import lrcodegen
+import lrtable
+from lrtable import ParseResult, ParseTable, deepSizeof
+from lrstats import Stats, instrumented
 
 # LR0项目结构
-class Item:
-    def __init__(self, p, d):
-        self.production = p  # 产生式的编号
-        self.dot_pos = d        # 点的位置
+# 项目直接编码为整数 dot_pos << 24 | production，没有__dict__，
+# 在set中的哈希、相等比较都由int在C层完成，大量项目集时节省内存。
+# 点的位置放在高位，使低位（决定哈希槽位）随产生式编号变化，避免集中冲突
+class Item(int):
+    __slots__ = ()
+    
+    PROD_BITS = 24
+    PROD_MASK = (1 << PROD_BITS) - 1
+    
+    def __new__(cls, p, d):
+        return int.__new__(cls, (d << Item.PROD_BITS) | p)
+    
+    # 产生式的编号
+    @property
+    def production(self):
+        return self & Item.PROD_MASK
     
-    # 重载<
+    # 点的位置
+    @property
+    def dot_pos(self):
+        return self >> Item.PROD_BITS
+    
+    # 重载<，按(产生式编号, 点的位置)排序
     def __lt__(self, other):
         if self.production != other.production:
             return self.production < other.production
         return self.dot_pos < other.dot_pos
     
-    # 重载==
-    def __eq__(self, other):
-        return self.production == other.production and self.dot_pos == other.dot_pos
+    def __repr__(self):
+        return f"Item({self.production}, {self.dot_pos})"
     
-    # 为了在set中使用，需要实现hash方法
-    def __hash__(self):
-        return hash((self.production, self.dot_pos))
+    # 序列化时按(产生式编号, 点的位置)重建，在进程间传递后仍是Item
+    def __reduce__(self):
+        return (Item, (self.production, self.dot_pos))
 
 # 产生式结构
 class Production:
@@ -26,9 +55,176 @@ class Production:
         self.left = l    # 左部
         self.right = r  # 右部
 
+# 冲突报告：某个状态中两个动作在一组终结符上都登记了表项
+class Conflict:
+    SHIFT_REDUCE = 'shift-reduce'
+    REDUCE_REDUCE = 'reduce-reduce'
+    
+    def __init__(self, state, kind, symbols, productions):
+        self.state = state                  # 状态编号
+        self.kind = kind                    # 冲突类型，SHIFT_REDUCE 或 REDUCE_REDUCE
+        self.symbols = symbols              # 发生冲突的终结符集合
+        self.productions = productions      # 移进-归约冲突为 (归约产生式,)；归约-归约冲突为 (表中保留的产生式, 另一个产生式)，产生式0表示接受
+    
+    def __repr__(self):
+        return f"Conflict(state={self.state}, kind={self.kind!r}, symbols={sorted(self.symbols)}, productions={self.productions})"
+
+# 文法化简报告：reduceGrammar删除的符号和产生式
+class GrammarReduction:
+    def __init__(self, unproductive, unreachable, removedTerminals, removedProductions, duplicates, seconds):
+        self.unproductive = unproductive            # 推导不出终结符串的非终结符集合
+        self.unreachable = unreachable              # 从开始符号不可达的非终结符集合（不含unproductive）
+        self.removedTerminals = removedTerminals    # 删除产生式后不再出现的终结符集合
+        self.removedProductions = removedProductions  # 删除的无用产生式 (左部, 右部) 列表，不含重复的选择
+        self.duplicates = duplicates                # 删除的重复选择个数
+        self.seconds = seconds                      # 化简用时（秒）
+    
+    # 删除的符号个数
+    @property
+    def removedSymbols(self):
+        return len(self.unproductive) + len(self.unreachable) + len(self.removedTerminals)
+    
+    # 文法是否被修改
+    def __bool__(self):
+        return bool(self.removedProductions or self.duplicates)
+    
+    def __repr__(self):
+        return (f"GrammarReduction(unproductive={sorted(self.unproductive)}, unreachable={sorted(self.unreachable)}, "
+                f"removedTerminals={sorted(self.removedTerminals)}, removedProductions={len(self.removedProductions)}, "
+                f"duplicates={self.duplicates})")
+
+# 将位集解码为符号集合
+def decodeBits(bits, symbols):
+    result = set()
+    while bits:
+        low = bits & -bits
+        result.add(symbols[low.bit_length() - 1])
+        bits ^= low
+    return result
+
+# 以位集存储的符号集合字典的只读视图，按需解码为普通set并缓存
+class BitsetView(Mapping):
+    def __init__(self, bits, symbols):
+        self.bits = bits        # 键 -> 位集
+        self.symbols = symbols  # 位编号 -> 符号
+        self.decoded = {}
+    
+    def __getitem__(self, key):
+        result = self.decoded.get(key)
+        if result is None:
+            result = decodeBits(self.bits[key], self.symbols)
+            self.decoded[key] = result
+        return result
+    
+    def __iter__(self):
+        return iter(self.bits)
+    
+    def __len__(self):
+        return len(self.bits)
+
+# DeRemer-Pennello Digraph算法
+def digraph(edges, initial):
+    """求 F(x) = initial(x) ∪ ⋃{F(y) | x R y} 的最小解
+    
+    用Tarjan算法在遍历时找出关系R的强连通分量，同一分量内的结点共享结果，
+    每条边只处理一次，不需要反复迭代到不动点
+    
+    参数:
+        edges: 邻接表，edges[x]为所有满足 x R y 的y
+        initial: 各结点的初始位集
+        
+    返回:
+        各结点的结果位集列表
+    """
+    n = len(initial)
+    INFINITY = n + 1
+    depth = [0] * n
+    result = list(initial)
+    stack = []
+    
+    for root in range(n):
+        if depth[root]:
+            continue
+        
+        stack.append(root)
+        depth[root] = len(stack)
+        callStack = [(root, iter(edges[root]), len(stack))]
+        
+        # 用显式调用栈代替递归，避免深层文法超出递归深度
+        while callStack:
+            x, neighbours, d = callStack[-1]
+            
+            for y in neighbours:
+                if depth[y] == 0:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    callStack.append((y, iter(edges[y]), len(stack)))
+                    break
+                if depth[y] < depth[x]:
+                    depth[x] = depth[y]
+                result[x] |= result[y]
+            else:
+                callStack.pop()
+                
+                # x是强连通分量的根，分量内的结点共享结果
+                if depth[x] == d:
+                    while True:
+                        top = stack.pop()
+                        depth[top] = INFINITY
+                        result[top] = result[x]
+                        if top == x:
+                            break
+                
+                if callStack:
+                    parent = callStack[-1][0]
+                    if depth[x] < depth[parent]:
+                        depth[parent] = depth[x]
+                    result[parent] |= result[x]
+    
+    return result
+
+# 并行构造项目集族时，工作进程中只含文法的分析器，由initItemSetWorker创建
+workerParser = None
+
+# 工作进程初始化，只在启动时传输一次文法
+def initItemSetWorker(grammar, nonterminals):
+    global workerParser
+    workerParser = LR0Parser(verbose=False)
+    workerParser.productions = [Production(left, list(right)) for left, right in grammar]
+    workerParser.nonterminals = set(nonterminals)
+    workerParser.buildProductionIndex()
+
+# 在工作进程中计算一组核心的状态
+def expandKernels(kernels):
+    return [workerParser.expandKernel(kernel) for kernel in kernels]
+
+# 由文法求出的集合，文法改变后失效；claimActions等按是否存在这些属性决定是否需要计算
+DERIVED_SETS = ('bitSymbols', 'symbolBit', 'nullable', 'firstBits', 'first_sets',
+                'followBits', 'follow_sets', 'lookaheadBits', 'lookaheads')
+
+# 输出分析过程时剩余输入最多显示的符号个数
+TRACE_WINDOW = 10
+
+# 优先级声明 -> 结合性
+ASSOCIATIVITY = {
+    '%left': 'left',
+    '%right': 'right',
+    '%nonassoc': 'nonassoc',
+}
+
+# 分析方法及其名称，按分析能力从弱到强排列
+MODE_NAMES = {
+    'LR0': 'LR(0)',
+    'SLR1': 'SLR(1)',
+    'LALR1': 'LALR(1)',
+    'LR1': 'LR(1)',
+}
+
 # LR0分析器
 class LR0Parser:
-    def __init__(self):
+    def __init__(self, verbose=True):
+        self.verbose = verbose  # 是否输出构建过程和冲突信息
+        
         # 需要保持顺序、随机访问、按添加顺序维护，所以使用数组
         self.productions = []  # 产生式集合
         self.itemSets = []     # 项目集族
@@ -40,22 +236,54 @@ class LR0Parser:
         self.gotoTable = {}    # goto表
         self.startSymbol = ""   # 开始符号
         self.augmentedStart = "" # 增广开始符号
+        
+        # 需要按左部快速查找产生式，所以使用字典
+        self.prodIndex = {}     # 非终结符 -> 产生式编号列表
+        self.precedence = {}    # 终结符 -> (优先级, 结合性)，由 %left/%right/%nonassoc 声明，后声明的优先级高
+        self.precOverrides = {} # (左部, 右部元组) -> 用 %prec 为该产生式指定优先级的终结符
+        self.predictCache = {}  # 非终结符 -> 其预测（非核心）项目集
+        self.kernelIndex = {}   # 核心项目集(frozenset) -> 状态编号
+        self.stateCache = {}    # 核心项目集 -> (闭包, 后继核心, 归约产生式)，文法修改后仍有效的部分可复用
+        self.stateSymbols = []  # 状态 -> 有转移的符号（点后符号）
+        self.stateReduces = []  # 状态 -> 归约项目的产生式编号
+        self.reusedStates = 0   # 最近一次构建LR(0)项目集族时复用的状态数
+        
+        self.automaton = ""     # 当前项目集族的类型：LR0 或 LR1
+        self.stateCount = 0     # 最近一次构建的状态数
+        self.buildTime = 0.0    # 最近一次构建的用时（秒）
+        self.cacheHit = False   # 最近一次构建是否从缓存载入
+        self.parseTable = None  # 编译后的分析表
+        self.bypassUnits = False  # 编译分析表后是否跳过单产生式归约，见bypassUnitReductions
+        self.stats = None       # 统计信息（lrstats.Stats），为None时不统计
+        self.conflicts = []     # 最近一次检查到的冲突（Conflict列表）
+        self.pendingActions = None  # checkConflict登记好的 (分析方法, Action表, 尚未写入表项的状态, 含显式出错表项的状态)，供buildActionTable直接使用
+        self.explicitErrors = set() # 因 %nonassoc 置为出错的表项所在的状态，压缩分析表在这些状态不使用默认归约
     
     # 解析输入的产生式
     def parseProduction(self, input_str):
+        try:
+            return self.splitProduction(input_str)
+        except ValueError as e:
+            print(f"错误：{e}")
+            return []
+    
+    # 拆分产生式
+    def splitProduction(self, input_str):
+        """将 "A -> B C | D" 形式的产生式拆分为 [(左部, 右部符号列表), ...]
+        
+        格式不正确时抛出ValueError
+        """
         result = []
         
         arrowPos = input_str.find("->")
         if arrowPos == -1:  # 没找到"->"
-            print(f"错误：产生式格式不正确，请输入'->'：{input_str}")
-            return result
+            raise ValueError(f"产生式格式不正确，请输入'->'：{input_str}")
         
         # 提取左部并去除首尾空格
         left = input_str[:arrowPos].strip()
         
         if not left:
-            print("错误：产生式左部为空")
-            return result
+            raise ValueError(f"产生式左部为空：{input_str}")
         
         # 提取右部并去除首尾空格
         rightStr = input_str[arrowPos+2:].strip()
@@ -64,59 +292,172 @@ class LR0Parser:
         alternatives = rightStr.split('|')
         
         for alternative in alternatives:
-            # 去除空格
-            alternative = alternative.strip()
+            # 分割右部符号（按空格分割）
+            right = alternative.split()
+            
+            # 末尾的 %prec X 指定产生式的优先级与终结符X相同
+            precSymbol = None
+            if '%prec' in right:
+                k = right.index('%prec')
+                if k != len(right) - 2:
+                    raise ValueError(f"%prec 后应有且只有一个终结符：{input_str}")
+                precSymbol = right[k + 1]
+                right = right[:k]
             
             # 处理空产生式
-            if alternative == "ε":
+            if right == ["ε"]:
                 right = []
-            else:
-                # 分割右部符号（按空格分割）
-                right = alternative.split()
             
+            if precSymbol is not None:
+                self.precOverrides[(left, tuple(right))] = precSymbol
             result.append((left, right))
         
         return result
     
+    # 拆分优先级声明
+    def splitDeclaration(self, input_str):
+        """将 "%left + -" 形式的声明拆分为 (结合性, 终结符列表)
+        
+        不是以%开头的声明时返回None，格式不正确时抛出ValueError
+        """
+        words = input_str.split()
+        if not words or not words[0].startswith('%'):
+            return None
+        
+        assoc = ASSOCIATIVITY.get(words[0])
+        if assoc is None:
+            raise ValueError(f"未知的声明，应为 %left、%right 或 %nonassoc：{input_str}")
+        if len(words) < 2:
+            raise ValueError(f"声明中没有终结符：{input_str}")
+        return assoc, words[1:]
+    
+    # 设置优先级
+    def setPrecedence(self, declarations):
+        """按声明的先后设置终结符的优先级，后声明的优先级高，同一行的终结符优先级相同
+        
+        参数:
+            declarations: (结合性, 终结符列表) 序列，结合性为 'left'、'right' 或 'nonassoc'
+        """
+        self.precedence = {}
+        for level, (assoc, symbols) in enumerate(declarations, 1):
+            for symbol in symbols:
+                self.precedence[symbol] = (level, assoc)
+        self.pendingActions = None
+    
+    # 产生式的优先级
+    def productionPrecedence(self, prodIndex):
+        """产生式的优先级取 %prec 指定的终结符，否则取右部最后一个终结符
+        
+        返回:
+            (优先级, 结合性)，该终结符未声明优先级时返回None
+        """
+        prod = self.productions[prodIndex]
+        symbol = self.precOverrides.get((prod.left, tuple(prod.right)))
+        if symbol is None:
+            for s in reversed(prod.right):
+                if s in self.terminals:
+                    symbol = s
+                    break
+        return self.precedence.get(symbol)
+    
     # 输入文法
     def inputGrammar(self):
         print("请输入文法产生式（每行一个，空行结束）:")
         print("格式: A -> B C 或 A -> B C | D E (多选择) 或 A -> ε ")
+        print("      可用 %left/%right/%nonassoc 声明运算符的优先级和结合性（后声明的优先级高），")
+        print("      产生式末尾的 %prec X 使该产生式的优先级与X相同")
         print("示例:")
         print("E -> E + T | T")
         print("T -> T * F | F")
         print("F -> ( E ) | id")
+        print("或:")
+        print("%left + -")
+        print("%left * /")
+        print("E -> E + E | E - E | E * E | E / E | ( E ) | id")
         print()
         
         inputProductions = []
+        declarations = []
+        self.precOverrides = {}
         
         while True:
             line = input()
             if not line:
                 break
             
-            # 解析可能包含多个选择的产生式
-            parserProds = self.parseProduction(line)
+            # 优先级声明
+            try:
+                declaration = self.splitDeclaration(line)
+            except ValueError as e:
+                print(f"错误：{e}")
+                continue
+            if declaration is not None:
+                declarations.append(declaration)
+                continue
             
-            if parserProds:
-                for prod in parserProds:
-                    inputProductions.append(prod)
-                    self.nonterminals.add(prod[0])
-                    
-                    # 收集终结符
-                    for symbol in prod[1]:
-                        if symbol not in self.nonterminals:
-                            # 先假设为终结符，后面调整
-                            self.terminals.add(symbol)
+            # 解析可能包含多个选择的产生式
+            inputProductions.extend(self.parseProduction(line))
         
         if not inputProductions:
             print("未产生任何产生式！")
             return
         
+        self.setGrammar(inputProductions)
+        self.setPrecedence(declarations)
+        
+        print("文法输入完成！")
+        self.printGrammarInfo()
+    
+    # 从字符串载入文法
+    def loadGrammar(self, text):
+        """从字符串载入文法，每行一个产生式或优先级声明，格式与inputGrammar相同，空行忽略
+        
+        参数:
+            text: 文法文本
+            
+        格式不正确或没有任何产生式时抛出ValueError
+        """
+        inputProductions = []
+        declarations = []
+        self.precOverrides = {}
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            declaration = self.splitDeclaration(line)
+            if declaration is not None:
+                declarations.append(declaration)
+            else:
+                inputProductions.extend(self.splitProduction(line))
+        
+        if not inputProductions:
+            raise ValueError("未产生任何产生式！")
+        
+        self.setGrammar(inputProductions)
+        self.setPrecedence(declarations)
+    
+    # 从文件载入文法
+    def loadGrammarFile(self, path, encoding='utf-8'):
+        """从文件载入文法，格式同loadGrammar"""
+        with open(path, encoding=encoding) as f:
+            self.loadGrammar(f.read())
+    
+    # 设置文法
+    def setGrammar(self, inputProductions):
+        """由 (左部, 右部符号列表) 序列构建增广文法，第一个产生式的左部为开始符号"""
+        self.terminals = {"$"}
+        self.nonterminals = set()
+        
+        for left, right in inputProductions:
+            self.nonterminals.add(left)
+            
+            # 收集终结符
+            for symbol in right:
+                if symbol not in self.nonterminals:
+                    # 先假设为终结符，后面调整
+                    self.terminals.add(symbol)
+        
         # 调整终结符集合（移除非终结符）
-        for nt in self.nonterminals:
-            if nt in self.terminals:
-                self.terminals.remove(nt)
+        self.terminals -= self.nonterminals
         
         # 设置开始符号为第一个产生式的左部
         self.startSymbol = inputProductions[0][0]
@@ -131,11 +472,285 @@ class LR0Parser:
         self.nonterminals.add(self.augmentedStart)
         
         # 添加原始产生式
-        for prod in inputProductions:
-            self.productions.append(Production(prod[0], prod[1]))
+        for left, right in inputProductions:
+            self.productions.append(Production(left, list(right)))
         
-        print("文法输入完成！")
-        self.printGrammarInfo()
+        # 建立产生式索引
+        self.buildProductionIndex()
+        self.stateCache = {}
+        
+        # 丢弃上一个文法的First、Follow集和向前看符号，用到时重新计算
+        for name in DERIVED_SETS:
+            if hasattr(self, name):
+                delattr(self, name)
+        
+        # 上一个文法的项目集族和分析表随之失效，重新构建之前不能用于分析
+        self.itemSets.clear()
+        self.gotoTable.clear()
+        self.kernelIndex = {}
+        self.stateSymbols = []
+        self.stateReduces = []
+        self.automaton = ""
+        self.stateCount = 0
+        self.cacheHit = False
+        self.conflicts = []
+        self.pendingActions = None
+        self.explicitErrors = set()
+        self.parseTable = None
+        if hasattr(self, 'actionTable'):
+            del self.actionTable
+    
+    # 把产生式字符串或 (左部, 右部) 序列统一为 (左部, 右部符号列表) 列表
+    def productionPairs(self, productions):
+        pairs = []
+        for production in productions:
+            if isinstance(production, str):
+                pairs.extend(self.splitProduction(production))
+            else:
+                left, right = production
+                pairs.append((left, list(right)))
+        return pairs
+    
+    # 增量修改文法
+    def updateGrammar(self, added=(), removed=()):
+        """增加、删除或修改产生式，并保留修改后仍然有效的LR(0)状态供下一次构建复用
+        
+        状态的闭包只取决于核心项目和点后非终结符的预测项目。修改了左部为A的产生式后，
+        只有点后符号经左角（右部第一个符号）能到达A的状态需要重新求闭包，
+        其余状态的闭包、后继核心和归约项目直接沿用
+        
+        为了让其余产生式的编号不变，被删除的产生式空出的位置依次由同一左部新增的产生式、
+        其他新增的产生式、当前最后一个产生式填补，剩下的新增产生式追加在末尾。
+        修改后的文法与按productions的顺序重新载入的文法相同，构建结果也完全一致。
+        已构建的项目集族和分析表随之失效（见setGrammar），重新构建之前不能用于分析
+        
+        参数:
+            added: 增加的产生式，"A -> B C | D" 形式的字符串或 (左部, 右部符号列表) 的序列
+            removed: 删除的产生式，格式同added
+            
+        返回:
+            受影响的符号集合，点后为这些符号的状态需要重新计算
+            
+        要删除的产生式不存在，或修改后没有产生式时抛出ValueError
+        """
+        added = self.productionPairs(added)
+        removed = self.productionPairs(removed)
+        
+        # 当前的产生式及其编号，新产生式的编号为None
+        pairs = [(prod.left, prod.right) for prod in self.productions]
+        oldIds = list(range(len(pairs)))
+        holes = []
+        
+        for left, right in removed:
+            for k in range(1, len(pairs)):
+                if pairs[k] is not None and pairs[k] == (left, right):
+                    break
+            else:
+                raise ValueError(f"产生式不存在：{left} -> {' '.join(right) if right else 'ε'}")
+            pairs[k] = None
+            holes.append(k)
+        
+        # 优先用同一左部的新产生式填补空位，即视为修改该产生式
+        rest = []
+        for left, right in added:
+            for k in holes:
+                if pairs[k] is None and self.productions[k].left == left:
+                    pairs[k] = (left, right)
+                    oldIds[k] = None
+                    break
+            else:
+                rest.append((left, right))
+        
+        for k in holes:
+            if k >= len(pairs) or pairs[k] is not None:
+                continue
+            if rest:
+                pairs[k] = rest.pop(0)
+                oldIds[k] = None
+                continue
+            
+            # 用最后一个产生式填补，只有它的编号会改变
+            while len(pairs) > k + 1 and pairs[-1] is None:
+                pairs.pop()
+                oldIds.pop()
+            if len(pairs) > k + 1:
+                pairs[k] = pairs.pop()
+                oldIds[k] = oldIds.pop()
+            else:
+                del pairs[k:]
+                del oldIds[k:]
+        
+        pairs += rest
+        oldIds += [None] * len(rest)
+        if len(pairs) < 2:
+            raise ValueError("未产生任何产生式！")
+        
+        # 保持原编号的产生式，以及改变了编号的产生式 旧编号 -> 新编号
+        prodMap = {old: new for new, old in enumerate(oldIds) if old is not None}
+        moved = {old: new for old, new in prodMap.items() if old != new}
+        
+        oldProductions = list(self.productions)
+        oldCache = self.stateCache
+        oldStart = self.startSymbol
+        self.setGrammar(pairs[1:])
+        
+        # 沿左角关系反向求出能到达给定符号的全部非终结符（新旧文法都要考虑）
+        users = {}
+        for prod in oldProductions + self.productions:
+            if prod.right:
+                users.setdefault(prod.right[0], set()).add(prod.left)
+        
+        def reaching(symbols):
+            result = set(symbols)
+            workList = list(symbols)
+            while workList:
+                for left in users.get(workList.pop(), ()):
+                    if left not in result:
+                        result.add(left)
+                        workList.append(left)
+            return result
+        
+        # 受影响的符号：增删了产生式的左部及能到达它们的非终结符
+        affected = reaching({left for left, _ in added} | {left for left, _ in removed})
+        
+        # 开始符号改变时所有状态都要重新计算
+        if self.startSymbol != oldStart:
+            return affected
+        
+        # 含有改变了编号的产生式的项目的状态，需要改写项目编码后再沿用
+        renumbered = reaching({oldProductions[old].left for old in moved})
+        
+        def remap(items):
+            return frozenset(Item(prodMap[item & Item.PROD_MASK], item >> Item.PROD_BITS) for item in items)
+        
+        for kernel, entry in oldCache.items():
+            closure, successors, reduces = entry
+            if not affected.isdisjoint(successors):
+                continue
+            if any((item & Item.PROD_MASK) not in prodMap for item in kernel):
+                continue
+            
+            if renumbered.isdisjoint(successors) and not any((item & Item.PROD_MASK) in moved for item in kernel):
+                self.stateCache[kernel] = entry
+                continue
+            
+            # 后继核心按最小的项目编码排序，与successors的分组顺序一致
+            successors = sorted(((symbol, remap(target)) for symbol, target in successors.items()),
+                                key=lambda pair: min(map(int, pair[1])))
+            self.stateCache[remap(kernel)] = (
+                set(remap(closure)),
+                dict(successors),
+                tuple(sorted(prodMap[p] for p in reduces)),
+            )
+        
+        return affected
+    
+    # 化简文法
+    @instrumented('reduceGrammar')
+    def reduceGrammar(self, dedupe=False):
+        """在构建项目集族之前删除无用符号及其产生式
+        
+        先求出能推导出终结符串的（有用）非终结符，删除含有其他非终结符的产生式；
+        再从开始符号出发，删除左部不可达的产生式。顺序不能交换，
+        否则删除无用产生式后可能又出现新的不可达符号。其余产生式保持原来的相对顺序
+        
+        参数:
+            dedupe: 是否同时删除左部和右部都相同的重复选择，只保留第一个
+            
+        返回:
+            GrammarReduction；没有删除任何产生式时文法不变，已构建的状态缓存也保留
+            
+        开始符号推导不出任何终结符串时抛出ValueError
+        """
+        start = time.perf_counter()
+        productions = self.productions[1:]
+        
+        # 有用的非终结符：某个产生式右部的非终结符都已确定有用。每个产生式记录还未确定的非终结符个数
+        waiting = []
+        users = {}
+        for k, prod in enumerate(productions):
+            count = 0
+            for symbol in prod.right:
+                if symbol in self.nonterminals:
+                    users.setdefault(symbol, []).append(k)
+                    count += 1
+            waiting.append(count)
+        
+        productive = set()
+        workList = [prod.left for prod, count in zip(productions, waiting) if count == 0]
+        while workList:
+            symbol = workList.pop()
+            if symbol in productive:
+                continue
+            productive.add(symbol)
+            for k in users.get(symbol, ()):
+                waiting[k] -= 1
+                if waiting[k] == 0:
+                    workList.append(productions[k].left)
+        
+        if self.startSymbol not in productive:
+            raise ValueError(f"开始符号 {self.startSymbol} 推导不出任何终结符串")
+        useful = [prod for prod, count in zip(productions, waiting) if count == 0]
+        
+        # 从开始符号可达的非终结符，只沿有用的产生式
+        index = {}
+        for prod in useful:
+            index.setdefault(prod.left, []).append(prod)
+        reachable = {self.startSymbol}
+        workList = [self.startSymbol]
+        while workList:
+            for prod in index[workList.pop()]:
+                for symbol in prod.right:
+                    if symbol in index and symbol not in reachable:
+                        reachable.add(symbol)
+                        workList.append(symbol)
+        
+        kept = []
+        seen = set()
+        duplicates = 0
+        for prod in useful:
+            if prod.left not in reachable:
+                continue
+            key = (prod.left, tuple(prod.right))
+            if dedupe and key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            kept.append((prod.left, list(prod.right)))
+        
+        keptIds = {id(prod) for prod in useful if prod.left in reachable}
+        removedProductions = [(prod.left, list(prod.right)) for prod in productions if id(prod) not in keptIds]
+        unproductive = self.nonterminals - productive - {self.augmentedStart}
+        unreachable = self.nonterminals - reachable - unproductive - {self.augmentedStart}
+        oldTerminals = set(self.terminals)
+        
+        if removedProductions or duplicates:
+            self.setGrammar(kept)
+            self.pendingActions = None
+            self.parseTable = None
+        removedTerminals = oldTerminals - self.terminals
+        
+        if self.stats is not None:
+            self.stats.count('removedSymbols', len(unproductive) + len(unreachable) + len(removedTerminals))
+            self.stats.count('removedProductions', len(removedProductions) + duplicates)
+        return GrammarReduction(unproductive, unreachable, removedTerminals, removedProductions, duplicates,
+                                time.perf_counter() - start)
+    
+    # 打印文法化简结果
+    def printReduction(self, reduction):
+        if not reduction:
+            print("文法中没有无用符号和产生式")
+            return
+        print(f"删除了 {reduction.removedSymbols} 个符号、"
+              f"{len(reduction.removedProductions) + reduction.duplicates} 个产生式，用时 {reduction.seconds:.4f} 秒")
+        if reduction.unproductive:
+            print(f"  推导不出终结符串的非终结符：{', '.join(sorted(reduction.unproductive))}")
+        if reduction.unreachable:
+            print(f"  不可达的非终结符：{', '.join(sorted(reduction.unreachable))}")
+        if reduction.removedTerminals:
+            print(f"  不再使用的终结符：{', '.join(sorted(reduction.removedTerminals))}")
+        if reduction.duplicates:
+            print(f"  重复的选择：{reduction.duplicates} 个")
     
     # 打印文法信息
     def printGrammarInfo(self):
@@ -155,37 +770,79 @@ class LR0Parser:
             else:
                 print(" ".join(prod.right), end="")
             print()
+        
+        if self.precedence:
+            print("\n优先级（由低到高）：")
+            levels = {}
+            for symbol, (level, assoc) in self.precedence.items():
+                levels.setdefault((level, assoc), []).append(symbol)
+            for (level, assoc), symbols in sorted(levels.items()):
+                print(f"  %{assoc} {' '.join(symbols)}")
         print()
     
-   # 闭包计算
-    def closure(self, items):
-        result = items.copy()
-        changed = True
+    # 建立产生式索引
+    def buildProductionIndex(self):
+        """按左部建立 非终结符 -> 产生式编号 的索引，并清空预测项目缓存
+        
+        文法载入后调用一次，closure 不再需要遍历全部产生式
+        """
+        self.prodIndex = {}
+        for i, prod in enumerate(self.productions):
+            self.prodIndex.setdefault(prod.left, []).append(i)
+        self.predictCache = {}
     
-        # 遍历，直至没有新的产生式加入
-        while changed:
-            changed = False
-            newItems = set()
+    # 计算非终结符的预测项目
+    def predictItems(self, nonterminal):
+        """计算点位于非终结符A之前时，闭包需要加入的全部非核心项目
+        
+        即所有可由A经最左推导到达的非终结符B的项目 B->.γ，
+        每个非终结符只计算一次，结果缓存在 predictCache 中
         
-            temp = list(result)
-            for item in temp:
-                prod = self.productions[item.production]
+        参数:
+            nonterminal: 非终结符A
             
-                # 如果点不在最右端
-                if item.dot_pos < len(prod.right):
-                    nextSymbol = prod.right[item.dot_pos]
+        返回:
+            预测项目集（frozenset）
+        """
+        cached = self.predictCache.get(nonterminal)
+        if cached is not None:
+            return cached
+        
+        result = set()
+        visited = {nonterminal}
+        workList = [nonterminal]
+        
+        while workList:
+            symbol = workList.pop()
+            for i in self.prodIndex.get(symbol, ()):
+                result.add(Item(i, 0))
                 
-                    # 如果点后面是非终结符
-                    if nextSymbol in self.nonterminals:
-                        # 找到所有以该非终结符为左部的产生式
-                        for i in range(len(self.productions)):
-                            if self.productions[i].left == nextSymbol:
-                                newItem = Item(i, 0)
-                                if newItem not in result:
-                                    newItems.add(newItem)
-                                    changed = True
-        
-            result.update(newItems)
+                # 右部第一个符号若为非终结符，也需要展开
+                right = self.productions[i].right
+                if right and right[0] in self.nonterminals and right[0] not in visited:
+                    visited.add(right[0])
+                    workList.append(right[0])
+        
+        result = frozenset(result)
+        self.predictCache[nonterminal] = result
+        return result
+    
+    # 闭包计算
+    def closure(self, items):
+        result = set(items)
+        expanded = set()
+    
+        # 只需遍历一次核心项目，非核心项目由预测项目缓存一次性加入
+        for item in items:
+            right = self.productions[item & Item.PROD_MASK].right
+            dot = item >> Item.PROD_BITS
+            
+            # 如果点不在最右端，且点后面是未展开过的非终结符
+            if dot < len(right):
+                nextSymbol = right[dot]
+                if nextSymbol in self.nonterminals and nextSymbol not in expanded:
+                    expanded.add(nextSymbol)
+                    result |= self.predictItems(nextSymbol)
     
         return result
     
@@ -200,69 +857,189 @@ class LR0Parser:
         返回:
             转移后的项目集
         """
+        # 对核心项目集进行闭包操作
+        return self.closure(self.gotoKernel(items, symbol))
+    
+    # 计算GOTO(I,X)的核心项目
+    def gotoKernel(self, items, symbol):
+        """计算项目集I读入符号X后的核心项目（未求闭包）
+        
+        两个状态的闭包相同当且仅当核心项目相同，因此核心项目可以作为状态的键
+        
+        参数:
+            items: 项目集I
+            symbol: 输入符号X
+            
+        返回:
+            核心项目集（frozenset）
+        """
         result = set()
         
         for item in items:
+            p = item & Item.PROD_MASK
+            dot = item >> Item.PROD_BITS
+            
             # 检查产生式索引是否有效
-            if not (0 <= item.production < len(self.productions)):
+            if not (0 <= p < len(self.productions)):
                 continue  # 跳过无效的产生式索引
                 
-            prod = self.productions[item.production]
+            right = self.productions[p].right
             
             # 如果点后面是symbol，则将点向右移动一位
-            if item.dot_pos < len(prod.right) and prod.right[item.dot_pos] == symbol:
-                newItem = Item(item.production, item.dot_pos + 1)
-                result.add(newItem)
+            if dot < len(right) and right[dot] == symbol:
+                result.add(Item(p, dot + 1))
         
-        # 对结果项目集进行闭包操作
-        return self.closure(result)
+        return frozenset(result)
+    
+    # 一次计算项目集的全部后继核心
+    def successors(self, items):
+        """只遍历一次项目集，按点后符号分组，得到所有GOTO(I,X)的核心项目
+        
+        相比对每个符号调用一次gotoKernel，代价与项目数成正比，而不是项目数×符号数
+        
+        参数:
+            items: 项目集I
+            
+        返回:
+            字典 符号X -> 核心项目集（frozenset），按项目编码顺序排列，保证状态编号稳定
+        """
+        groups = {}
+        
+        for item in sorted(items, key=int):
+            right = self.productions[item & Item.PROD_MASK].right
+            dot = item >> Item.PROD_BITS
+            
+            # 点不在最右端，则点右移一位后归入点后符号的分组
+            if dot < len(right):
+                advanced = Item(item & Item.PROD_MASK, dot + 1)
+                group = groups.get(right[dot])
+                if group is None:
+                    groups[right[dot]] = [advanced]
+                else:
+                    group.append(advanced)
+        
+        return {symbol: frozenset(group) for symbol, group in groups.items()}
+    
+    # 由核心项目计算状态
+    def expandKernel(self, kernel):
+        """返回 (闭包, 后继核心, 归约产生式)，即stateCache中的一项"""
+        closure = self.closure(kernel)
+        return closure, self.successors(closure), self.completedProductions(closure)
+    
+    # 并行计算一层新状态
+    def expandFrontier(self, pool, frontier, chunkSize):
+        """在进程池中为前沿中尚未缓存的核心计算闭包和后继核心
+        
+        返回:
+            字典 核心项目集 -> (闭包, 后继核心, 归约产生式)
+        """
+        missing = [kernel for kernel in frontier if kernel not in self.stateCache]
+        chunks = [missing[i:i + chunkSize] for i in range(0, len(missing), chunkSize)]
+        fresh = {}
+        for chunk, entries in zip(chunks, pool.map(expandKernels, chunks)):
+            fresh.update(zip(chunk, entries))
+        return fresh
+    
+    # 项目集中的归约项目
+    def completedProductions(self, items):
+        """返回项目集中点在最右端的项目的产生式编号（升序元组）"""
+        result = []
+        for item in items:
+            p = item & Item.PROD_MASK
+            if item >> Item.PROD_BITS == len(self.productions[p].right):
+                result.append(p)
+        return tuple(sorted(result))
     
     # 构造LR0项目集族
-    def buildItemSets(self):
-        self.itemSets.clear()
-        self.gotoTable.clear()
+    @instrumented('buildItemSets')
+    def buildItemSets(self, workers=1, chunkSize=64):
+        """构造LR(0)项目集族
         
-        # 初始项目集I0
-        I0 = {Item(0, 0)}  # S' -> .S
-        I0 = self.closure(I0)
-        self.itemSets.append(I0)
+        每个核心项目集的闭包、后继核心和归约项目缓存在stateCache中，
+        文法未变时重复构建（如依次尝试各分析方法）直接复用，
+        updateGrammar修改文法后也只需为受影响的状态重新求闭包
         
-        workList = [0]
+        并行构造时按层处理：一层（前沿）中所有新核心的闭包和后继核心在进程池中计算，
+        再由主进程按状态编号顺序登记新核心。登记顺序与串行时完全相同，
+        因此状态编号、转移和分析表与串行构造一致
         
-        while workList:
-            # 从workList中取出第一个元素
-            currentIndex = workList.pop(0)
-            currentSet = self.itemSets[currentIndex]
-            
-            # 收集所有可能的转移符号
-            symbols = set()
-            for item in currentSet:
-                prod = self.productions[item.production]
-                if item.dot_pos < len(prod.right):
-                    symbols.add(prod.right[item.dot_pos])
-            
-            # 对每个符号计算GOTO
-            for symbol in symbols:
-                gotoResult = self.gotoSet(currentSet, symbol)
+        参数:
+            workers: 工作进程数，1表示串行，None为CPU核数
+            chunkSize: 每个任务包含的核心个数
+        """
+        self.itemSets.clear()
+        self.gotoTable.clear()
+        self.kernelIndex = {}
+        self.stateSymbols = []
+        self.stateReduces = []
+        self.reusedStates = 0
+        self.pendingActions = None
+        computed = 0        # 新求闭包的状态数
+        itemsCreated = 0    # 新求出的闭包中的项目数
+        gotoCalls = 0       # 新求出的后继核心数
+        
+        # 初始项目集I0的核心 S' -> .S
+        kernels = [frozenset({Item(0, 0)})]
+        self.kernelIndex[kernels[0]] = 0
+        
+        pool = None
+        if workers != 1:
+            grammar = [(prod.left, prod.right) for prod in self.productions]
+            pool = ProcessPoolExecutor(workers, initializer=initItemSetWorker,
+                                       initargs=(grammar, sorted(self.nonterminals)))
+        
+        try:
+            # 状态按发现的顺序编号，按编号顺序处理即为广度优先
+            currentIndex = 0
+            while currentIndex < len(kernels):
+                levelEnd = len(kernels)
+                fresh = {} if pool is None else self.expandFrontier(pool, kernels[currentIndex:levelEnd], chunkSize)
                 
-                if gotoResult:
-                    # 查找是否已存在相同的项目集
-                    targetIndex = -1
-                    for i, itemSet in enumerate(self.itemSets):
-                        if itemSet == gotoResult:
-                            targetIndex = i
-                            break
+                while currentIndex < levelEnd:
+                    kernel = kernels[currentIndex]
+                    entry = self.stateCache.get(kernel)
+                    if entry is not None:
+                        self.reusedStates += 1
+                    else:
+                        # 新的项目集（并行时已在进程池中算好），求闭包并一次求出所有转移符号的后继核心
+                        entry = fresh.get(kernel)
+                        if entry is None:
+                            entry = self.expandKernel(kernel)
+                        self.stateCache[kernel] = entry
+                        computed += 1
+                        itemsCreated += len(entry[0])
+                        gotoCalls += len(entry[1])
                     
-                    if targetIndex == -1:
-                        # 新的项目集
-                        targetIndex = len(self.itemSets)
-                        self.itemSets.append(gotoResult)
-                        workList.append(targetIndex)
+                    closure, successors, reduces = entry
+                    self.itemSets.append(closure)
+                    self.stateSymbols.append(tuple(successors))
+                    self.stateReduces.append(reduces)
                     
-                    # 记录转移
-                    self.gotoTable[(currentIndex, symbol)] = targetIndex
-        
-        print("buildItemSets函数成功运行！")
+                    for symbol, target in successors.items():
+                        # 按核心项目查找是否已存在相同的项目集
+                        targetIndex = self.kernelIndex.get(target)
+                        if targetIndex is None:
+                            targetIndex = len(kernels)
+                            kernels.append(target)
+                            self.kernelIndex[target] = targetIndex
+                        
+                        # 记录转移
+                        self.gotoTable[(currentIndex, symbol)] = targetIndex
+                    
+                    currentIndex += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        self.automaton = 'LR0'
+        if self.stats is not None:
+            self.stats.count('states', len(self.itemSets))
+            self.stats.count('closureCalls', computed)
+            self.stats.count('itemsCreated', itemsCreated)
+            self.stats.count('gotoCalls', gotoCalls)
+            self.stats.count('reusedStates', self.reusedStates)
+        if self.verbose:
+            print("buildItemSets函数成功运行！")
     
     # 打印项目
     def printItem(self, item):
@@ -297,46 +1074,105 @@ class LR0Parser:
                 print(f"    {self.printItem(item)}")
             print()
     
+    # 为终结符分配位编号
+    def buildSymbolBits(self):
+        """为终结符、结束符#和ε分配稠密的位编号，First/Follow集用整数位集表示"""
+        self.bitSymbols = sorted(self.terminals | {'#', 'ε'})
+        self.symbolBit = {symbol: 1 << i for i, symbol in enumerate(self.bitSymbols)}
+    
+    # 计算可空非终结符
+    def computeNullable(self):
+        """计算所有能推导出ε的非终结符
+        
+        对每个产生式记录右部尚未确定可空的符号个数，某个非终结符变为可空时
+        只更新出现它的产生式，整个过程与文法大小成线性关系
+        """
+        self.nullable = set()
+        remaining = []          # 每个产生式右部尚未确定可空的符号个数
+        occurrences = {}        # 非终结符 -> 右部出现它的产生式编号
+        workList = []
+        
+        for i, prod in enumerate(self.productions):
+            remaining.append(len(prod.right))
+            for symbol in prod.right:
+                if symbol in self.nonterminals:
+                    occurrences.setdefault(symbol, []).append(i)
+            if not prod.right and prod.left not in self.nullable:
+                self.nullable.add(prod.left)
+                workList.append(prod.left)
+        
+        while workList:
+            nt = workList.pop()
+            for i in occurrences.get(nt, ()):
+                # 右部中每出现一次都算一个可空符号
+                remaining[i] -= 1
+                left = self.productions[i].left
+                if remaining[i] == 0 and left not in self.nullable:
+                    self.nullable.add(left)
+                    workList.append(left)
+    
     # 计算First集合
+    @instrumented('computeFirstSets')
     def computeFirstSets(self):
         """计算所有非终结符的First集合
         
         First(X)表示非终结符X可以推导出的所有串的首符号集合
+        
+        对产生式 A->αXβ（α可空），若X为终结符则直接加入First(A)，
+        若X为非终结符则有 First(A) ⊇ First(X)，按该依赖关系图求强连通分量一次传播完成
         """
-        # 初始化所有非终结符的First集合为空集
-        self.first_sets = {nt: set() for nt in self.nonterminals}
+        self.buildSymbolBits()
+        self.computeNullable()
+        
+        ntList = list(self.nonterminals)
+        ntIndex = {nt: i for i, nt in enumerate(ntList)}
+        initial = [0] * len(ntList)
+        edges = [[] for _ in ntList]
+        
+        for prod in self.productions:
+            A = ntIndex[prod.left]
+            for symbol in prod.right:
+                if symbol in ntIndex:
+                    edges[A].append(ntIndex[symbol])
+                    if symbol not in self.nullable:
+                        break
+                else:
+                    initial[A] |= self.symbolBit[symbol]
+                    break
         
-        # 添加所有终结符的First集合，First(a) = {a}
+        firstBits = digraph(edges, initial)
+        if self.stats is not None:
+            # 依赖图上每条边只传播一次，传播次数即边数
+            self.stats.count('firstPropagations', sum(map(len, edges)))
+        
+        # 非终结符可空则First集合中包含ε
+        epsilonBit = self.symbolBit['ε']
+        self.firstBits = {}
+        for nt, bits in zip(ntList, firstBits):
+            self.firstBits[nt] = bits | epsilonBit if nt in self.nullable else bits
+        
+        # 终结符的First集合为其本身，First(ε) = {ε}
         for t in self.terminals:
-            self.first_sets[t] = {t}
+            self.firstBits[t] = self.symbolBit[t]
+        self.firstBits['ε'] = epsilonBit
         
-        # 添加空串的First集合，First(ε) = {ε}
-        self.first_sets['ε'] = {'ε'}
+        self.first_sets = BitsetView(self.firstBits, self.bitSymbols)
+    
+    # 计算符号序列的First集合（位集）
+    def getFirstBitsOfSequence(self, sequence):
+        """计算符号序列的First集合，以位集返回，序列可推导出ε时包含ε位"""
+        epsilonBit = self.symbolBit['ε']
+        result = 0
         
-        changed = True
-        while changed:
-            changed = False
-            
-            # 遍历所有产生式
-            for prod in self.productions:
-                # 获取产生式左侧的非终结符
-                nt = prod.left
-                
-                # 如果右侧为空，则将ε加入First集合
-                if len(prod.right) == 0:
-                    if 'ε' not in self.first_sets[nt]:
-                        self.first_sets[nt].add('ε')
-                        changed = True
-                    continue
-                
-                # 计算右侧序列的First集合
-                first_of_right = self.getFirstOfSequence(prod.right)
-                
-                # 将计算得到的First集合加入到非终结符的First集合中
-                for symbol in first_of_right:
-                    if symbol not in self.first_sets[nt]:
-                        self.first_sets[nt].add(symbol)
-                        changed = True
+        # 遍历序列中的每个符号，遇到不能推导出ε的符号即停止
+        for symbol in sequence:
+            bits = self.firstBits[symbol]
+            result |= bits & ~epsilonBit
+            if not bits & epsilonBit:
+                return result
+        
+        # 所有符号都能推导出ε
+        return result | epsilonBit
     
     # 计算符号序列的First集合
     def getFirstOfSequence(self, sequence):
@@ -348,141 +1184,658 @@ class LR0Parser:
         返回:
             符号序列的First集合
         """
-        if not sequence:  # 空序列
-            return {'ε'}
+        return decodeBits(self.getFirstBitsOfSequence(sequence), self.bitSymbols)
+
+    # 计算Follow集合
+    @instrumented('computeFollowSets')
+    def computeFollowSets(self):
+        """计算所有非终结符的Follow集合
         
-        result = set()
-        all_derive_epsilon = True
+        Follow(A)表示在所有句型中紧跟在非终结符A后面的终结符集合
         
-        # 遍历序列中的每个符号
-        for symbol in sequence:
-            # 如果符号不能推导出ε，则后续符号不再考虑
-            if 'ε' not in self.first_sets[symbol]:
-                all_derive_epsilon = False
-                result.update(self.first_sets[symbol])
-                break
+        对产生式 A->αBβ，First(β)-{ε} 直接加入Follow(B)；若β可空则 Follow(B) ⊇ Follow(A)，
+        同样按依赖关系图求强连通分量一次传播完成
+        """
+        ntList = list(self.nonterminals)
+        ntIndex = {nt: i for i, nt in enumerate(ntList)}
+        initial = [0] * len(ntList)
+        edges = [[] for _ in ntList]
+        epsilonBit = self.symbolBit['ε']
+        
+        # 将#加入到开始符号（及拓广文法开始符号）的Follow集合中
+        initial[ntIndex[self.startSymbol]] |= self.symbolBit['#']
+        initial[ntIndex[self.augmentedStart]] |= self.symbolBit['#']
+        
+        for prod in self.productions:
+            A = ntIndex[prod.left]
             
-            # 将除ε外的所有符号加入结果集
-            result.update(self.first_sets[symbol] - {'ε'})
+            # 从右往左扫描，维护后缀β的First集合及其是否可空
+            betaFirst = 0
+            betaNullable = True
+            for symbol in reversed(prod.right):
+                if symbol in ntIndex:
+                    B = ntIndex[symbol]
+                    initial[B] |= betaFirst
+                    if betaNullable and B != A:
+                        edges[B].append(A)
+                
+                bits = self.firstBits[symbol]
+                if bits & epsilonBit:
+                    betaFirst |= bits & ~epsilonBit
+                else:
+                    betaFirst = bits
+                    betaNullable = False
+        
+        self.followBits = dict(zip(ntList, digraph(edges, initial)))
+        self.pendingActions = None
+        if self.stats is not None:
+            self.stats.count('followPropagations', sum(map(len, edges)))
+        self.follow_sets = BitsetView(self.followBits, self.bitSymbols)
+
+    # 计算LALR(1)向前看符号
+    @instrumented('computeLALRLookaheads')
+    def computeLALRLookaheads(self):
+        """在LR(0)项目集族上用DeRemer-Pennello方法计算LALR(1)向前看符号
+        
+        对每个非终结符转移(p,A)：
+            DR(p,A)     = 从GOTO(p,A)出发可直接读入的终结符
+            Read(p,A)   = DR(p,A) ∪ ⋃{Read(r,C) | (p,A) reads (r,C)，C可空}
+            Follow(p,A) = Read(p,A) ∪ ⋃{Follow(p',B) | (p,A) includes (p',B)}
+        归约项目 (q, A->ω) 的向前看集合为所有 lookback 到的 Follow(p,A) 之并。
+        两次传播都用digraph一次完成，不需要构造LR(1)项目集再合并
+        """
+        if not hasattr(self, 'firstBits'):
+            self.computeFirstSets()
+        
+        # 每个状态的出边
+        outgoing = {}
+        for (state, symbol), target in self.gotoTable.items():
+            outgoing.setdefault(state, []).append(symbol)
+        
+        # 非终结符转移编号
+        transitions = [key for key in self.gotoTable if key[1] in self.nonterminals]
+        transIndex = {key: i for i, key in enumerate(transitions)}
+        
+        # DR关系和reads关系
+        directReads = [0] * len(transitions)
+        readsEdges = [[] for _ in transitions]
+        for i, (p, A) in enumerate(transitions):
+            r = self.gotoTable[(p, A)]
+            for symbol in outgoing.get(r, ()):
+                if symbol in self.nonterminals:
+                    if symbol in self.nullable:
+                        readsEdges[i].append(transIndex[(r, symbol)])
+                else:
+                    directReads[i] |= self.symbolBit[symbol]
+            
+            # 开始符号读完后紧跟结束符#
+            if p == 0 and A == self.startSymbol:
+                directReads[i] |= self.symbolBit['#']
+        
+        readBits = digraph(readsEdges, directReads)
+        
+        # includes关系和lookback关系
+        includesEdges = [[] for _ in transitions]
+        lookback = {}
+        for j, (p, B) in enumerate(transitions):
+            for prodIndex in self.prodIndex[B]:
+                right = self.productions[prodIndex].right
+                
+                # 标记右部每个位置之后的后缀是否可空
+                suffixNullable = [True] * (len(right) + 1)
+                for k in range(len(right) - 1, -1, -1):
+                    suffixNullable[k] = suffixNullable[k + 1] and right[k] in self.nullable
+                
+                state = p
+                for k, symbol in enumerate(right):
+                    if symbol in self.nonterminals and suffixNullable[k + 1]:
+                        includesEdges[transIndex[(state, symbol)]].append(j)
+                    state = self.gotoTable[(state, symbol)]
+                
+                lookback.setdefault((state, prodIndex), []).append(j)
+        
+        followBits = digraph(includesEdges, readBits)
+        if self.stats is not None:
+            self.stats.count('readsPropagations', sum(map(len, readsEdges)))
+            self.stats.count('includesPropagations', sum(map(len, includesEdges)))
+        
+        self.lookaheadBits = {}
+        for key, sources in lookback.items():
+            bits = 0
+            for j in sources:
+                bits |= followBits[j]
+            self.lookaheadBits[key] = bits
+        
+        # 接受项目 S'->S. 的向前看符号为#
+        for (state, symbol), target in self.gotoTable.items():
+            if state == 0 and symbol == self.startSymbol:
+                self.lookaheadBits[(target, 0)] = self.symbolBit['#']
+        
+        self.lookaheads = BitsetView(self.lookaheadBits, self.bitSymbols)
+        self.pendingActions = None
+    
+    # 建立左角关系
+    def buildLeftCorners(self):
+        """对每个产生式 C->Bβ（B为非终结符）记录 (B, First(β)-{ε}, β是否可空)
         
-        # 如果所有符号都能推导出ε，则将ε加入结果集
-        if all_derive_epsilon:
-            result.add('ε')
+        同一状态中所有 B->.γ 项目的向前看符号相同，因此LR(1)闭包只需在非终结符之间
+        沿这些边传播向前看符号，不必逐个项目反复传播
+        """
+        epsilonBit = self.symbolBit['ε']
+        self.leftCorners = {}
+        self.ntStartItems = {}
+        
+        for nt, prodIds in self.prodIndex.items():
+            edges = []
+            for i in prodIds:
+                right = self.productions[i].right
+                if right and right[0] in self.nonterminals:
+                    bits = self.getFirstBitsOfSequence(right[1:])
+                    edges.append((right[0], bits & ~epsilonBit, bool(bits & epsilonBit)))
+            self.leftCorners[nt] = edges
+            self.ntStartItems[nt] = [Item(i, 0) for i in prodIds]
+    
+    # LR(1)闭包计算
+    def closureLR1(self, kernel):
+        """计算带向前看符号的LR(1)项目集闭包
+        
+        参数:
+            kernel: 字典 项目 -> 向前看符号位集
+            
+        返回:
+            闭包，同样是 项目 -> 向前看符号位集 的字典
+        """
+        epsilonBit = self.symbolBit['ε']
+        ntLookaheads = {}   # 非终结符B -> 所有 B->.γ 项目共同的向前看符号
+        workList = []
+        
+        # 核心项目 A->α.Bβ,L 为B提供 First(β)，β可空时再加上L
+        for item, lookahead in kernel.items():
+            right = self.productions[item & Item.PROD_MASK].right
+            dot = item >> Item.PROD_BITS
+            
+            if dot < len(right) and right[dot] in self.nonterminals:
+                bits = self.getFirstBitsOfSequence(right[dot + 1:])
+                if bits & epsilonBit:
+                    bits = (bits & ~epsilonBit) | lookahead
+                
+                old = ntLookaheads.get(right[dot])
+                if old is None or bits & ~old:
+                    ntLookaheads[right[dot]] = (old or 0) | bits
+                    workList.append(right[dot])
+        
+        # 沿左角关系传播，某个非终结符的向前看符号增加时重新传播
+        while workList:
+            nt = workList.pop()
+            lookahead = ntLookaheads[nt]
+            for B, first, nullable in self.leftCorners[nt]:
+                bits = first | lookahead if nullable else first
+                old = ntLookaheads.get(B)
+                if old is None or bits & ~old:
+                    ntLookaheads[B] = (old or 0) | bits
+                    workList.append(B)
+        
+        result = dict(kernel)
+        for nt, lookahead in ntLookaheads.items():
+            for item in self.ntStartItems[nt]:
+                result[item] = result.get(item, 0) | lookahead
         
         return result
-
-    # 计算Follow集合
-    def computeFollowSets(self):
-        """计算所有非终结符的Follow集合
+    
+    # 构造LR(1)项目集族
+    @instrumented('buildLR1ItemSets')
+    def buildLR1ItemSets(self):
+        """构造规范LR(1)项目集族
         
-        Follow(A)表示在所有句型中紧跟在非终结符A后面的终结符集合
+        itemSets中只保存各状态的LR(0)核心项目，向前看符号记录在lookaheads中，
+        打印、Action表构建等沿用LR(0)项目集族的接口
         """
-        # 初始化所有非终结符的Follow集合为空集
-        self.follow_sets = {nt: set() for nt in self.nonterminals}
+        if not hasattr(self, 'firstBits'):
+            self.computeFirstSets()
+        
+        self.buildLeftCorners()
+        
+        self.itemSets.clear()
+        self.gotoTable.clear()
+        self.kernelIndex = {}
+        self.lookaheadBits = {}
+        self.pendingActions = None
+        self.stateSymbols = []
+        self.stateReduces = []
+        
+        kernel0 = {Item(0, 0): self.symbolBit['#']}  # S' -> .S, #
+        closures = [self.closureLR1(kernel0)]
+        self.kernelIndex[frozenset(kernel0.items())] = 0
         
-        # 将#加入到开始符号的Follow集合中
-        self.follow_sets[self.startSymbol].add('#')
+        workList = deque([0])
         
-        changed = True
-        while changed:
-            changed = False
+        while workList:
+            currentIndex = workList.popleft()
+            currentSet = closures[currentIndex]
             
-            # 遍历所有产生式
-            for prod in self.productions:
-                # 获取产生式左侧的非终结符
-                A = prod.left
+            # 按点后符号分组，点右移后向前看符号不变
+            groups = {}
+            reduces = []
+            for item in sorted(currentSet, key=int):
+                p = item & Item.PROD_MASK
+                right = self.productions[p].right
+                dot = item >> Item.PROD_BITS
                 
-                # 遍历产生式右侧的每个位置
-                for i in range(len(prod.right)):
-                    B = prod.right[i]
-                    
-                    # 如果B是非终结符
-                    if B in self.nonterminals:
-                        # 计算B后面的符号序列的First集合
-                        beta = prod.right[i+1:] if i+1 < len(prod.right) else []
-                        first_of_beta = self.getFirstOfSequence(beta)
-                        
-                        # 将First(β) - {ε}加入到Follow(B)中
-                        for symbol in first_of_beta - {'ε'}:
-                            if symbol not in self.follow_sets[B]:
-                                self.follow_sets[B].add(symbol)
-                                changed = True
-                        
-                        # 如果ε在First(β)中，或者B是产生式右侧的最后一个符号
-                        # 则将Follow(A)加入到Follow(B)中
-                        if 'ε' in first_of_beta or not beta:
-                            for symbol in self.follow_sets[A]:
-                                if symbol not in self.follow_sets[B]:
-                                    self.follow_sets[B].add(symbol)
-                                    changed = True
-
+                if dot < len(right):
+                    group = groups.setdefault(right[dot], {})
+                    advanced = Item(p, dot + 1)
+                    group[advanced] = group.get(advanced, 0) | currentSet[item]
+                else:
+                    self.lookaheadBits[(currentIndex, p)] = currentSet[item]
+                    reduces.append(p)
+            
+            self.stateSymbols.append(tuple(groups))
+            self.stateReduces.append(tuple(reduces))
+            
+            for symbol, kernel in groups.items():
+                key = frozenset(kernel.items())
+                targetIndex = self.kernelIndex.get(key)
+                
+                if targetIndex is None:
+                    targetIndex = len(closures)
+                    closures.append(self.closureLR1(kernel))
+                    self.kernelIndex[key] = targetIndex
+                    workList.append(targetIndex)
+                
+                self.gotoTable[(currentIndex, symbol)] = targetIndex
+        
+        self.itemSets.extend(set(c) for c in closures)
+        self.lookaheads = BitsetView(self.lookaheadBits, self.bitSymbols)
+        self.automaton = 'LR1'
+        if self.stats is not None:
+            self.stats.count('states', len(closures))
+            self.stats.count('closureCalls', len(closures))
+            self.stats.count('itemsCreated', sum(map(len, closures)))
+            self.stats.count('gotoCalls', len(self.gotoTable))
+    
+    # 按指定分析方法构建分析表
+    @instrumented('buildTables')
+    def buildTables(self, mode, workers=1):
+        """按指定的分析方法构建项目集族和分析表，并记录状态数和构建用时
+        
+        参数:
+            mode: 分析方法，'LR0'、'SLR1'、'LALR1' 或 'LR1'
+            workers: 并行构造LR(0)项目集族的工作进程数，1表示串行，见buildItemSets；
+                     规范LR(1)项目集族总是串行构造
+            
+        返回:
+            如果存在冲突，返回True；否则返回False
+        """
+        start = time.perf_counter()
+        
+        # LR(1)需要自己的项目集族，其余方法共用LR(0)项目集族
+        if mode != 'LR0':
+            self.computeFirstSets()
+            self.computeFollowSets()
+        if mode == 'LR1':
+            self.buildLR1ItemSets()
+        else:
+            self.buildItemSets(workers)
+        if mode == 'LALR1':
+            self.computeLALRLookaheads()
+        
+        # 冲突检查时已登记好Action表，无冲突时直接使用
+        hasConflict = self.checkConflict(mode=mode)
+        if not hasConflict:
+            self.buildActionTable(mode=mode)
+            self.compileTables(mode)
+        
+        self.stateCount = len(self.itemSets)
+        self.buildTime = time.perf_counter() - start
+        return hasConflict
+    
+    # 文法哈希
+    def grammarHash(self, mode):
+        """对规范化后的增广文法和分析方法计算sha256摘要，作为分析表缓存的键"""
+        lines = [f"{prod.left} -> {' '.join(prod.right)}" for prod in self.productions]
+        
+        # 优先级影响冲突的解决，也是文法的一部分
+        for symbol, (level, assoc) in sorted(self.precedence.items()):
+            lines.append(f"%{assoc} {symbol} {level}")
+        for prod in self.productions:
+            symbol = self.precOverrides.get((prod.left, tuple(prod.right)))
+            if symbol is not None:
+                lines.append(f"%prec {prod.left} -> {' '.join(prod.right)} {symbol}")
+        lines.append(f"mode={mode}")
+        return hashlib.sha256("\n".join(lines).encode('utf-8')).digest()
+    
+    # 使用缓存构建分析表
+    @instrumented('buildTablesCached')
+    def buildTablesCached(self, mode, cacheDir, workers=1):
+        """先尝试从缓存目录载入分析表，缓存不存在、过期或损坏时重新构建并写入缓存
+        
+        参数:
+            mode: 分析方法，'auto' 表示从LR(0)到LR(1)依次尝试，使用第一个无冲突的方法
+            cacheDir: 缓存目录
+            workers: 重新构建时的工作进程数，同buildTables
+            
+        返回:
+            如果存在冲突，返回True；否则返回False
+        """
+        start = time.perf_counter()
+        if self.loadCachedTables(mode, cacheDir):
+            return False
+        
+        for m in (list(MODE_NAMES) if mode == 'auto' else [mode]):
+            if not self.buildTables(m, workers):
+                self.saveCachedTables(mode, cacheDir)
+                self.buildTime = time.perf_counter() - start
+                return False
+        return True
+    
+    # 缓存文件
+    def cachePath(self, mode, cacheDir):
+        """返回 (缓存文件路径, 文法哈希)"""
+        digest = self.grammarHash(mode)
+        return os.path.join(cacheDir, digest.hex() + '.lrt'), digest
+    
+    # 从缓存载入分析表
+    def loadCachedTables(self, mode, cacheDir):
+        """缓存中有该文法和分析方法的有效分析表时载入并返回True，否则返回False，见buildTablesCached"""
+        start = time.perf_counter()
+        path, digest = self.cachePath(mode, cacheDir)
+        table = ParseTable.load(path, digest)
+        self.cacheHit = table is not None
+        if self.cacheHit:
+            self.useParseTable(table)
+            self.buildTime = time.perf_counter() - start
+        return self.cacheHit
+    
+    # 把当前的分析表写入缓存
+    def saveCachedTables(self, mode, cacheDir):
+        path, digest = self.cachePath(mode, cacheDir)
+        self.parseTable.save(path, digest)
+    
+    # 按指定分析方法构建分析表（库接口）
+    def build(self, mode='auto', cacheDir=None, workers=1):
+        """构建分析表，供程序调用
+        
+        参数:
+            mode: 分析方法，'LR0'、'SLR1'、'LALR1'、'LR1'，或 'auto' 依次尝试并使用第一个无冲突的方法
+            cacheDir: 分析表缓存目录，为None时不使用缓存
+            workers: 并行构造项目集族的工作进程数，同buildTables
+            
+        返回:
+            编译后的ParseTable
+            
+        文法在指定方法下存在冲突时抛出ValueError
+        """
+        if cacheDir:
+            hasConflict = self.buildTablesCached(mode, cacheDir, workers)
+        elif mode == 'auto':
+            hasConflict = all(self.buildTables(m, workers) for m in MODE_NAMES)
+        else:
+            hasConflict = self.buildTables(mode, workers)
+        
+        if hasConflict:
+            name = "任何LR分析方法" if mode == 'auto' else MODE_NAMES[mode]
+            raise ValueError(f"文法在{name}下存在冲突")
+        return self.parseTable
+    
+    # 由文法文本直接构建分析器（库接口）
+    @classmethod
+    def fromGrammar(cls, text, mode='auto', cacheDir=None, verbose=False, workers=1, bypassUnits=False,
+                    reduce=False, dedupe=False):
+        """载入文法并构建分析表，返回构建好的分析器
+        
+        参数:
+            text: 文法文本，格式同loadGrammar
+            mode: 分析方法，同build
+            cacheDir: 分析表缓存目录
+            verbose: 是否输出构建过程和冲突信息
+            workers: 并行构造项目集族的工作进程数，同buildTables
+            bypassUnits: 是否跳过单产生式归约以减少分析步数，见bypassUnitReductions
+            reduce: 构建前是否删除无用符号及其产生式，见reduceGrammar
+            dedupe: 化简时是否同时删除重复的选择
+        """
+        parser = cls(verbose=verbose)
+        parser.bypassUnits = bypassUnits
+        parser.loadGrammar(text)
+        if reduce:
+            parser.reduceGrammar(dedupe)
+        parser.build(mode, cacheDir, workers)
+        return parser
+    
+    # 使用已有的分析表
+    def useParseTable(self, table):
+        """使用编译好的分析表（如从缓存载入的），不再构建项目集族"""
+        self.parseTable = table
+        self.actionTable, gotoTable = table.toDicts()
+        self.gotoTable = gotoTable
+        self.itemSets.clear()
+        self.stateSymbols = []
+        self.stateReduces = []
+        self.stateCount = table.stateCount
+        self.pendingActions = None
+        self.explicitErrors = set(table.explicitErrors)
+        self.automaton = ""
+        
+        # 缓存中不保存单产生式归约的跳转，载入后重新计算
+        if self.bypassUnits and table.unitGoto is None:
+            self.bypassUnitReductions()
+    
+    # 开启统计
+    def enableStats(self, memory=False):
+        """开启各阶段用时和计数的统计，之后的构建和分析都记入同一个Stats对象
+        
+        参数:
+            memory: 是否同时用tracemalloc记录各阶段的峰值内存（会明显拖慢构建）
+            
+        返回:
+            lrstats.Stats，可用 toDict()、dump(path)、report() 取出结果
+        """
+        self.stats = Stats(memory)
+        return self.stats
+    
+    # 登记Action表动作
+    def claimActions(self, mode):
+        """单遍扫描所有状态，把移进、归约和接受动作登记到Action表中
+        
+        每个 (状态, 终结符) 表项只在首次登记时写入，之后再有动作登记到同一表项即为冲突，
+        表中保留先登记的动作（移进先于归约，归约按产生式编号）。
+        冲突按状态和相冲突的两个动作归并为Conflict，冲突检查和建表因此共用这一次遍历，
+        不需要两两比较归约项目
+        
+        LR(0)中归约项目在所有终结符上归约（接受项目只在#上接受，但同样视为占用所有终结符），
+        冲突只取决于状态中是否还有其他动作，按状态整体用集合运算判断。
+        出现冲突后LR(0)表通常不会再用，之后的状态只检查冲突，不再写入表项，
+        由buildActionTable按需补上
+        
+        声明了优先级时，SLR(1)、LALR(1)、LR(1)的移进-归约冲突先按优先级和结合性解决
+        （见resolvePrecedence），解决不了的才报告为冲突；LR(0)不看向前看符号，不使用优先级
+        
+        参数:
+            mode: 分析方法，'LR0'、'SLR1'、'LALR1' 或 'LR1'
+            
+        返回:
+            (Action表, Conflict列表, 尚未写入表项的状态列表, 含因非结合而出错的表项的状态集合)
+        """
+        # 确保已计算Follow集，LALR(1)还需要向前看符号
+        if mode == 'SLR1' and not hasattr(self, 'follow_sets'):
+            self.computeFirstSets()
+            self.computeFollowSets()
+        if mode == 'LALR1' and not hasattr(self, 'lookaheads'):
+            self.computeLALRLookaheads()
+        
+        actionTable = {}
+        conflicts = []
+        deferred = []
+        explicitErrors = set()
+        allTerminals = self.terminals | {'#'}
+        ACCEPT = ('accept', None)
+        claims = 0
+        resolved = 0
+        
+        # 遍历所有项目集，移进动作来自状态的转移，归约动作来自状态的归约项目
+        for i in range(len(self.itemSets)):
+            row = actionTable[i] = {}
+            shifted = self.terminals.intersection(self.stateSymbols[i])
+            claims += len(shifted)
+            
+            if mode == 'LR0':
+                reduces = self.stateReduces[i]
+                claims += len(allTerminals) * len(reduces)
+                
+                # 第一个归约项目占用所有未移进的终结符，之后的归约项目在这些终结符上都与它冲突
+                if reduces:
+                    if shifted:
+                        conflicts.extend(Conflict(i, Conflict.SHIFT_REDUCE, shifted, (p,)) for p in reduces)
+                    if len(reduces) > 1:
+                        rest = allTerminals - shifted
+                        conflicts.extend(Conflict(i, Conflict.REDUCE_REDUCE, rest, (reduces[0], p)) for p in reduces[1:])
+                
+                if conflicts:
+                    deferred.append(i)
+                else:
+                    self.fillLR0Row(row, i)
+                continue
+            
+            # 移进项，同一状态的转移符号互不相同，不会冲突
+            for symbol in self.stateSymbols[i]:
+                if symbol in shifted:
+                    row[symbol] = ('shift', self.gotoTable[(i, symbol)])
+            
+            # 归约项
+            nonassoc = set()    # 因非结合而置为出错的表项，暂时占位，本状态处理完后删除
+            for prodIndex in self.stateReduces[i]:
+                # 对于SLR(1)，只在Follow集中的终结符（含结束符#）上执行归约
+                # 对于LALR(1)和LR(1)，只在该状态下项目的向前看符号上执行归约
+                if mode == 'SLR1':
+                    reduce_terminals = self.follow_sets[self.productions[prodIndex].left]
+                else:
+                    reduce_terminals = self.lookaheads[(i, prodIndex)]
+                claims += len(reduce_terminals)
+                
+                # 产生式0即增广产生式 S'->S，归约即接受
+                action = ACCEPT if prodIndex == 0 else ('reduce', prodIndex)
+                
+                # 已被登记的表项即为冲突：与移进的冲突整体求交集，与归约的冲突按先登记的产生式归并
+                collided = row.keys() & reduce_terminals
+                if collided:
+                    shiftReduce = collided & shifted
+                    reduceReduce = collided - shiftReduce
+                    if shiftReduce and self.precedence and action is not ACCEPT:
+                        unresolved = self.resolvePrecedence(row, shifted, shiftReduce, prodIndex, nonassoc)
+                        resolved += len(shiftReduce) - len(unresolved)
+                        shiftReduce = unresolved
+                    if shiftReduce:
+                        conflicts.append(Conflict(i, Conflict.SHIFT_REDUCE, shiftReduce, (prodIndex,)))
+                    owners = {}
+                    for terminal in reduceReduce:
+                        owner = row[terminal][1] or 0
+                        owners.setdefault(owner, set()).add(terminal)
+                    for owner, symbols in owners.items():
+                        conflicts.append(Conflict(i, Conflict.REDUCE_REDUCE, symbols, (owner, prodIndex)))
+                
+                if action is ACCEPT:
+                    if '#' not in collided:
+                        row['#'] = ACCEPT
+                elif collided:
+                    row.update(dict.fromkeys(reduce_terminals - collided, action))
+                else:
+                    row.update(dict.fromkeys(reduce_terminals, action))
+            
+            for terminal in nonassoc:
+                del row[terminal]
+            if nonassoc:
+                explicitErrors.add(i)
+        
+        if self.stats is not None:
+            self.stats.count('actionClaims', claims)
+            self.stats.count('conflicts', len(conflicts))
+            self.stats.count('resolvedConflicts', resolved)
+        return actionTable, conflicts, deferred, explicitErrors
+    
+    # 按优先级解决移进-归约冲突
+    def resolvePrecedence(self, row, shifted, symbols, prodIndex, nonassoc):
+        """对状态中按产生式prodIndex归约与移进冲突的终结符，按yacc的规则选择动作：
+        产生式优先级高于终结符时归约，低于时移进；同级时左结合归约，右结合移进，
+        非结合则该表项为出错。产生式或终结符没有声明优先级时无法解决
+        
+        参数:
+            row: 该状态的Action表行，归约胜出的表项改为归约，非结合的表项改为 ('error', prodIndex) 占位
+            shifted: 该状态中仍为移进的终结符集合，不再为移进的终结符从中删除
+            symbols: 冲突的终结符
+            nonassoc: 收集置为出错的终结符
+            
+        返回:
+            无法解决的终结符集合
+        """
+        prec = self.productionPrecedence(prodIndex)
+        if prec is None:
+            return symbols
+        
+        unresolved = set()
+        for terminal in symbols:
+            tokenPrec = self.precedence.get(terminal)
+            if tokenPrec is None:
+                unresolved.add(terminal)
+            elif prec[0] > tokenPrec[0] or (prec[0] == tokenPrec[0] and tokenPrec[1] == 'left'):
+                row[terminal] = ('reduce', prodIndex)
+                shifted.discard(terminal)
+            elif prec[0] == tokenPrec[0] and tokenPrec[1] == 'nonassoc':
+                row[terminal] = ('error', prodIndex)
+                shifted.discard(terminal)
+                nonassoc.add(terminal)
+        return unresolved
+    
+    # 写入LR(0)状态的表项
+    def fillLR0Row(self, row, state):
+        """移进表项来自转移；第一个归约项目在其余所有终结符上归约，接受项目只写在#上"""
+        for symbol in self.stateSymbols[state]:
+            if symbol in self.terminals:
+                row[symbol] = ('shift', self.gotoTable[(state, symbol)])
+        
+        reduces = self.stateReduces[state]
+        if reduces and reduces[0] == 0:
+            row['#'] = ('accept', None)
+        elif reduces:
+            action = ('reduce', reduces[0])
+            for terminal in self.terminals | {'#'}:
+                row.setdefault(terminal, action)
+    
     # 检查冲突
-    def checkConflict(self, useSLR1=False):
+    @instrumented('checkConflict')
+    def checkConflict(self, useSLR1=False, mode=None):
         """检查语法是否存在冲突
+        
+        同时按该分析方法登记好Action表，之后buildActionTable直接使用，不再遍历状态；
+        冲突报告保存在conflicts中
+        
         参数:
             useSLR1: 是否使用SLR(1)分析方法检查冲突
+            mode: 分析方法，'LR0'、'SLR1'、'LALR1' 或 'LR1'，指定时优先于useSLR1
         返回:
             如果存在冲突，返回True；否则返回False
         """
-        hasConflict = False
+        if mode is None:
+            mode = 'SLR1' if useSLR1 else 'LR0'
         
-        # 遍历所有项目集
-        for i, items in enumerate(self.itemSets):
-            # 检查是否有移进-归约冲突或归约-归约冲突
-            reduce_items = []
-            shift_symbols = set()
-            
-            # 收集所有归约项和移进符号
-            for item in items:
-                prod = self.productions[item.production]
-                
-                # 归约项
-                if item.dot_pos == len(prod.right):
-                    reduce_items.append(item)
-                # 移进项
-                elif item.dot_pos < len(prod.right):
-                    shift_symbols.add(prod.right[item.dot_pos])
-            
-            # 检查冲突
-            if reduce_items:
-                for reduce_item in reduce_items:
-                    prod = self.productions[reduce_item.production]
-                    
-                    # 对于SLR(1)，只在Follow集中的终结符上执行归约
-                    if useSLR1:
-                        reduce_terminals = self.follow_sets[prod.left] & self.terminals
-                    else:
-                        reduce_terminals = self.terminals
-                    
-                    # 检查移进-归约冲突
-                    sr_conflicts = shift_symbols & reduce_terminals
-                    if sr_conflicts:
-                        hasConflict = True
-                        if not useSLR1:
-                            print(f"\n移进-归约冲突在状态 {i}:")
-                            print(f"  项目: {self.printItem(reduce_item)}")
-                            print(f"  冲突符号: {', '.join(sorted(sr_conflicts))}")
-                    
-                    # 检查归约-归约冲突
-                    for other_reduce in reduce_items:
-                        if other_reduce != reduce_item:
-                            other_prod = self.productions[other_reduce.production]
-                            
-                            # 对于SLR(1)，检查Follow集是否有交集
-                            if useSLR1:
-                                rr_conflicts = self.follow_sets[prod.left] & self.follow_sets[other_prod.left] & self.terminals
-                            else:
-                                rr_conflicts = self.terminals  # LR(0)总是有规约-规约冲突
-                            
-                            if rr_conflicts and not useSLR1:
-                                hasConflict = True
-                                print(f"\n归约-归约冲突在状态 {i}:")
-                                print(f"  项目1: {self.printItem(reduce_item)}")
-                                print(f"  项目2: {self.printItem(other_reduce)}")
-                                print(f"  冲突符号: {', '.join(sorted(rr_conflicts))}")
+        actionTable, self.conflicts, deferred, explicitErrors = self.claimActions(mode)
+        self.pendingActions = (mode, actionTable, deferred, explicitErrors)
         
-        return hasConflict
-
+        if self.conflicts and self.verbose:
+            self.printConflicts()
+        return bool(self.conflicts)
+    
+    # 打印冲突
+    def printConflicts(self):
+        for conflict in self.conflicts:
+            items = [self.printItem(Item(p, len(self.productions[p].right))) for p in conflict.productions]
+            if conflict.kind == Conflict.SHIFT_REDUCE:
+                print(f"\n移进-归约冲突在状态 {conflict.state}:")
+                print(f"  项目: {items[0]}")
+            else:
+                print(f"\n归约-归约冲突在状态 {conflict.state}:")
+                print(f"  项目1: {items[0]}")
+                print(f"  项目2: {items[1]}")
+            print(f"  冲突符号: {', '.join(sorted(conflict.symbols))}")
+    
     # 打印Follow集合
     def printFollowSets(self):
         # 打印所有非终结符的Follow集合
@@ -493,62 +1846,133 @@ class LR0Parser:
         print()
     
     # 构建Action表
-    def buildActionTable(self, useSLR1=False):
+    @instrumented('buildActionTable')
+    def buildActionTable(self, useSLR1=False, mode=None):
         """构建LR分析表中的Action部分
+        
+        checkConflict已按同一分析方法登记过动作时直接使用其结果，否则调用claimActions；
+        有冲突的表项保留先登记的动作
+        
         参数:
             use_slr1: 是否使用SLR(1)分析方法构建Action表
+            mode: 分析方法，'LR0'、'SLR1'、'LALR1' 或 'LR1'，指定时优先于useSLR1
             
         返回:
             构建的Action表
         """
-        # 确保已计算First和Follow集
-        if useSLR1 and not hasattr(self, 'follow_sets'):
-            self.computeFirstSets()
-            self.computeFollowSets()
+        if mode is None:
+            mode = 'SLR1' if useSLR1 else 'LR0'
         
-        # 初始化Action表
-        self.actionTable = {}
+        if self.pendingActions is not None and self.pendingActions[0] == mode:
+            _, self.actionTable, deferred, self.explicitErrors = self.pendingActions
+        else:
+            self.actionTable, self.conflicts, deferred, self.explicitErrors = self.claimActions(mode)
+            if self.conflicts and self.verbose:
+                self.printConflicts()
+        self.pendingActions = None
         
-        # 遍历所有项目集
-        for i, items in enumerate(self.itemSets):
-            self.actionTable[i] = {}
-            
-            # 处理每个项目
-            for item in items:
-                prod = self.productions[item.production]
-                
-                # 如果是移进项
-                if item.dot_pos < len(prod.right) and prod.right[item.dot_pos] in self.terminals:
-                    symbol = prod.right[item.dot_pos]
-                    next_state = self.gotoTable.get((i, symbol))
-                    
-                    if next_state is not None:
-                        # 添加移进动作
-                        self.actionTable[i][symbol] = ('shift', next_state)
-                
-                # 如果是归约项
-                elif item.dot_pos == len(prod.right):
-                    # 如果是接受项
-                    if prod.left == self.augmentedStart and len(prod.right) == 1 and prod.right[0] == self.startSymbol:
-                        self.actionTable[i]['#'] = ('accept', None)
-                    else:
-                        # 对于SLR(1)，只在Follow集中的终结符上执行归约
-                        if useSLR1:
-                            reduce_terminals = self.follow_sets[prod.left] & self.terminals
-                            reduce_terminals.add('#')  # 添加结束符
-                        else:
-                            reduce_terminals = self.terminals | {'#'}  # 所有终结符和结束符
-                        
-                        # 添加归约动作
-                        for terminal in reduce_terminals:
-                            # 如果已经有移进动作，且是SLR(1)，则有冲突
-                            if terminal in self.actionTable[i] and useSLR1:
-                                print(f"警告：状态{i}对于符号{terminal}存在冲突")
-                            else:
-                                self.actionTable[i][terminal] = ('reduce', item.production)
+        # 补上LR(0)出现冲突后未写入的状态
+        for state in deferred:
+            self.fillLR0Row(self.actionTable[state], state)
         
+        # 字典表已改变，编译后的分析表需要重新生成
+        self.parseTable = None
         return self.actionTable
 
+    # 编译分析表
+    @instrumented('compileTables')
+    def compileTables(self, mode=''):
+        """将字典形式的Action表和Goto表编译为整数数组形式的ParseTable
+        
+        终结符（含结束符#）和非终结符按名称排序后编号，
+        分析时只需按下标访问数组
+        
+        参数:
+            mode: 构建该表所用的分析方法，记录在表中
+            
+        返回:
+            编译后的ParseTable
+            
+        尚未构建Action表（或文法改变后未重新构建）时抛出ValueError
+        """
+        if not hasattr(self, 'actionTable'):
+            raise ValueError("请先构建分析表！")
+        terminals = sorted(self.terminals | {'#'})
+        nonterminals = sorted(self.nonterminals)
+        terminalIds = {t: i for i, t in enumerate(terminals)}
+        nonterminalIds = {nt: i for i, nt in enumerate(nonterminals)}
+        stateCount = len(self.itemSets)
+        
+        # 直接分配整型数组再填入非空表项，不经过同样大小的列表
+        action = array('i', [ParseTable.ERROR]) * (stateCount * len(terminals))
+        for state, row in self.actionTable.items():
+            base = state * len(terminals)
+            for symbol, entry in row.items():
+                action[base + terminalIds[symbol]] = ParseTable.encodeAction(entry)
+        
+        goto = array('i', [-1]) * (stateCount * len(nonterminals))
+        for (state, symbol), target in self.gotoTable.items():
+            if symbol in nonterminalIds:
+                goto[state * len(nonterminals) + nonterminalIds[symbol]] = target
+        
+        self.parseTable = ParseTable(
+            terminals,
+            nonterminals,
+            [nonterminalIds[prod.left] for prod in self.productions],
+            [len(prod.right) for prod in self.productions],
+            action,
+            goto,
+            productions=[(prod.left, prod.right) for prod in self.productions],
+            mode=mode,
+            explicitErrors=sorted(self.explicitErrors),
+        )
+        if self.bypassUnits:
+            self.bypassUnitReductions()
+        return self.parseTable
+    
+    # 跳过单产生式归约
+    @instrumented('bypassUnitReductions')
+    def bypassUnitReductions(self):
+        """在编译后的分析表上预先算出单产生式（如 E -> T、T -> F）归约链的终点，见ParseTable.bypassUnitReductions
+        
+        之后parse、parseStream和parseBatch不再逐个执行这些归约，接受的输入串和出错位置不变；
+        buildTree=True时仍使用原来的Goto表，语法树中保留单产生式结点
+        
+        返回:
+            改写的Goto表项个数
+        """
+        if self.parseTable is None:
+            self.compileTables()
+        rewritten = self.parseTable.bypassUnitReductions()
+        if self.stats is not None:
+            self.stats.count('unitGotoEntries', rewritten)
+        return rewritten
+    
+    # 生成独立的分析器模块
+    def emitParser(self, path):
+        """将编译后的分析表和特化的驱动程序写成不依赖本模块的Python模块，见lrcodegen
+        
+        生成的模块提供parse(symbols)和accepts(symbols)；bypassUnits为真时同样跳过单产生式归约
+        
+        返回:
+            写入的字节数
+        """
+        if self.parseTable is None:
+            if not hasattr(self, 'actionTable'):
+                raise ValueError("请先构建分析表！")
+            self.compileTables()
+        return lrcodegen.writeModule(self.parseTable, path)
+    
+    # 打印分析表内存占用
+    def printTableMemory(self):
+        """生成压缩分析表，并与字典形式、数组形式的分析表对比内存占用"""
+        self.compressedTable = self.parseTable.compress()
+        
+        print("\n分析表内存占用：")
+        print(f"  字典表：{deepSizeof(self.actionTable) + deepSizeof(self.gotoTable)} 字节")
+        print(f"  数组表：{self.parseTable.memoryFootprint()} 字节")
+        print(f"  压缩表：{self.compressedTable.memoryFootprint()} 字节")
+    
     # 打印Action-Goto表
     def printActionGotoTable(self):
         """打印合并的Action-Goto表，包含Action部分和Goto部分"""
@@ -569,7 +1993,7 @@ class LR0Parser:
         print("-" * len(header.expandtabs()))
         
         # 打印每个状态的动作和转移
-        for state in range(len(self.itemSets)):
+        for state in range(len(self.actionTable)):
             row = f"{state}\t"
             
             # 处理所有符号
@@ -601,81 +2025,184 @@ class LR0Parser:
         print()
     
     # 运行分析器
-    def run(self):
-        """运行LR分析器，自动判断文法类型并构建相应的分析表"""
+    def run(self, cacheDir=None, workers=1, reduce=False, dedupe=False):
+        """运行LR分析器，自动判断文法类型并构建相应的分析表
+        
+        参数:
+            cacheDir: 分析表缓存目录，指定时优先从缓存载入分析表
+            workers: 并行构造项目集族的工作进程数，1表示串行
+            reduce: 构建前是否删除无用符号及其产生式，见reduceGrammar
+            dedupe: 化简时是否同时删除重复的选择
+        """
         # 输入文法
         self.inputGrammar()
         
-        print("\n构建LR(0)项集族...")
-        self.buildItemSets()
-        
-        # 打印项目集族
-        self.printItemSets()
-        
-        print("\n检查文法是否为LR(0)文法...")
-        lr0_conflicts = self.checkConflict(useSLR1=False)
-        
-        if not lr0_conflicts:
-            print("\n该文法是LR(0)文法！")
-
-            self.buildActionTable(useSLR1=False)
-    
-            print("\nLR(0)分析表:")
+        # 化简文法
+        if reduce and self.productions:
+            print("\n化简文法...")
+            try:
+                reduction = self.reduceGrammar(dedupe)
+            except ValueError as e:
+                print(f"错误：{e}")
+                return
+            self.printReduction(reduction)
+            if reduction:
+                self.printGrammarInfo()
+        
+        # 缓存命中时直接使用缓存的分析表，未命中时下面构建出的分析表写入缓存
+        self.cacheHit = False
+        if cacheDir:
+            print("\n尝试从缓存载入分析表...")
+            self.loadCachedTables('auto', cacheDir)
+        
+        # 从弱到强依次尝试各分析方法，使用第一个无冲突的方法
+        modes = [] if self.cacheHit else list(MODE_NAMES)
+        if self.cacheHit:
+            name = MODE_NAMES[self.parseTable.mode]
+            print(f"已从缓存载入{name}分析表：状态数 {self.stateCount}，用时 {self.buildTime:.4f} 秒")
+            print(f"\n{name}分析表:")
             self.printActionGotoTable()
+        elif cacheDir:
+            print("缓存中没有该文法的分析表，重新构建")
+        
+        for index, mode in enumerate(modes):
+            name = MODE_NAMES[mode]
             
-        else:
-            print("\n该文法不是LR(0)文法，尝试SLR(1)分析...")
+            print(f"\n检查文法是否为{name}文法...")
+            hasConflict = self.buildTables(mode, workers)
             
-            print("\n计算First集和Follow集...")
-            self.computeFirstSets()
-            self.computeFollowSets()
-            
-            self.printFollowSets()
+            # 打印项目集族和Follow集
+            if mode == 'LR0':
+                self.printItemSets()
+            elif mode == 'SLR1':
+                self.printFollowSets()
             
-            print("\n检查文法是否为SLR(1)文法...")
-            slr1_conflicts = self.checkConflict(useSLR1=True)
+            print(f"{name}：状态数 {self.stateCount}，构建用时 {self.buildTime:.4f} 秒")
             
-            if not slr1_conflicts:
-                print("\n该文法是SLR(1)文法！")
-                print("\n构建SLR(1) Action表...")
-                self.buildActionTable(useSLR1=True)
-                
-                print("\nSLR(1)分析表:")
+            if not hasConflict:
+                print(f"\n该文法是{name}文法！")
+                print(f"\n{name}分析表:")
                 self.printActionGotoTable()
-                
+                self.printTableMemory()
+                if cacheDir:
+                    self.saveCachedTables('auto', cacheDir)
+                    print(f"\n分析表已写入缓存目录 {cacheDir}")
+                break
+            
+            if index + 1 < len(modes):
+                print(f"\n该文法不是{name}文法，尝试{MODE_NAMES[modes[index + 1]]}分析...")
             else:
-                print("\n该文法既不是LR(0)文法也不是SLR(1)文法，需要更强大的分析方法（如LR(1)或LALR(1)）。")
+                print(f"\n该文法不是{name}文法，无法构建无冲突的分析表。")
             
         choose = 0
         print("是否输入字符串（是的话输入1,否则输入0）：")
         choose=input();
 
-        if choose:
+        if choose.strip() == '1':
             # 在构建完分析表后，提示用户输入串进行分析
             print("\n请输入要分析的符号串（各符号之间用空格分隔，例如：id + id * id）：")
             input_string = input()
-            lr0parser.parseInput(input_string)
+            if self.parseInput(input_string, trace=True):
+                # 接受后再建一次语法树并打印，过大的树只显示开头部分
+                tree = self.parse(input_string, buildTree=True).tree
+                print("\n语法树：")
+                print(tree.format(limit=200))
             
         print("程序已退出！")
 
     # 分析输入串
-    def parseInput(self, input_string):
+    def parseInput(self, input_string, trace=False):
         """使用构建好的分析表对输入串进行语法分析
         
         参数:
             input_string: 要分析的输入串，各符号之间用空格分隔
+            trace: 是否输出调试信息和分析过程
             
         返回:
             是否接受该输入串
         """
+        return self.parse(input_string.split(), trace).accepted
+    
+    # 分析符号序列（库接口）
+    def parse(self, symbols, trace=False, buildTree=False):
+        """对符号序列进行语法分析
+        
+        不输出分析过程时使用编译后的分析表，输出分析过程时使用字典形式的分析表逐步打印
+        
+        参数:
+            symbols: 终结符序列（不含结束符#），也可以是以空格分隔的字符串
+            trace: 是否输出调试信息和分析过程
+            buildTree: 是否构建语法树，接受时结果的tree为lrtable.ParseTree（输出分析过程时不建树）
+            
+        返回:
+            ParseResult
+        """
+        if isinstance(symbols, str):
+            symbols = symbols.split()
+        
+        if trace:
+            return self.traceParse(list(symbols))
+        
+        if self.parseTable is None:
+            if not hasattr(self, 'actionTable'):
+                raise ValueError("请先构建分析表！")
+            self.compileTables()
+        if self.stats is None or buildTree:
+            return self.parseTable.parse(symbols, buildTree)
+
+        # 开启统计时改用计数的分析过程
+        symbols = symbols if isinstance(symbols, (list, tuple)) else list(symbols)
+        with self.stats.phase('parse'):
+            result, shifts, reduces = self.parseTable.parseCounted(symbols)
+        self.stats.count('parseInputs')
+        self.stats.count('parseTokens', len(symbols))
+        self.stats.count('parseShifts', shifts)
+        self.stats.count('parseReduces', reduces)
+        return result
+    
+    # 流式分析（库接口）
+    def parseStream(self, tokens):
+        """从任意迭代器逐个读取终结符进行分析，内存占用只与分析栈深度有关，见ParseTable.parseStream"""
+        if self.parseTable is None:
+            self.compileTables()
+        return self.parseTable.parseStream(tokens)
+    
+    # 流式分析文件（库接口）
+    def parseTokenFile(self, path, encoding='utf-8'):
+        """将整个文件视为一个以空白分隔的符号串，按块读取并流式分析"""
+        return self.parseStream(lrtable.readTokens(path, encoding))
+    
+    # 批量分析（库接口）
+    def parseBatch(self, inputs, workers=None, chunkSize=1000):
+        """用构建好的分析表在多个进程中分析大量输入，见lrtable.parseBatch
+        
+        参数:
+            inputs: 输入的可迭代对象，每个输入为终结符列表或以空格分隔的字符串
+            workers: 工作进程数，None为CPU核数，1表示在当前进程中分析
+            chunkSize: 每个任务包含的输入个数
+            
+        返回:
+            按输入顺序产生ParseResult的生成器
+        """
+        if self.parseTable is None:
+            self.compileTables()
+        return lrtable.parseBatch(self.parseTable, inputs, workers, chunkSize)
+    
+    # 批量分析文件中的输入（库接口）
+    def parseBatchFile(self, path, workers=None, chunkSize=1000, encoding='utf-8'):
+        """文件中每行一个输入串，其余同parseBatch"""
+        return self.parseBatch(lrtable.readInputs(path, encoding), workers, chunkSize)
+    
+    # 输出分析过程的语法分析
+    def traceParse(self, symbols):
+        """逐步打印状态栈、剩余输入和动作的语法分析，返回ParseResult"""
         # 检查是否已经构建了分析表
         if not hasattr(self, 'actionTable') or not hasattr(self, 'gotoTable'):
             print("错误：请先构建分析表！")
-            return False
+            return ParseResult(False, 0, symbols[0] if symbols else '#')
         
-        # 将输入串分割成符号列表，并添加结束符号
-        symbols = input_string.split()
-        symbols.append('#')
+        # 添加结束符号
+        symbols = symbols + ['#']
         
         # 打印调试信息
         print("\n调试信息：")
@@ -692,7 +2219,8 @@ class LR0Parser:
         if invalid_symbols:
             print(f"错误：输入中包含未定义的符号：{', '.join(invalid_symbols)}")
             print("有效的终结符有：{}".format(', '.join(sorted(self.terminals))))
-            return False
+            position = symbols.index(invalid_symbols[0])
+            return ParseResult(False, position, symbols[position])
         
         # 初始化分析栈和符号指针
         stack = [0]  # 状态栈，初始状态为0
@@ -712,15 +2240,17 @@ class LR0Parser:
             else:
                 action = None
             
-            # 打印当前步骤
+            # 打印当前步骤，剩余输入只显示开头若干个符号，避免每步拼接整个后缀
             state_stack_str = ' '.join(map(str, stack))
-            input_str = ' '.join(symbols[pointer:])
+            input_str = ' '.join(symbols[pointer:pointer + TRACE_WINDOW])
+            if len(symbols) - pointer > TRACE_WINDOW:
+                input_str += ' ...'
             
             # 根据动作类型执行相应操作
             if action is None:
                 print(f"{step:<5}{state_stack_str:<20}{input_str:<20}{'错误：无法识别的符号':<20}")
                 print("\n分析结果：拒绝接受该输入串！")
-                return False
+                return ParseResult(False, pointer, current_symbol)
             
             elif action[0] == 'shift':  # 移进
                 next_state = action[1]
@@ -752,16 +2282,48 @@ class LR0Parser:
                 else:
                     print(f"{step:<5}{state_stack_str:<20}{input_str:<20}{f'错误：无法找到GOTO({current_top}, {prod.left})':<20}")
                     print("\n分析结果：拒绝接受该输入串！")
-                    return False
+                    return ParseResult(False, pointer, current_symbol)
             
             elif action[0] == 'accept':  # 接受
                 print(f"{step:<5}{state_stack_str:<20}{input_str:<20}{'接受':<20}")
                 print("\n分析结果：成功接受该输入串！")
-                return True
+                return ParseResult(True)
             
             step += 1
 
 if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(description="LR(0)/SLR(1)/LALR(1)/LR(1)分析器")
+    argParser.add_argument("--cache", metavar="DIR", help="分析表缓存目录，文法未改变时直接载入上次构建的分析表")
+    argParser.add_argument("--workers", metavar="N", type=int, default=1,
+                           help="并行构造LR(0)项目集族的工作进程数，默认1（串行），0表示CPU核数")
+    argParser.add_argument("--stats", metavar="FILE", help="统计各阶段用时和计数，退出前打印并写入JSON文件")
+    argParser.add_argument("--stats-memory", action="store_true", help="统计时同时记录各阶段的峰值内存")
+    argParser.add_argument("--bypass-units", action="store_true",
+                           help="分析时跳过单产生式归约（如 E -> T），减少归约步数，语法树中仍保留这些结点")
+    argParser.add_argument("--reduce-grammar", action="store_true",
+                           help="构建前删除推导不出终结符串或从开始符号不可达的符号及其产生式")
+    argParser.add_argument("--dedupe", action="store_true", help="化简文法时同时删除重复的选择（需要--reduce-grammar）")
+    argParser.add_argument("--emit", metavar="FILE",
+                           help="构建成功后将分析器生成为独立的Python模块写入FILE，使用时不需要本程序")
+    args = argParser.parse_args()
+    
     lr0parser = LR0Parser()
-    lr0parser.run()
+    lr0parser.bypassUnits = args.bypass_units
+    if args.stats:
+        lr0parser.enableStats(memory=args.stats_memory)
+    lr0parser.run(cacheDir=args.cache, workers=args.workers or None,
+                  reduce=args.reduce_grammar, dedupe=args.dedupe)
+    
+    if args.emit:
+        if lr0parser.parseTable is None:
+            print("没有无冲突的分析表，未生成分析器模块")
+        else:
+            size = lr0parser.emitParser(args.emit)
+            print(f"分析器模块已写入 {args.emit}（{size} 字节）")
+    
+    if args.stats:
+        print("\n统计信息：")
+        print(lr0parser.stats.report())
+        lr0parser.stats.dump(args.stats)
+        print(f"统计信息已写入 {args.stats}")
     
@@ -0,0 +1,328 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# 分析器主程序的文件名含空格和括号，不能直接import，按路径载入
+# 注册到sys.modules中，并行构造项目集族时工作进程才能找到其中的函数
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+spec = importlib.util.spec_from_file_location("lrparser", os.path.join(HERE, "LR(0) and SLR(1).py"))
+lrparser = importlib.util.module_from_spec(spec)
+sys.modules["lrparser"] = lrparser
+spec.loader.exec_module(lrparser)
+
+# 结果文件格式版本，字段变化时加一
+RESULT_VERSION = 1
+
+
+# ---------------- 合成文法 ----------------
+
+# 深层表达式链
+def chainGrammar(depth, ops=3):
+    """E0 -> E0 o E1 | E1, ..., En -> ( E0 ) | id，共depth层优先级，每层ops个运算符"""
+    lines = []
+    for i in range(depth):
+        alternatives = [f"E{i} o{i}_{k} E{i + 1}" for k in range(ops)] + [f"E{i + 1}"]
+        lines.append(f"E{i} -> " + " | ".join(alternatives))
+    lines.append(f"E{depth} -> ( E0 ) | id")
+    return lines
+
+
+# 宽选择
+def wideGrammar(width):
+    """S -> X0 | ... | Xn，每个 Xi -> ti S | ti"""
+    lines = ["S -> " + " | ".join(f"X{i}" for i in range(width))]
+    lines += [f"X{i} -> t{i} S | t{i}" for i in range(width)]
+    return lines
+
+
+# 大量空产生式
+def epsilonGrammar(width):
+    """S -> A0 A1 ... An end，每个 Ai -> ai Ai | ε"""
+    lines = ["S -> " + " ".join(f"A{i}" for i in range(width)) + " end"]
+    lines += [f"A{i} -> a{i} A{i} | ε" for i in range(width)]
+    return lines
+
+
+# 接近实际程序设计语言规模的文法
+def languageGrammar(statements, levels, ops=2):
+    """由语句、表达式优先级、函数调用和参数表组成的类C语言文法
+
+    参数:
+        statements: 额外的关键字语句种类数
+        levels: 表达式的优先级层数
+        ops: 每层的运算符个数
+    """
+    lines = [
+        "Program -> DeclList StmtList",
+        "DeclList -> DeclList Decl | ε",
+        "Decl -> Type id ; | Type id ( ParamList ) Block",
+        "Type -> int | float | char | void",
+        "ParamList -> Params | ε",
+        "Params -> Params , Type id | Type id",
+        "Block -> { DeclList StmtList }",
+        "StmtList -> StmtList Stmt | ε",
+        "Stmt -> id = E0 ; | if ( E0 ) Stmt else Stmt | while ( E0 ) Stmt | "
+        "return E0 ; | Block | Call ;"
+        + "".join(f" | kw{i} ( ArgList ) Stmt" for i in range(statements)),
+        "Call -> id ( ArgList )",
+        "ArgList -> Args | ε",
+        "Args -> Args , E0 | E0",
+    ]
+    for i in range(levels):
+        alternatives = [f"E{i} op{i}_{k} E{i + 1}" for k in range(ops)] + [f"E{i + 1}"]
+        lines.append(f"E{i} -> " + " | ".join(alternatives))
+    lines.append(f"E{levels} -> ( E0 ) | id | num | Call | - E{levels}")
+    return lines
+
+
+# 含无用符号的文法
+def uselessGrammar(statements, levels, dead):
+    """languageGrammar 加上dead组无用符号：语句中引用、却推导不出终结符串的Ui，以及从开始符号不可达的Di"""
+    lines = languageGrammar(statements, levels)
+    for i in range(dead):
+        lines.append(f"Stmt -> loop{i} ( U{i} ) Stmt")
+        lines.append(f"U{i} -> U{i} , E0 | [ U{i} ]")
+        lines.append(f"D{i} -> D{i} dop{i} E0 | ( D{i} ) | Call | dnum{i}")
+    return lines
+
+
+# 生成器名称 -> (函数, 各规模的参数)
+GENERATORS = {
+    'chain': (chainGrammar, {'small': (8,), 'medium': (30,), 'large': (80,)}),
+    'wide': (wideGrammar, {'small': (50,), 'medium': (300,), 'large': (1000,)}),
+    'epsilon': (epsilonGrammar, {'small': (20,), 'medium': (80,), 'large': (200,)}),
+    'language': (languageGrammar, {'small': (5, 6), 'medium': (40, 12), 'large': (150, 20)}),
+    'useless': (uselessGrammar, {'small': (5, 6, 10), 'medium': (40, 12, 60), 'large': (150, 20, 200)}),
+}
+
+
+# ---------------- 输入串 ----------------
+
+# 每个非终结符推导出终结符串所需的最小推导树高度
+def derivationHeights(parser):
+    height = {}
+    changed = True
+    while changed:
+        changed = False
+        for prod in parser.productions[1:]:
+            if any(s in parser.nonterminals and s not in height for s in prod.right):
+                continue
+            h = 1 + max((height[s] for s in prod.right if s in parser.nonterminals), default=0)
+            if h < height.get(prod.left, h + 1):
+                height[prod.left] = h
+                changed = True
+    return height
+
+
+# 随机生成文法的句子
+def randomSentence(parser, rng, budget, height):
+    """从开始符号随机展开，符号数超过budget后只选择推导树最矮的产生式，保证一定终止
+
+    参数:
+        height: derivationHeights的结果
+    """
+    def cost(prodIndex):
+        right = parser.productions[prodIndex].right
+        return max((height.get(s, 0) for s in right if s in parser.nonterminals), default=0)
+
+    result = []
+    stack = [parser.startSymbol]
+    while stack:
+        symbol = stack.pop()
+        if symbol not in parser.nonterminals:
+            result.append(symbol)
+            continue
+        choices = parser.prodIndex[symbol]
+        if len(result) + len(stack) < budget:
+            prodIndex = rng.choice(choices)
+        else:
+            prodIndex = min(choices, key=cost)
+        stack.extend(reversed(parser.productions[prodIndex].right))
+    return result
+
+
+# ---------------- 计时 ----------------
+
+# 文法在所选分析方法下存在冲突，无法构建分析表
+class GrammarConflict(ValueError):
+    pass
+
+
+# 计时一次调用
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+# 对一个文法测量各阶段用时
+def measure(lines, mode, sentences, workers=1, reduce=False):
+    """在新的分析器上依次执行各阶段并计时
+
+    closure 单独对最终项目集族的全部核心重新求一次闭包（清空预测项目缓存），
+    buildItemSets 中也包含闭包的时间；reduce为真时先化简文法，见LR0Parser.reduceGrammar
+
+    返回:
+        (各阶段用时字典, 文法和项目集族的规模)
+
+    文法存在冲突时抛出GrammarConflict
+    """
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar("\n".join(lines))
+    phases = {}
+    if reduce:
+        phases['reduceGrammar'] = timed(parser.reduceGrammar)
+
+    phases['computeFirstSets'] = timed(parser.computeFirstSets)
+    phases['computeFollowSets'] = timed(parser.computeFollowSets)
+    phases['buildItemSets'] = timed(parser.buildItemSets, workers)
+
+    kernels = list(parser.kernelIndex)
+    parser.predictCache = {}
+    phases['closure'] = timed(lambda: [parser.closure(kernel) for kernel in kernels])
+
+    if mode == 'LALR1':
+        phases['computeLALRLookaheads'] = timed(parser.computeLALRLookaheads)
+    conflict = [None]
+    phases['checkConflict'] = timed(lambda: conflict.__setitem__(0, parser.checkConflict(mode=mode)))
+    if conflict[0]:
+        raise GrammarConflict(f"文法在{lrparser.MODE_NAMES[mode]}下存在冲突")
+    phases['buildActionTable'] = timed(parser.buildActionTable, mode=mode)
+    phases['compileTables'] = timed(parser.compileTables, mode)
+
+    # 分析吞吐量：逐个输入串调用parseInput
+    tokens = sum(len(sentence) for sentence in sentences)
+    texts = [" ".join(sentence) for sentence in sentences]
+    accepted = [0]
+
+    def parseAll():
+        accepted[0] = sum(parser.parseInput(text) for text in texts)
+
+    phases['parseInput'] = timed(parseAll)
+    if accepted[0] != len(texts):
+        raise AssertionError("生成的句子未被全部接受")
+
+    stats = {
+        'productions': len(parser.productions),
+        'terminals': len(parser.terminals),
+        'nonterminals': len(parser.nonterminals),
+        'states': len(parser.itemSets),
+        'items': sum(len(items) for items in parser.itemSets),
+        'parseTokens': tokens,
+        'reduced': reduce,
+    }
+    return phases, stats
+
+
+# 运行一组基准
+def runBenchmarks(names, sizes, repeat, mode, parseTokens, workers, seed, reduce=False):
+    results = []
+    for name in names:
+        generator, params = GENERATORS[name]
+        for size in sizes:
+            lines = generator(*params[size])
+
+            # 用同一组随机句子测量所有重复，从化简后的文法生成，不会展开推导不出终结符串的符号
+            probe = lrparser.LR0Parser(verbose=False)
+            probe.loadGrammar("\n".join(lines))
+            probe.reduceGrammar()
+            rng = random.Random(seed)
+            height = derivationHeights(probe)
+            sentences = []
+            total = 0
+            while total < parseTokens:
+                sentence = randomSentence(probe, rng, 200, height)
+                sentences.append(sentence)
+                total += len(sentence)
+
+            # 多次运行，每个阶段取最短用时；有冲突时记录下来，继续测试其余文法
+            best = None
+            try:
+                for _ in range(repeat):
+                    phases, stats = measure(lines, mode, sentences, workers, reduce)
+                    best = phases if best is None else {k: min(best[k], v) for k, v in phases.items()}
+            except GrammarConflict as e:
+                results.append({'grammar': name, 'size': size, 'params': list(params[size]), 'mode': mode,
+                                'conflict': True})
+                print(f"{name:<10}{size:<8}冲突：{e}")
+                continue
+
+            best['parseTokensPerSecond'] = stats['parseTokens'] / best['parseInput'] if best['parseInput'] else 0.0
+            results.append({
+                'grammar': name,
+                'size': size,
+                'params': list(params[size]),
+                'mode': mode,
+                **stats,
+                'seconds': best,
+            })
+            print(f"{name:<10}{size:<8}{stats['productions']:>7} 产生式{stats['states']:>8} 状态  "
+                  f"项目集族 {best['buildItemSets']:.4f}s  分析 {best['parseTokensPerSecond'] / 1e6:.2f} M符号/s")
+    return results
+
+
+# 与之前的结果对比
+def compareResults(results, baselinePath):
+    """按 (文法, 规模) 对应，打印各阶段用时与基线的比值，大于1表示变慢"""
+    with open(baselinePath, encoding='utf-8') as f:
+        baseline = {(r['grammar'], r['size']): r for r in json.load(f)['results']}
+
+    print("\n与基线对比（当前用时 / 基线用时，分析按每个符号的用时）：")
+    for result in results:
+        old = baseline.get((result['grammar'], result['size']))
+        if old is None:
+            print(f"  {result['grammar']}/{result['size']}: 基线中没有该项")
+            continue
+        if result.get('conflict') or old.get('conflict'):
+            print(f"  {result['grammar']}/{result['size']}: 存在冲突，无法对比")
+            continue
+        ratios = []
+        for phase, seconds in result['seconds'].items():
+            if phase == 'parseTokensPerSecond' or not old['seconds'].get(phase):
+                continue
+            ratio = seconds / old['seconds'][phase]
+            if phase == 'parseInput':
+                ratio *= old['parseTokens'] / result['parseTokens']
+            ratios.append(f"{phase}={ratio:.2f}")
+        print(f"  {result['grammar']}/{result['size']}: " + ", ".join(ratios))
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(description="LR分析器构建与分析各阶段的基准测试")
+    argParser.add_argument("--grammars", nargs="+", choices=list(GENERATORS), default=list(GENERATORS),
+                           help="要测试的文法生成器")
+    argParser.add_argument("--sizes", nargs="+", choices=['small', 'medium', 'large'], default=['small', 'medium'],
+                           help="文法规模")
+    argParser.add_argument("--mode", choices=['LR0', 'SLR1', 'LALR1'], default='LALR1', help="分析方法")
+    argParser.add_argument("--repeat", type=int, default=3, help="重复次数，每个阶段取最短用时")
+    argParser.add_argument("--parse-tokens", type=int, default=100000, help="测量分析吞吐量的输入符号总数")
+    argParser.add_argument("--workers", type=int, default=1, help="构造项目集族的工作进程数")
+    argParser.add_argument("--reduce", action="store_true", help="构建前化简文法，与不化简的结果对比可得化简节省的用时")
+    argParser.add_argument("--seed", type=int, default=0, help="生成输入串的随机种子")
+    argParser.add_argument("--output", metavar="FILE", help="把结果写入JSON文件")
+    argParser.add_argument("--compare", metavar="FILE", help="与之前保存的JSON结果对比")
+    args = argParser.parse_args()
+
+    results = runBenchmarks(args.grammars, args.sizes, args.repeat, args.mode,
+                            args.parse_tokens, args.workers, args.seed, args.reduce)
+
+    if args.output:
+        report = {
+            'version': RESULT_VERSION,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+    if args.compare:
+        compareResults(results, args.compare)
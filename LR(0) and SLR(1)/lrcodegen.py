@@ -0,0 +1,210 @@
+import os
+import sys
+from array import array
+
+from lrtable import ParseTable, compactArray
+
+
+# 生成独立的分析器模块
+# 生成的模块只依赖标准库的array，不需要LR0Parser和lrtable，导入时只需把几个bytes常量转成数组。
+# 与ParseTable相比，驱动程序按该文法特化：
+#   1. Action表和Goto表合并为每行 终结符数+非终结符数 列的一张表，
+#      状态直接存为其所在行的起始下标，查表时不需要乘法
+#   2. 每个产生式的Goto列号（终结符数+左部编号）预先算好
+#   3. 行宽、结束符编号等都作为字面量写入代码
+# 表项编码与ParseTable相同，只是移进目标、Goto目标都换成了行起始下标；
+# 跳过单产生式归约时（见ParseTable.bypassUnitReductions）同样生效
+
+# 每行bytes字面量的字节数
+BYTES_PER_LINE = 48
+
+HEADER = '''\
+# 由lrcodegen根据文法自动生成，请勿手工修改
+# 分析方法：{mode}  状态数：{states}  终结符：{terminalCount}  非终结符：{nonterminalCount}  产生式：{productionCount}
+import sys
+from array import array
+
+
+# 由小端字节串还原整型数组
+def _array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+TERMINALS = {terminals!r}
+NONTERMINALS = {nonterminals!r}
+PRODUCTIONS = {productions!r}
+# 输入符号 -> 编号，不含结束符：输入中的{endSymbol}按未定义的符号处理
+TERMINAL_IDS = {{symbol: i for i, symbol in enumerate(TERMINALS) if symbol != {endSymbol!r}}}
+
+'''
+
+DRIVER = '''
+
+# 语法分析结果，可直接当作布尔值使用
+class ParseResult:
+    __slots__ = ('accepted', 'errorPosition', 'errorSymbol')
+
+    def __init__(self, accepted, errorPosition=-1, errorSymbol=None):
+        self.accepted = accepted            # 是否接受该输入串
+        self.errorPosition = errorPosition  # 出错的输入符号下标，接受时为-1
+        self.errorSymbol = errorSymbol      # 出错的输入符号，在输入结束处出错时为#
+
+    def __bool__(self):
+        return self.accepted
+
+    def __repr__(self):
+        if self.accepted:
+            return "ParseResult(accepted=True)"
+        return f"ParseResult(accepted=False, errorPosition={{self.errorPosition}}, errorSymbol={{self.errorSymbol!r}})"
+
+
+# 分析输入
+def parse(symbols):
+    """对终结符序列进行语法分析，也可以是以空格分隔的字符串或任意迭代器（逐个读取）
+
+    返回:
+        ParseResult
+    """
+    if isinstance(symbols, str):
+        symbols = symbols.split()
+    ids = TERMINAL_IDS
+    table = TABLE
+    columns = GOTO_COLUMNS
+    lengths = PROD_LENGTH
+    unitTargets = UNIT_TARGETS
+
+    iterator = iter(symbols)
+    stack = [0]
+    state = 0
+    position = 0
+    symbol = next(iterator, None)
+    token = {end} if symbol is None else ids.get(symbol, -1)
+
+    while True:
+        if token < 0:    # 未定义的符号
+            return ParseResult(False, position, symbol)
+
+        code = table[state + token]
+
+        if code > 0:    # 移进
+            state = code - 1
+            stack.append(state)
+            position += 1
+            symbol = next(iterator, None)
+            token = {end} if symbol is None else ids.get(symbol, -1)
+
+        elif code < -1:    # 规约
+            p = -code - 1
+            length = lengths[p]
+            if length:
+                del stack[-length:]
+            state = table[stack[-1] + columns[p]]
+            if state < 0:
+                if state == -1:
+                    return ParseResult(False, position, '#' if symbol is None else symbol)
+                state = unitTargets[token - state - 2]    # 跳过单产生式归约链
+            stack.append(state)
+
+        elif code == -1:    # 接受
+            return ParseResult(True)
+
+        else:    # 出错
+            return ParseResult(False, position, '#' if symbol is None else symbol)
+
+
+# 判断是否接受
+def accepts(symbols):
+    return parse(symbols).accepted
+'''
+
+
+# 整型数组的字面量
+def arrayLiteral(name, values):
+    """生成 NAME = _array('h', b'...') 形式的代码，选用能容纳所有取值的最小类型，长字节串分行书写"""
+    data = compactArray(values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    raw = data.tobytes()
+    if len(raw) <= BYTES_PER_LINE:
+        return f"{name} = _array({data.typecode!r}, {raw!r})\n"
+    lines = [f"    {raw[i:i + BYTES_PER_LINE]!r}\n" for i in range(0, len(raw), BYTES_PER_LINE)]
+    return f"{name} = _array({data.typecode!r}, (\n" + ''.join(lines) + "))\n"
+
+
+# 合并的分析表
+def mergedTable(table):
+    """将Action表和Goto表合并为每行 终结符数+非终结符数 列的一维表，状态换成行起始下标
+
+    返回:
+        (合并的表, 每个产生式的Goto列号, 换算后的unitTargets或None)
+    """
+    width = len(table.terminals)
+    ntWidth = len(table.nonterminals)
+    rowWidth = width + ntWidth
+    goto = table.goto if table.unitGoto is None else table.unitGoto
+
+    merged = array('i', [ParseTable.ERROR]) * (table.stateCount * rowWidth)
+    for state in range(table.stateCount):
+        base = state * rowWidth
+        for t in range(width):
+            code = table.action[state * width + t]
+            merged[base + t] = (code - 1) * rowWidth + 1 if code > 0 else code
+        for n in range(ntWidth):
+            target = goto[state * ntWidth + n]
+            merged[base + width + n] = target * rowWidth if target >= 0 else target
+
+    columns = [width + left for left in table.prodLeft]
+    unitTargets = None
+    if table.unitGoto is not None:
+        unitTargets = [target * rowWidth for target in table.unitTargets]
+    return merged, columns, unitTargets
+
+
+# 生成模块源代码
+def generateSource(table):
+    """由编译后的分析表生成独立分析器模块的源代码
+
+    参数:
+        table: ParseTable，其符号表和产生式原样写入模块
+
+    返回:
+        源代码字符串
+    """
+    merged, columns, unitTargets = mergedTable(table)
+    parts = [HEADER.format(
+        mode=table.mode or '未知',
+        states=table.stateCount,
+        terminalCount=len(table.terminals),
+        nonterminalCount=len(table.nonterminals),
+        productionCount=len(table.prodLength),
+        terminals=tuple(table.terminals),
+        nonterminals=tuple(table.nonterminals),
+        productions=tuple(table.productions),
+        endSymbol=ParseTable.END,
+    )]
+    parts.append(arrayLiteral('TABLE', merged))
+    parts.append(arrayLiteral('GOTO_COLUMNS', columns))
+    parts.append(arrayLiteral('PROD_LENGTH', table.prodLength))
+    parts.append(arrayLiteral('UNIT_TARGETS', unitTargets) if unitTargets is not None else "UNIT_TARGETS = None\n")
+    parts.append(DRIVER.format(end=table.terminalIds[ParseTable.END]))
+    return ''.join(parts)
+
+
+# 写入模块文件
+def writeModule(table, path):
+    """生成独立分析器模块并写入path，先写临时文件再替换
+
+    返回:
+        写入的字节数
+    """
+    source = generateSource(table).encode('utf-8')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'wb') as f:
+        f.write(source)
+    os.replace(temp, path)
+    return len(source)
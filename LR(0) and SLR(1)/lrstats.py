@@ -0,0 +1,119 @@
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# 构建和分析过程的统计信息
+# phases   阶段名 -> {'calls': 调用次数, 'seconds': 累计用时, 'peakMemory': 峰值内存（字节，仅memory=True时）}
+#          峰值内存为阶段执行期间新分配内存的最大值，即峰值减去进入阶段时已分配的内存
+# counters 计数器名 -> 累计值，如求闭包次数、创建的项目数、移进/归约次数
+# 阶段可以嵌套（如buildTables中包含buildItemSets），外层阶段的用时和峰值内存包含内层阶段
+class Stats:
+    def __init__(self, memory=False):
+        self.memory = memory    # 是否用tracemalloc记录各阶段的峰值内存，会明显拖慢构建
+        self.phases = {}
+        self.counters = {}
+        self.active = []        # 正在进行的阶段，每项为 [阶段名, 已观测到的峰值内存, 进入时的内存]
+        self.tracing = False    # tracemalloc是否由本对象开启，最外层阶段结束时关闭
+
+    # 计时一个阶段
+    @contextmanager
+    def phase(self, name):
+        """用法：with stats.phase('buildItemSets'): ...，同名阶段的调用次数和用时累加"""
+        current = 0
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            # 重置峰值前先把到目前为止的峰值记到外层阶段上
+            current, peak = tracemalloc.get_traced_memory()
+            if self.active:
+                frame = self.active[-1]
+                frame[1] = max(frame[1], peak)
+            tracemalloc.reset_peak()
+        frame = [name, current, current]
+        self.active.append(frame)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.active.pop()
+            entry = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            if self.memory:
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                entry['peakMemory'] = max(entry.get('peakMemory', 0), peak - frame[2])
+                if self.active:
+                    self.active[-1][1] = max(self.active[-1][1], peak)
+                elif self.tracing:
+                    tracemalloc.stop()
+                    self.tracing = False
+
+    # 累加计数器
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # 清空统计
+    def reset(self):
+        self.phases = {}
+        self.counters = {}
+
+    # 转换为可序列化的字典
+    def toDict(self):
+        """返回 {'phases': ..., 'counters': ..., 'derived': ...}，derived为由计数器算出的比值"""
+        derived = {}
+        tokens = self.counters.get('parseTokens', 0)
+        if tokens:
+            derived['shiftsPerToken'] = self.counters.get('parseShifts', 0) / tokens
+            derived['reducesPerToken'] = self.counters.get('parseReduces', 0) / tokens
+        states = self.counters.get('closureCalls', 0)
+        if states:
+            derived['itemsPerClosure'] = self.counters.get('itemsCreated', 0) / states
+        if self.memory:
+            derived['peakMemory'] = max((p.get('peakMemory', 0) for p in self.phases.values()), default=0)
+        return {
+            'phases': {name: dict(entry) for name, entry in self.phases.items()},
+            'counters': dict(self.counters),
+            'derived': derived,
+        }
+
+    # 写入JSON文件
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.toDict(), f, ensure_ascii=False, indent=2)
+
+    # 格式化为可打印的文本
+    def report(self):
+        data = self.toDict()
+        lines = ["阶段用时："]
+        for name, entry in data['phases'].items():
+            line = f"  {name:<24}{entry['calls']:>6} 次 {entry['seconds']:>10.4f} 秒"
+            if 'peakMemory' in entry:
+                line += f"  峰值内存 {entry['peakMemory'] / 1024:.1f} KiB"
+            lines.append(line)
+        lines.append("计数：")
+        for name, value in data['counters'].items():
+            lines.append(f"  {name:<24}{value:>12}")
+        for name, value in data['derived'].items():
+            lines.append(f"  {name:<24}{value:>12.2f}" if isinstance(value, float) else f"  {name:<24}{value:>12}")
+        return "\n".join(lines)
+
+
+# 把方法的执行记为一个阶段
+def instrumented(name):
+    """方法装饰器：对象的stats属性为Stats时在 stats.phase(name) 中执行，为None时直接调用，
+    未开启统计时只多一次属性判断"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = self.stats
+            if stats is None:
+                return method(self, *args, **kwargs)
+            with stats.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
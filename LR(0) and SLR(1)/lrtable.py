@@ -0,0 +1,1035 @@
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+
+# 分析表缓存文件格式
+# 文件头：魔数、格式版本、保留位、文法哈希(sha256)、数据长度、数据的CRC32
+# 数据区：JSON元数据（符号表、产生式、分析方法、含显式出错表项的状态），之后依次为
+#         prodLeft、prodLength、action、goto 四个小端int32数组，每个数组前有元素个数
+MAGIC = b'LRTB'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sHH32sII')
+COUNT = struct.Struct('<I')
+NO_HASH = bytes(32)    # 不与文法绑定的表（如传给工作进程的）使用全零哈希
+
+
+# 选择能容纳所有取值的最小数组类型
+def compactArray(values):
+    values = list(values)
+    low = min(values, default=0)
+    high = max(values, default=0)
+    for typecode in ('b', 'h', 'i'):
+        bits = array(typecode).itemsize * 8 - 1
+        if -(1 << bits) <= low and high < (1 << bits):
+            return array(typecode, values)
+    return array('q', values)
+
+
+# 估算由字典、列表、元组组成的对象的内存占用（字节），共享的字符串和整数不计入
+def deepSizeof(obj, seen=None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, (str, int, float, type(None))):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deepSizeof(key, seen) + deepSizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += deepSizeof(value, seen)
+    return size
+
+
+# 语法分析结果，可直接当作布尔值使用
+class ParseResult:
+    def __init__(self, accepted, errorPosition=-1, errorSymbol=None, tree=None):
+        self.accepted = accepted            # 是否接受该输入串
+        self.errorPosition = errorPosition  # 出错的输入符号下标，接受时为-1
+        self.errorSymbol = errorSymbol      # 出错的输入符号，在输入结束处出错时为#
+        self.tree = tree                    # 要求建树且接受时为ParseTree，否则为None
+
+    def __bool__(self):
+        return self.accepted
+
+    def __repr__(self):
+        if self.accepted:
+            return "ParseResult(accepted=True)"
+        return f"ParseResult(accepted=False, errorPosition={self.errorPosition}, errorSymbol={self.errorSymbol!r})"
+
+
+# 语法树
+# 结点不是单独的Python对象，而是存放在几个并行的整型数组中（arena），结点用下标表示：
+#     prods[n]     内部结点为归约所用的产生式编号；叶子为 -(终结符编号+1)
+#     offsets[n]   内部结点的孩子在children数组中的起始位置，孩子个数即产生式右部长度；叶子为-1
+#     tokens[n]    叶子为对应输入符号的下标；内部结点为其覆盖的第一个输入符号的下标
+# 孩子按归约的先后顺序追加，所以孩子的编号总小于父结点，根结点是最后一个结点。
+# 每个结点只占十几个字节，百万符号的输入也可以建树；遍历都是按需产生结点的生成器。
+class ParseTree:
+    def __init__(self, table, prods, offsets, tokens, children):
+        self.table = table          # 提供符号名和产生式的分析表
+        self.prods = prods
+        self.offsets = offsets
+        self.tokens = tokens
+        self.children = children
+        self.root = len(prods) - 1  # 根结点，即开始符号对应的结点
+
+    def __len__(self):
+        return len(self.prods)
+
+    # 是否为叶子（终结符）结点
+    def isLeaf(self, node):
+        return self.prods[node] < 0
+
+    # 结点的文法符号
+    def symbol(self, node):
+        prod = self.prods[node]
+        if prod < 0:
+            return self.table.terminals[-prod - 1]
+        return self.table.nonterminals[self.table.prodLeft[prod]]
+
+    # 内部结点归约所用的产生式编号，叶子返回-1
+    def production(self, node):
+        prod = self.prods[node]
+        return prod if prod >= 0 else -1
+
+    # 叶子对应的输入符号下标，内部结点为覆盖的第一个输入符号下标
+    def token(self, node):
+        return self.tokens[node]
+
+    # 结点的孩子
+    def childrenOf(self, node):
+        """返回孩子结点编号的数组，叶子和ε产生式的结点返回空数组"""
+        prod = self.prods[node]
+        if prod < 0:
+            return self.children[:0]
+        offset = self.offsets[node]
+        return self.children[offset:offset + self.table.prodLength[prod]]
+
+    # 先序遍历
+    def walk(self, node=None):
+        """按先序逐个产生 (结点, 深度)，用显式栈实现，树再深也不会递归溢出"""
+        prods = self.prods
+        offsets = self.offsets
+        children = self.children
+        prodLength = self.table.prodLength
+        stack = [(self.root if node is None else node, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            prod = prods[node]
+            if prod >= 0:
+                offset = offsets[node]
+                for i in range(offset + prodLength[prod] - 1, offset - 1, -1):
+                    stack.append((children[i], depth + 1))
+
+    # 叶子序列
+    def leaves(self, node=None):
+        """从左到右产生子树中的叶子结点，即归约前的输入符号"""
+        prods = self.prods
+        for n, _ in self.walk(node):
+            if prods[n] < 0:
+                yield n
+
+    # 缩进形式的文本
+    def lines(self, node=None, indent='  '):
+        """逐行产生缩进形式的树，内部结点显示所用产生式，叶子显示终结符及其输入下标"""
+        productions = self.table.productions
+        for n, depth in self.walk(node):
+            prod = self.prods[n]
+            if prod < 0:
+                yield f"{indent * depth}{self.symbol(n)}  [{self.tokens[n]}]"
+            elif productions:
+                left, right = productions[prod]
+                yield f"{indent * depth}{left} -> {' '.join(right) if right else 'ε'}"
+            else:
+                yield f"{indent * depth}{self.symbol(n)}"
+
+    # 格式化输出
+    def format(self, node=None, limit=None):
+        """返回缩进形式的树，limit指定最多输出的行数"""
+        lines = list(islice(self.lines(node), limit))
+        if limit is not None and len(lines) == limit and len(self) > limit:
+            lines.append('...')
+        return '\n'.join(lines)
+
+    # 内存占用
+    def memoryFootprint(self):
+        """返回各数组的内存占用（字节）"""
+        return sum(sys.getsizeof(a) for a in (self.prods, self.offsets, self.tokens, self.children))
+
+
+# 编译后的LR分析表
+# 终结符、非终结符都编号为整数，Action表和Goto表存为一维整型数组，
+# 分析时只需下标访问数组，不需要字典查找和字符串比较。
+#
+# Action表项编码：
+#     0       出错
+#     n+1     移进到状态n（正数）
+#     -(p+1)  按产生式p归约（负数）
+#     -1      接受，即按增广产生式0归约
+# Goto表项为目标状态，-1 表示没有转移
+# 跳过单产生式归约后（见bypassUnitReductions），分析用的unitGoto中小于-1的表项 -(k+2)
+# 表示目标状态与向前看符号有关，为 unitTargets[k + 终结符编号]
+class ParseTable:
+    ERROR = 0
+    ACCEPT = -1
+    END = '#'   # 输入结束符
+
+    def __init__(self, terminals, nonterminals, prodLeft, prodLength, action, goto, productions=(), mode='',
+                 explicitErrors=()):
+        # 编号 -> 符号 以及 符号 -> 编号
+        self.terminals = list(terminals)
+        self.nonterminals = list(nonterminals)
+        self.terminalIds = {t: i for i, t in enumerate(self.terminals)}
+        self.nonterminalIds = {nt: i for i, nt in enumerate(self.nonterminals)}
+
+        # 输入符号 -> 编号，不含结束符#：输入中的#按未定义的符号处理，结束符只在输入之后追加
+        self.inputIds = {t: i for t, i in self.terminalIds.items() if t != ParseTable.END}
+
+        # 产生式编号 -> 左部非终结符编号、右部长度，以及产生式本身 (左部, 右部符号元组)
+        self.prodLeft = self.intArray(prodLeft)
+        self.prodLength = self.intArray(prodLength)
+        self.productions = [(left, tuple(right)) for left, right in productions]
+
+        # 按状态行优先存放的一维表
+        self.action = self.intArray(action)
+        self.goto = self.intArray(goto)
+        self.stateCount = len(self.action) // max(len(self.terminals), 1)
+        self.mode = mode    # 构建该表所用的分析方法
+
+        # 含显式出错表项（由 %nonassoc 置为出错）的状态：这些空表项不能被默认归约代替
+        self.explicitErrors = frozenset(explicitErrors)
+
+        # 跳过单产生式归约的Goto表和按向前看符号的目标状态，未启用时为None
+        self.unitGoto = None
+        self.unitTargets = None
+
+    # 整型数组，从缓存文件映射的memoryview直接使用，不复制
+    @staticmethod
+    def intArray(values):
+        if isinstance(values, (array, memoryview)):
+            return values
+        return array('i', values)
+
+    # Action表项编码
+    @staticmethod
+    def encodeAction(action):
+        """将 ('shift', n) / ('reduce', p) / ('accept', None) 编码为整数"""
+        kind, value = action
+        if kind == 'shift':
+            return value + 1
+        if kind == 'reduce':
+            return -(value + 1)
+        return ParseTable.ACCEPT
+
+    # Action表项解码
+    @staticmethod
+    def decodeAction(code):
+        """将整数表项解码为 ('shift', n) / ('reduce', p) / ('accept', None)，出错时返回None"""
+        if code > 0:
+            return ('shift', code - 1)
+        if code == ParseTable.ACCEPT:
+            return ('accept', None)
+        if code < 0:
+            return ('reduce', -code - 1)
+        return None
+
+    # 查询Action表
+    def getAction(self, state, terminal):
+        """按符号名查询Action表，返回解码后的动作，出错时返回None"""
+        column = self.terminalIds.get(terminal)
+        if column is None:
+            return None
+        return self.decodeAction(self.action[state * len(self.terminals) + column])
+
+    # 查询Goto表
+    def getGoto(self, state, nonterminal):
+        """按符号名查询Goto表，没有转移时返回None"""
+        column = self.nonterminalIds.get(nonterminal)
+        if column is None:
+            return None
+        target = self.goto[state * len(self.nonterminals) + column]
+        return target if target >= 0 else None
+
+    # 内存占用
+    def memoryFootprint(self):
+        """返回各数组及符号表的内存占用（字节）"""
+        arrays = [self.action, self.goto, self.prodLeft, self.prodLength]
+        if self.unitGoto is not None:
+            arrays += [self.unitGoto, self.unitTargets]
+        return sum(sys.getsizeof(a) for a in arrays) + deepSizeof(self.terminals) + deepSizeof(self.nonterminals)
+
+    # 还原为字典形式的分析表
+    def toDicts(self):
+        """还原为LR0Parser使用的 actionTable 和 gotoTable 字典
+
+        返回:
+            (actionTable, gotoTable)
+        """
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+        actionTable = {}
+        gotoTable = {}
+        for state in range(self.stateCount):
+            row = actionTable[state] = {}
+            for t, symbol in enumerate(self.terminals):
+                code = self.action[state * width + t]
+                if code != ParseTable.ERROR:
+                    row[symbol] = self.decodeAction(code)
+            for n, symbol in enumerate(self.nonterminals):
+                target = self.goto[state * ntWidth + n]
+                if target >= 0:
+                    gotoTable[(state, symbol)] = target
+        return actionTable, gotoTable
+
+    # 序列化
+    def toBytes(self, grammarHash=NO_HASH):
+        """序列化为缓存文件格式
+
+        参数:
+            grammarHash: 文法内容的sha256摘要（32字节）
+
+        返回:
+            文件内容（bytes）
+        """
+        meta = json.dumps({
+            'mode': self.mode,
+            'terminals': self.terminals,
+            'nonterminals': self.nonterminals,
+            'productions': self.productions,
+            'explicitErrors': sorted(self.explicitErrors),
+        }, ensure_ascii=False).encode('utf-8')
+        meta += b' ' * (-len(meta) % 4)    # 对齐到4字节，便于数组直接映射
+
+        parts = [COUNT.pack(len(meta)), meta]
+        for values in (self.prodLeft, self.prodLength, self.action, self.goto):
+            data = array('i', values)
+            if sys.byteorder == 'big':
+                data.byteswap()
+            parts.append(COUNT.pack(len(data)))
+            parts.append(data.tobytes())
+        payload = b''.join(parts)
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, grammarHash, len(payload), zlib.crc32(payload))
+        return header + payload
+
+    # 反序列化
+    @classmethod
+    def fromBuffer(cls, buffer, grammarHash=NO_HASH):
+        """从缓存文件内容构造分析表
+
+        小端机器上数组直接以memoryview引用buffer，不复制数据
+
+        参数:
+            buffer: 文件内容（bytes等支持缓冲区协议的对象）
+            grammarHash: 期望的文法哈希
+
+        返回:
+            分析表；魔数、版本、哈希不符，或数据损坏时返回None
+        """
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            return None
+        magic, version, _, storedHash, length, crc = HEADER.unpack_from(view)
+        payload = view[HEADER.size:]
+        if magic != MAGIC or version != FORMAT_VERSION or storedHash != grammarHash:
+            return None
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return None
+
+        try:
+            offset = 0
+            (metaLength,) = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            meta = json.loads(bytes(payload[offset:offset + metaLength]).decode('utf-8'))
+            offset += metaLength
+
+            arrays = []
+            for _ in range(4):
+                (count,) = COUNT.unpack_from(payload, offset)
+                offset += COUNT.size
+                data = payload[offset:offset + count * 4]
+                offset += count * 4
+                if sys.byteorder == 'little' and array('i').itemsize == 4:
+                    arrays.append(data.cast('i'))
+                else:
+                    values = array('i')
+                    values.frombytes(data)
+                    if sys.byteorder == 'big':
+                        values.byteswap()
+                    arrays.append(values)
+        except (ValueError, KeyError, struct.error):
+            return None
+
+        return cls(meta['terminals'], meta['nonterminals'], *arrays,
+                   productions=meta['productions'], mode=meta['mode'],
+                   explicitErrors=meta['explicitErrors'])
+
+    # 保存到文件
+    def save(self, path, grammarHash):
+        """写入缓存文件，先写临时文件再替换，避免留下写了一半的文件"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(self.toBytes(grammarHash))
+        os.replace(temp, path)
+
+    # 从文件载入
+    @classmethod
+    def load(cls, path, grammarHash):
+        """载入缓存文件
+
+        整个文件一次读入内存后即关闭，不保留映射或句柄，
+        否则Windows上无法用os.replace覆盖正在使用的缓存文件
+
+        返回:
+            分析表；文件不存在、过期或损坏时返回None
+        """
+        try:
+            with open(path, 'rb') as f:
+                buffer = f.read()
+        except OSError:
+            return None
+        return cls.fromBuffer(buffer, grammarHash)
+
+    # 跳过单产生式归约
+    def bypassUnitReductions(self):
+        """预先算出单产生式归约链的终点，分析时不再逐个执行这些归约
+
+        在状态q按非终结符B转移到s后，若s在向前看符号t上按右部长度为1的产生式 A->B 归约，
+        驱动程序会弹出s、回到q再按A转移，可能又遇到下一个单产生式归约（如 E->T、T->F）。
+        这条链只取决于 (q, B, t)，因此对每个这样的Goto表项按t预先求出链的终点，
+        分析时转移后直接到达终点，省去中间的归约步骤。
+        接受的输入串、出错位置与不跳过时完全相同，只是不再为这些归约建结点，
+        所以建语法树的parseTree仍使用原来的Goto表，保留单产生式结点
+
+        返回:
+            改写的Goto表项个数
+        """
+        action = self.action
+        goto = self.goto
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        # 每个状态中按长度为1的产生式归约的终结符
+        unitCodes = {-(p + 1) for p in range(1, len(prodLength)) if prodLength[p] == 1}
+        unitColumns = {}
+        for state in range(self.stateCount):
+            row = action[state * width:(state + 1) * width]
+            columns = [t for t, code in enumerate(row) if code in unitCodes]
+            if columns:
+                unitColumns[state] = columns
+
+        unitGoto = array('i', goto)
+        targets = array('i')
+        for index, first in enumerate(goto):
+            columns = unitColumns.get(first)
+            if columns is None:
+                continue
+
+            # 沿归约链走到不再是单产生式归约的状态，链的长度不超过非终结符个数
+            base = index - index % ntWidth
+            row = None
+            for t in columns:
+                state = first
+                for _ in range(ntWidth):
+                    code = action[state * width + t]
+                    if code not in unitCodes:
+                        break
+                    target = goto[base + prodLeft[-code - 1]]
+                    if target < 0:
+                        break
+                    state = target
+                if state != first:
+                    if row is None:
+                        row = [first] * width
+                    row[t] = state
+
+            if row is not None:
+                unitGoto[index] = -len(targets) - 2
+                targets.extend(row)
+
+        self.unitGoto = unitGoto
+        self.unitTargets = targets
+        return sum(1 for code in unitGoto if code < -1)
+
+    # 压缩分析表
+    def compress(self):
+        """生成压缩存储的分析表，见CompressedParseTable"""
+        return CompressedParseTable(self)
+
+    # 将输入符号编码为终结符编号
+    def encode(self, symbols):
+        """将符号序列编码为终结符编号数组，并追加结束符#
+
+        未定义的符号（包括输入中的#）编码为-1
+        """
+        tokens = array('i', [self.inputIds.get(symbol, -1) for symbol in symbols])
+        tokens.append(self.terminalIds[ParseTable.END])
+        return tokens
+
+    # 分析输入串
+    def parse(self, symbols, buildTree=False):
+        """用编译后的分析表对符号序列进行语法分析，不输出分析过程
+
+        参数:
+            symbols: 终结符序列（不含结束符#）
+            buildTree: 是否在归约时构建语法树，见parseTree
+
+        返回:
+            ParseResult
+        """
+        symbols = symbols if isinstance(symbols, (list, tuple)) else list(symbols)
+        tokens = self.encode(symbols)
+        if -1 in tokens:
+            position = tokens.index(-1)
+            return ParseResult(False, position, symbols[position])
+        if buildTree:
+            return self.parseTree(symbols)
+
+        action = self.action
+        goto = self.goto if self.unitGoto is None else self.unitGoto
+        unitTargets = self.unitTargets
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        stack = [0]
+        state = 0
+        pointer = 0
+        token = tokens[0]
+
+        while True:
+            code = action[state * width + token]
+
+            if code > 0:    # 移进
+                state = code - 1
+                stack.append(state)
+                pointer += 1
+                token = tokens[pointer]
+
+            elif code < -1:    # 规约
+                p = -code - 1
+                length = prodLength[p]
+                if length:
+                    del stack[-length:]
+                state = goto[stack[-1] * ntWidth + prodLeft[p]]
+                if state < 0:
+                    if state == -1:
+                        return self.error(symbols, pointer)
+                    state = unitTargets[token - state - 2]    # 跳过单产生式归约链
+                stack.append(state)
+
+            elif code == ParseTable.ACCEPT:    # 接受
+                return ParseResult(True)
+
+            else:    # 出错
+                return self.error(symbols, pointer)
+
+    # 统计步数的分析
+    def parseCounted(self, symbols):
+        """与parse相同，但同时统计移进和归约的次数，供开启统计时使用，parse本身不计数
+
+        返回:
+            (ParseResult, 移进次数, 归约次数)
+        """
+        symbols = symbols if isinstance(symbols, (list, tuple)) else list(symbols)
+        tokens = self.encode(symbols)
+        if -1 in tokens:
+            position = tokens.index(-1)
+            return ParseResult(False, position, symbols[position]), 0, 0
+
+        action = self.action
+        goto = self.goto if self.unitGoto is None else self.unitGoto
+        unitTargets = self.unitTargets
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        stack = [0]
+        state = 0
+        pointer = 0
+        reduces = 0
+        token = tokens[0]
+
+        while True:
+            code = action[state * width + token]
+
+            if code > 0:
+                state = code - 1
+                stack.append(state)
+                pointer += 1
+                token = tokens[pointer]
+
+            elif code < -1:
+                reduces += 1
+                p = -code - 1
+                length = prodLength[p]
+                if length:
+                    del stack[-length:]
+                state = goto[stack[-1] * ntWidth + prodLeft[p]]
+                if state < 0:
+                    if state == -1:
+                        return self.error(symbols, pointer), pointer, reduces
+                    state = unitTargets[token - state - 2]
+                stack.append(state)
+
+            elif code == ParseTable.ACCEPT:
+                return ParseResult(True), pointer, reduces
+
+            else:
+                return self.error(symbols, pointer), pointer, reduces
+
+    # 流式分析
+    def parseStream(self, tokens):
+        """从任意迭代器逐个读取终结符进行语法分析
+
+        输入不需要整体读入内存，也不保留已读过的符号，占用的内存只与分析栈深度有关，
+        可用于生成器、文件或词法分析器输出等很长的符号流
+
+        参数:
+            tokens: 终结符的可迭代对象（不含结束符#）
+
+        返回:
+            ParseResult，出错位置为出错符号在流中的下标
+        """
+        ids = self.inputIds
+        end = self.terminalIds[ParseTable.END]
+        action = self.action
+        goto = self.goto if self.unitGoto is None else self.unitGoto
+        unitTargets = self.unitTargets
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        iterator = iter(tokens)
+        stack = [0]
+        state = 0
+        position = 0
+
+        symbol = next(iterator, None)
+        token = end if symbol is None else ids.get(symbol, -1)
+
+        while True:
+            if token < 0:    # 未定义的符号
+                return ParseResult(False, position, symbol)
+
+            code = action[state * width + token]
+
+            if code > 0:    # 移进
+                state = code - 1
+                stack.append(state)
+                position += 1
+                symbol = next(iterator, None)
+                token = end if symbol is None else ids.get(symbol, -1)
+
+            elif code < -1:    # 规约
+                p = -code - 1
+                length = prodLength[p]
+                if length:
+                    del stack[-length:]
+                state = goto[stack[-1] * ntWidth + prodLeft[p]]
+                if state < 0:
+                    if state == -1:
+                        return ParseResult(False, position, ParseTable.END if symbol is None else symbol)
+                    state = unitTargets[token - state - 2]    # 跳过单产生式归约链
+                stack.append(state)
+
+            elif code == ParseTable.ACCEPT:    # 接受
+                return ParseResult(True)
+
+            else:    # 出错
+                return ParseResult(False, position, ParseTable.END if symbol is None else symbol)
+
+    # 分析并构建语法树
+    def parseTree(self, tokens):
+        """流式读取终结符进行分析，移进时建叶子，归约时建内部结点，接受时返回语法树
+
+        不建树的parse/parseStream不受影响；这里多出的开销只是每步追加几个数组元素，
+        结点栈与状态栈一一对应（状态栈多一个底部的初始状态）
+
+        参数:
+            tokens: 终结符的可迭代对象（不含结束符#）
+
+        返回:
+            ParseResult，接受时tree为ParseTree
+        """
+        ids = self.inputIds
+        end = self.terminalIds[ParseTable.END]
+        action = self.action
+        goto = self.goto
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        prods = array('i')
+        offsets = array('i')
+        starts = array('i')
+        children = array('i')
+        addProd = prods.append
+        addOffset = offsets.append
+        addStart = starts.append
+        addChild = children.append
+        addChildren = children.extend
+
+        iterator = iter(tokens)
+        stack = [0]
+        nodes = []
+        state = 0
+        position = 0
+        node = 0
+
+        symbol = next(iterator, None)
+        token = end if symbol is None else ids.get(symbol, -1)
+
+        while True:
+            if token < 0:    # 未定义的符号
+                return ParseResult(False, position, symbol)
+
+            code = action[state * width + token]
+
+            if code > 0:    # 移进：建叶子
+                state = code - 1
+                stack.append(state)
+                addProd(-token - 1)
+                addOffset(-1)
+                addStart(position)
+                nodes.append(node)
+                node += 1
+                position += 1
+                symbol = next(iterator, None)
+                token = end if symbol is None else ids.get(symbol, -1)
+
+            elif code < -1:    # 规约：栈顶的length个结点成为新结点的孩子
+                p = -code - 1
+                length = prodLength[p]
+                addOffset(len(children))
+                if length == 1:    # 单孩子的产生式最常见，直接替换栈顶
+                    stack.pop()
+                    child = nodes[-1]
+                    addStart(starts[child])
+                    addChild(child)
+                    nodes[-1] = node
+                elif length:
+                    del stack[-length:]
+                    addStart(starts[nodes[-length]])
+                    addChildren(nodes[-length:])
+                    del nodes[-length + 1:]
+                    nodes[-1] = node
+                else:
+                    addStart(position)
+                    nodes.append(node)
+                state = goto[stack[-1] * ntWidth + prodLeft[p]]
+                if state < 0:
+                    return ParseResult(False, position, ParseTable.END if symbol is None else symbol)
+                stack.append(state)
+                addProd(p)
+                node += 1
+
+            elif code == ParseTable.ACCEPT:    # 接受
+                return ParseResult(True, tree=ParseTree(self, prods, offsets, starts, children))
+
+            else:    # 出错
+                return ParseResult(False, position, ParseTable.END if symbol is None else symbol)
+
+    # 出错时的分析结果
+    @staticmethod
+    def error(symbols, pointer):
+        symbol = symbols[pointer] if pointer < len(symbols) else ParseTable.END
+        return ParseResult(False, pointer, symbol)
+
+
+# 压缩存储的LR分析表
+# 终结符多时稠密Action表绝大部分为空，因此：
+#   1. 每个状态取出现最多的归约动作作为默认归约，该行中等于默认值的表项不再存储；
+#      含显式出错表项（%nonassoc）的状态不用默认归约，否则归约后可能接受本应出错的输入；
+#      每个非终结符取出现最多的目标状态作为默认转移
+#   2. 内容完全相同的行合并为同一个行类，只存储一份
+#   3. 各行类按行移位（梳状）方式错开叠放到同一个一维数组中，
+#      check数组记录每个位置属于哪个行类
+# 查表仍为O(1)：i = base[行类] + 列号，check[i] 等于该行类时取 table[i]，否则取默认值。
+# 使用默认归约后，出错可能在若干次归约之后才被发现，但接受的输入串不变
+class CompressedParseTable:
+    def __init__(self, dense):
+        self.terminals = dense.terminals
+        self.nonterminals = dense.nonterminals
+        self.terminalIds = dense.terminalIds
+        self.inputIds = dense.inputIds
+        self.nonterminalIds = dense.nonterminalIds
+        self.prodLeft = dense.prodLeft
+        self.prodLength = dense.prodLength
+        self.stateCount = dense.stateCount
+
+        width = len(self.terminals)
+        ntWidth = len(self.nonterminals)
+
+        # Action表：按状态取行，默认值为出现最多的归约
+        rows = []
+        defaults = []
+        for state in range(self.stateCount):
+            row = dense.action[state * width:(state + 1) * width]
+            if state in dense.explicitErrors:
+                default = ParseTable.ERROR
+            else:
+                default = self.mostCommon(code for code in row if code < ParseTable.ACCEPT)
+            defaults.append(default)
+            rows.append({t: code for t, code in enumerate(row) if code != ParseTable.ERROR and code != default})
+        self.actionDefault = compactArray(defaults)
+        self.actionClass, self.actionBase, self.actionCheck, self.actionTable = self.pack(rows)
+
+        # Goto表：按非终结符取列，默认值为出现最多的目标状态（状态0不会是转移目标）
+        columns = []
+        defaults = []
+        for nt in range(ntWidth):
+            column = [dense.goto[state * ntWidth + nt] for state in range(self.stateCount)]
+            default = self.mostCommon(target for target in column if target >= 0) or -1
+            defaults.append(default)
+            columns.append({state: target for state, target in enumerate(column) if target >= 0 and target != default})
+        self.gotoDefault = compactArray(defaults)
+        self.gotoClass, self.gotoBase, self.gotoCheck, self.gotoTable = self.pack(columns)
+
+    # 出现次数最多的取值，没有时为0
+    @staticmethod
+    def mostCommon(values):
+        counts = {}
+        for value in values:
+            counts[value] = counts.get(value, 0) + 1
+        if not counts:
+            return 0
+        return max(counts, key=lambda value: (counts[value], value))
+
+    # 合并相同的行并按行移位方式叠放
+    @staticmethod
+    def pack(rows):
+        """将稀疏行（列号 -> 值）合并、叠放到一维数组中
+
+        返回:
+            (每行所属行类, 各行类的基址, check数组, 值数组)
+        """
+        classOf = {}
+        rowClass = []
+        classes = []
+        for row in rows:
+            key = tuple(sorted(row.items()))
+            if key not in classOf:
+                classOf[key] = len(classes)
+                classes.append(key)
+            rowClass.append(classOf[key])
+
+        # 首次适应：表项多的行类先放，找到第一个所有列位置都空闲的基址
+        bases = [0] * len(classes)
+        check = []
+        table = []
+        firstFree = 0
+        for c in sorted(range(len(classes)), key=lambda c: -len(classes[c])):
+            entries = classes[c]
+            if not entries:
+                continue
+            base = max(firstFree - entries[0][0], 0)
+            while any(base + column < len(check) and check[base + column] >= 0 for column, _ in entries):
+                base += 1
+            bases[c] = base
+
+            end = base + entries[-1][0] + 1
+            if end > len(check):
+                check.extend([-1] * (end - len(check)))
+                table.extend([0] * (end - len(table)))
+            for column, value in entries:
+                check[base + column] = c
+                table[base + column] = value
+            while firstFree < len(check) and check[firstFree] >= 0:
+                firstFree += 1
+
+        return compactArray(rowClass), compactArray(bases), compactArray(check), compactArray(table)
+
+    # 查询Action表
+    def lookupAction(self, state, terminal):
+        """按终结符编号查询Action表项（整数编码，见ParseTable）"""
+        c = self.actionClass[state]
+        i = self.actionBase[c] + terminal
+        if i < len(self.actionCheck) and self.actionCheck[i] == c:
+            return self.actionTable[i]
+        return self.actionDefault[state]
+
+    # 查询Goto表
+    def lookupGoto(self, state, nonterminal):
+        """按非终结符编号查询Goto表，没有转移时返回-1"""
+        c = self.gotoClass[nonterminal]
+        i = self.gotoBase[c] + state
+        if i < len(self.gotoCheck) and self.gotoCheck[i] == c:
+            return self.gotoTable[i]
+        return self.gotoDefault[nonterminal]
+
+    # 内存占用
+    def memoryFootprint(self):
+        """返回各数组及符号表的内存占用（字节）"""
+        arrays = (self.prodLeft, self.prodLength,
+                  self.actionDefault, self.actionClass, self.actionBase, self.actionCheck, self.actionTable,
+                  self.gotoDefault, self.gotoClass, self.gotoBase, self.gotoCheck, self.gotoTable)
+        return sum(sys.getsizeof(a) for a in arrays) + deepSizeof(self.terminals) + deepSizeof(self.nonterminals)
+
+    # 分析输入串
+    def parse(self, symbols):
+        """用压缩分析表对符号序列进行语法分析，接受的输入串与ParseTable.parse相同
+
+        参数:
+            symbols: 终结符序列（不含结束符#）
+
+        返回:
+            ParseResult
+        """
+        symbols = symbols if isinstance(symbols, (list, tuple)) else list(symbols)
+        ids = self.inputIds
+        tokens = [ids.get(symbol, -1) for symbol in symbols]
+        if -1 in tokens:
+            position = tokens.index(-1)
+            return ParseResult(False, position, symbols[position])
+        tokens.append(self.terminalIds[ParseTable.END])
+
+        lookupAction = self.lookupAction
+        lookupGoto = self.lookupGoto
+        prodLeft = self.prodLeft
+        prodLength = self.prodLength
+
+        stack = [0]
+        state = 0
+        pointer = 0
+        token = tokens[0]
+
+        while True:
+            code = lookupAction(state, token)
+
+            if code > 0:    # 移进
+                state = code - 1
+                stack.append(state)
+                pointer += 1
+                token = tokens[pointer]
+
+            elif code < -1:    # 规约
+                p = -code - 1
+                length = prodLength[p]
+                if length:
+                    del stack[-length:]
+                state = lookupGoto(stack[-1], prodLeft[p])
+                if state < 0:
+                    return ParseTable.error(symbols, pointer)
+                stack.append(state)
+
+            elif code == ParseTable.ACCEPT:    # 接受
+                return ParseResult(True)
+
+            else:    # 出错
+                return ParseTable.error(symbols, pointer)
+
+
+# 批量分析时工作进程持有的分析表，由进程池的initializer设置一次，之后各任务直接使用
+workerTable = None
+
+
+# 工作进程初始化：从序列化数据还原分析表，序列化数据中不含单产生式归约的跳转，需要时重新计算
+def initWorker(data, bypassUnits=False):
+    global workerTable
+    workerTable = ParseTable.fromBuffer(data)
+    if bypassUnits:
+        workerTable.bypassUnitReductions()
+
+
+# 工作进程任务：分析一批输入，结果以元组返回以减少进程间传输
+def parseChunk(inputs):
+    results = []
+    for symbols in inputs:
+        if isinstance(symbols, str):
+            symbols = symbols.split()
+        result = workerTable.parse(symbols)
+        results.append((result.accepted, result.errorPosition, result.errorSymbol))
+    return results
+
+
+# 批量分析
+def parseBatch(table, inputs, workers=None, chunkSize=1000):
+    """用同一张分析表分析大量输入，按输入顺序逐个产生ParseResult
+
+    分析表在每个工作进程启动时只传输一次；输入按chunkSize分块提交，
+    同时在途的块数有上限，输入可以是很长的迭代器而不必全部读入内存
+
+    参数:
+        table: ParseTable
+        inputs: 输入的可迭代对象，每个输入为终结符列表或以空格分隔的字符串
+        workers: 工作进程数，None为CPU核数，1表示在当前进程中分析
+        chunkSize: 每个任务包含的输入个数
+
+    返回:
+        ParseResult的生成器
+    """
+    inputs = iter(inputs)
+
+    if workers == 1:
+        for symbols in inputs:
+            yield table.parse(symbols.split() if isinstance(symbols, str) else symbols)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=initWorker,
+                             initargs=(table.toBytes(), table.unitGoto is not None)) as pool:
+        pending = deque()
+        maxPending = 2 * workers
+
+        while True:
+            # 补充在途任务
+            while len(pending) < maxPending:
+                chunk = list(islice(inputs, chunkSize))
+                if not chunk:
+                    break
+                pending.append(pool.submit(parseChunk, chunk))
+
+            if not pending:
+                break
+
+            # 按提交顺序取回结果，保证输出顺序与输入一致
+            for accepted, position, symbol in pending.popleft().result():
+                yield ParseResult(accepted, position, symbol)
+
+
+# 从文件逐个读取符号
+def readTokens(path, encoding='utf-8', blockSize=1 << 16):
+    """按块读取文件，逐个产生以空白分隔的符号，文件再大、单行再长也只占用一个块的内存"""
+    with open(path, encoding=encoding) as f:
+        rest = ''
+        while True:
+            block = f.read(blockSize)
+            if not block:
+                break
+
+            # 块末尾未遇到空白时，最后一个符号可能被截断，留到下一块拼接
+            block = rest + block
+            parts = block.split()
+            rest = parts.pop() if parts and not block[-1].isspace() else ''
+            yield from parts
+
+        if rest:
+            yield rest
+
+
+# 从文件逐行读取输入
+def readInputs(path, encoding='utf-8'):
+    """逐行产生文件中的输入（以空格分隔的符号串），跳过空行"""
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
@@ -0,0 +1,601 @@
+import ast
+import builtins
+import contextlib
+import importlib.util
+import io
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+import lrcodegen
+from lrtable import HEADER, ParseTable
+
+# 分析器主程序的文件名含空格和括号，不能直接import，按路径载入
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+if "lrparser" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("lrparser", os.path.join(HERE, "LR(0) and SLR(1).py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["lrparser"] = module
+    spec.loader.exec_module(module)
+lrparser = sys.modules["lrparser"]
+
+
+# ---------------- LR(0)项目集族 ----------------
+
+# 示例文法的项目集族快照：各状态的核心项目 (产生式编号, 点的位置) 和转移 (状态, 符号) -> 状态。
+# 状态按发现的顺序编号，同一状态的转移按项目编码的顺序访问，编号与PYTHONHASHSEED无关
+SNAPSHOTS = {
+    'expression': {
+        'grammar': ['E -> E + T | T', 'T -> T * F | F', 'F -> ( E ) | id'],
+        'kernels': [
+            [(0, 0)], [(0, 1), (1, 1)], [(2, 1), (3, 1)], [(4, 1)], [(5, 1)], [(6, 1)], [(1, 2)], [(3, 2)],
+            [(1, 1), (5, 2)], [(1, 3), (3, 1)], [(3, 3)], [(5, 3)],
+        ],
+        'goto': {
+            (0, '('): 4, (0, 'E'): 1, (0, 'F'): 3, (0, 'T'): 2, (0, 'id'): 5, (1, '+'): 6, (2, '*'): 7,
+            (4, '('): 4, (4, 'E'): 8, (4, 'F'): 3, (4, 'T'): 2, (4, 'id'): 5, (6, '('): 4, (6, 'F'): 3,
+            (6, 'T'): 9, (6, 'id'): 5, (7, '('): 4, (7, 'F'): 10, (7, 'id'): 5, (8, ')'): 11, (8, '+'): 6,
+            (9, '*'): 7,
+        },
+    },
+    'assignment': {
+        'grammar': ['S -> L = R | R', 'L -> * R | id', 'R -> L'],
+        'kernels': [
+            [(0, 0)], [(0, 1)], [(1, 1), (5, 1)], [(2, 1)], [(3, 1)], [(4, 1)], [(1, 2)], [(5, 1)],
+            [(3, 2)], [(1, 3)],
+        ],
+        'goto': {
+            (0, '*'): 4, (0, 'L'): 2, (0, 'R'): 3, (0, 'S'): 1, (0, 'id'): 5, (2, '='): 6, (4, '*'): 4,
+            (4, 'L'): 7, (4, 'R'): 8, (4, 'id'): 5, (6, '*'): 4, (6, 'L'): 7, (6, 'R'): 9, (6, 'id'): 5,
+        },
+    },
+    'nested': {
+        'grammar': ['S -> ( S ) S | ε'],
+        'kernels': [
+            [(0, 0)], [(0, 1)], [(1, 1)], [(1, 2)], [(1, 3)], [(1, 4)],
+        ],
+        'goto': {
+            (0, '('): 2, (0, 'S'): 1, (2, '('): 2, (2, 'S'): 3, (3, ')'): 4, (4, '('): 2, (4, 'S'): 5,
+        },
+    },
+}
+
+
+# 经inputGrammar输入文法并构造LR(0)项目集族，不输出提示信息
+def buildParser(lines):
+    parser = lrparser.LR0Parser()
+    answers = iter(list(lines) + [''])
+    original = builtins.input
+    builtins.input = lambda prompt='': next(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.inputGrammar()
+            parser.buildItemSets()
+    finally:
+        builtins.input = original
+    return parser
+
+
+# 项目集族的可比较形式：(各状态的核心项目, 转移)，核心项目为点不在最左端的项目和 S' -> .S
+def snapshot(parser):
+    kernels = [sorted((item.production, item.dot_pos) for item in itemSet
+                      if item.dot_pos > 0 or item.production == 0)
+               for itemSet in parser.itemSets]
+    return kernels, dict(parser.gotoTable)
+
+
+# 在指定PYTHONHASHSEED的子进程中构造项目集族
+def snapshotWithSeed(name, seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), name], env=env,
+                            capture_output=True, text=True, check=True)
+    return ast.literal_eval(result.stdout)
+
+
+@pytest.mark.parametrize('name', list(SNAPSHOTS))
+def test_stateNumberingMatchesSnapshot(name):
+    expected = SNAPSHOTS[name]
+    kernels, goto = snapshot(buildParser(expected['grammar']))
+    assert len(kernels) == len(expected['kernels'])
+    assert kernels == expected['kernels']
+    assert goto == expected['goto']
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_stateNumberingIndependentOfHashSeed(seed):
+    name = 'expression'
+    expected = SNAPSHOTS[name]
+    assert snapshotWithSeed(name, seed) == (expected['kernels'], expected['goto'])
+
+
+# 并行构造的项目集族与串行构造相同，项目经进程间传递后仍是Item
+def test_parallelBuildMatchesSnapshot():
+    expected = SNAPSHOTS['expression']
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar("\n".join(expected['grammar']))
+    parser.buildItemSets(workers=2, chunkSize=2)
+    assert snapshot(parser) == (expected['kernels'], expected['goto'])
+    assert all(type(item) is lrparser.Item for itemSet in parser.itemSets for item in itemSet)
+
+    # 并行构造留在stateCache中的结果在之后的串行构造中复用
+    parser.buildItemSets()
+    assert parser.reusedStates == len(parser.itemSets)
+    assert snapshot(parser) == (expected['kernels'], expected['goto'])
+    assert all(type(item) is lrparser.Item for itemSet in parser.itemSets for item in itemSet)
+    assert parser.printItem(next(iter(parser.itemSets[1]))).startswith("E")
+
+
+# ---------------- SLR(1) ----------------
+
+# 由文法文本构建分析表，返回 (分析器, 是否存在冲突)
+def buildTables(text, mode):
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar(text)
+    return parser, parser.buildTables(mode)
+
+
+# SLR(1)只在Follow集（含结束符#）中的符号上归约，A不能出现在句子末尾时不在#上归约
+def test_slrReducesOnFollowOnly():
+    parser, hasConflict = buildTables("S -> A b\nA -> a", 'SLR1')
+    assert not hasConflict
+    assert '#' in parser.follow_sets[parser.augmentedStart]
+    reduceA = [sorted(row) for row in parser.actionTable.values() if ('reduce', 2) in row.values()]
+    assert reduceA == [['b']]
+    assert parser.parse(['a', 'b'])
+    assert not parser.parse(['a'])
+
+
+# 循环文法中接受项目 S' -> S. 与 S -> S. 在#上冲突，不能生成会无限归约的分析表
+def test_slrReportsAcceptConflictOnCycle():
+    parser, hasConflict = buildTables("S -> S | a", 'SLR1')
+    assert hasConflict
+
+
+# ---------------- 分析程序 ----------------
+
+EXPRESSION = "E -> E + T | T\nT -> T * F | F\nF -> ( E ) | id"
+
+
+# 由分析表生成的独立分析器模块
+def generatedModule(table):
+    namespace = {'__name__': 'generated'}
+    exec(compile(lrcodegen.generateSource(table), 'generated', 'exec'), namespace)
+    return namespace
+
+
+# 各种分析程序对同一输入的结果：是否接受
+def allDrivers(parser):
+    table = parser.parseTable
+    bypassed = ParseTable.fromBuffer(table.toBytes())
+    bypassed.bypassUnitReductions()
+    generated = generatedModule(table)
+    return {
+        'parse': table.parse,
+        'parseCounted': lambda symbols: table.parseCounted(symbols)[0],
+        'parseStream': lambda symbols: table.parseStream(iter(symbols)),
+        'parseTree': lambda symbols: table.parse(symbols, buildTree=True),
+        'compressed': table.compress().parse,
+        'bypassUnits': bypassed.parse,
+        'generated': generated['parse'],
+        'trace': lambda symbols: parser.parse(symbols, trace=True),
+    }
+
+
+# 输入中的结束符#是未定义的符号，不能提前结束输入
+@pytest.mark.parametrize('text', ["id # id", "id # + id", "id #", "#"])
+def test_endMarkerInInputIsRejected(text):
+    parser, hasConflict = buildTables(EXPRESSION, 'SLR1')
+    assert not hasConflict
+    symbols = text.split()
+    for name, driver in allDrivers(parser).items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = driver(symbols)
+        assert not result.accepted, name
+        assert result.errorPosition == symbols.index('#'), name
+    for name, driver in allDrivers(parser).items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert driver("id + id * id".split()).accepted, name
+
+
+# ---------------- 修改文法 ----------------
+
+# 换用新文法后，上一个文法的分析表不能再用于分析，重新构建后按新文法分析
+def test_setGrammarDiscardsOldTables():
+    parser, hasConflict = buildTables("E -> E + id | id", 'SLR1')
+    assert not hasConflict
+    assert parser.parse(['id', '+', 'id'])
+
+    parser.setGrammar([('S', ['c', 'd'])])
+    assert parser.parseTable is None
+    assert parser.itemSets == [] and parser.gotoTable == {}
+    with pytest.raises(ValueError, match="请先构建分析表"):
+        parser.parse(['id', '+', 'id'])
+    with pytest.raises(ValueError, match="请先构建分析表"):
+        parser.parseStream(iter(['c', 'd']))
+
+    assert not parser.buildTables('SLR1')
+    assert parser.parse(['c', 'd'])
+    assert not parser.parse(['id', '+', 'id'])
+
+
+# 增量修改文法：(原文法, 增加的产生式, 删除的产生式)
+TWO_PARTS = "S -> A | B\nA -> a A | a\nB -> b B | b"
+GRAMMAR_EDITS = {
+    'add': (EXPRESSION, ["F -> - F"], []),
+    'remove': (EXPRESSION, [], ["T -> T * F"]),
+    'replace': (EXPRESSION, ["T -> T / F | T * F"], ["T -> T * F"]),
+    'newNonterminal': (EXPRESSION, ["F -> id [ L ]", "L -> L , E | E"], []),
+    'removeAndMove': (EXPRESSION, [], ["E -> E + T", "F -> ( E )"]),
+    # 删除A -> a后B -> b填补空位，B的状态不受影响，但其中的项目要改写编号后沿用
+    'renumberUnaffected': (TWO_PARTS, [], ["A -> a"]),
+    'addUnaffected': (TWO_PARTS, ["A -> c"], []),
+}
+
+
+# 分析表的可比较形式：状态数、Action表、Goto表和编译后的数组
+def tableSnapshot(parser):
+    table = parser.parseTable
+    return (len(parser.itemSets), parser.actionTable, parser.gotoTable,
+            table.terminals, table.nonterminals, list(table.action), list(table.goto))
+
+
+# updateGrammar修改文法后重新构建，结果与按修改后的产生式重新载入文法构建的完全相同
+@pytest.mark.parametrize('edit', list(GRAMMAR_EDITS))
+@pytest.mark.parametrize('mode', ['SLR1', 'LALR1'])
+def test_updateGrammarMatchesFreshBuild(edit, mode):
+    grammar, added, removed = GRAMMAR_EDITS[edit]
+    parser, hasConflict = buildTables(grammar, mode)
+    assert not hasConflict
+
+    parser.updateGrammar(added, removed)
+    assert parser.parseTable is None
+    with pytest.raises(ValueError, match="请先构建分析表"):
+        parser.parse(['id'])
+    assert not parser.buildTables(mode)
+
+    fresh = lrparser.LR0Parser(verbose=False)
+    fresh.setGrammar([(prod.left, prod.right) for prod in parser.productions[1:]])
+    assert not fresh.buildTables(mode)
+    assert snapshot(parser) == snapshot(fresh)
+    assert tableSnapshot(parser) == tableSnapshot(fresh)
+
+
+# 只是产生式编号改变的状态改写项目编码后沿用，点后不是受影响符号的状态都不重新求闭包
+def test_updateGrammarReusesRenumberedStates():
+    parser, _ = buildTables(TWO_PARTS, 'SLR1')
+    affected = parser.updateGrammar([], ["A -> a"])
+    assert affected == {'A', 'S', "S'"}
+    assert not parser.buildTables('SLR1')
+    assert parser.reusedStates == sum(1 for symbols in parser.stateSymbols if affected.isdisjoint(symbols))
+    assert parser.parse(['b', 'b'])
+    assert not parser.parse(['a'])
+
+
+# ---------------- 压缩分析表 ----------------
+
+PRECEDENCE = "%left + -\n%left * /\nE -> E + E | E - E | E * E | E / E | ( E ) | id"
+
+# 比较各种分析表用的文法和分析方法
+TABLE_GRAMMARS = {
+    'expression': (EXPRESSION, 'SLR1'),
+    'assignment': ("S -> L = R | R\nL -> * R | id\nR -> L", 'LALR1'),
+    'nested': ("S -> ( S ) S | ε", 'SLR1'),
+    'precedence': (PRECEDENCE, 'LALR1'),
+    'nonassoc': ("%nonassoc <\n%left +\nE -> E < E | E + E | id", 'LALR1'),
+}
+
+
+# 由终结符（另加一个未定义的符号）组成的全部短输入串，总数不超过limit
+def shortInputs(table, limit=20000):
+    symbols = [t for t in table.terminals if t != ParseTable.END] + ['?']
+    length = 0
+    while sum(len(symbols) ** k for k in range(length + 2)) <= limit:
+        length += 1
+    for k in range(length + 1):
+        yield from itertools.product(symbols, repeat=k)
+
+
+# 分析结果的可比较形式
+def outcome(result):
+    return result.accepted, result.errorPosition, result.errorSymbol
+
+
+# 压缩表的非空表项与稠密表相同；默认归约只推迟报错，接受的串和出错位置都不变
+@pytest.mark.parametrize('name', list(TABLE_GRAMMARS))
+def test_compressedTableMatchesDense(name):
+    text, mode = TABLE_GRAMMARS[name]
+    parser, hasConflict = buildTables(text, mode)
+    assert not hasConflict
+    table = parser.parseTable
+    compressed = table.compress()
+    width = len(table.terminals)
+    ntWidth = len(table.nonterminals)
+
+    for state in range(table.stateCount):
+        for t in range(width):
+            code = table.action[state * width + t]
+            if code != ParseTable.ERROR:
+                assert compressed.lookupAction(state, t) == code
+        for nt in range(ntWidth):
+            target = table.goto[state * ntWidth + nt]
+            if target >= 0:
+                assert compressed.lookupGoto(state, nt) == target
+
+    for symbols in shortInputs(table):
+        assert outcome(compressed.parse(symbols)) == outcome(table.parse(symbols)), symbols
+
+
+# ---------------- 分析表缓存 ----------------
+
+GRAMMAR_HASH = bytes(range(32))
+
+
+# 分析表各数组的可比较形式
+def tableArrays(table):
+    return (table.mode, table.terminals, table.nonterminals, table.productions,
+            list(table.prodLeft), list(table.prodLength), list(table.action), list(table.goto))
+
+
+# 写入文件再载入，数组与分析结果都不变；载入后文件可以被新缓存替换
+@pytest.mark.parametrize('name', list(TABLE_GRAMMARS))
+def test_cacheRoundTrip(name, tmp_path):
+    text, mode = TABLE_GRAMMARS[name]
+    table = buildTables(text, mode)[0].parseTable
+    path = str(tmp_path / "table.lrt")
+    table.save(path, GRAMMAR_HASH)
+
+    loaded = ParseTable.load(path, GRAMMAR_HASH)
+    assert loaded is not None
+    assert tableArrays(loaded) == tableArrays(table)
+    assert tableArrays(ParseTable.fromBuffer(table.toBytes())) == tableArrays(table)
+
+    # 载入的表仍在使用时覆盖缓存文件
+    table.save(path, GRAMMAR_HASH)
+    for symbols in shortInputs(table, limit=2000):
+        assert outcome(loaded.parse(symbols)) == outcome(table.parse(symbols)), symbols
+
+
+# 文件头或数据损坏时fromBuffer返回None而不是抛出异常
+def test_cacheRejectsCorruptData(tmp_path):
+    table = buildTables(EXPRESSION, 'SLR1')[0].parseTable
+    data = table.toBytes(GRAMMAR_HASH)
+    headerSize = HEADER.size
+
+    def patched(offset, value):
+        return data[:offset] + bytes([value]) + data[offset + 1:]
+
+    corrupt = {
+        'magic': patched(0, data[0] ^ 0xFF),
+        'version': patched(4, data[4] + 1),
+        'payload': patched(headerSize + 10, data[headerSize + 10] ^ 0x01),
+        'crc': patched(headerSize - 1, data[headerSize - 1] ^ 0x01),
+        'truncated': data[:-4],
+        'header only': data[:headerSize - 1],
+        'empty': b'',
+    }
+    for label, buffer in corrupt.items():
+        assert ParseTable.fromBuffer(buffer, GRAMMAR_HASH) is None, label
+    assert ParseTable.fromBuffer(data, bytes(32)) is None    # 文法哈希不符
+    assert ParseTable.fromBuffer(data, GRAMMAR_HASH) is not None
+
+    path = tmp_path / "table.lrt"
+    path.write_bytes(corrupt['payload'])
+    assert ParseTable.load(str(path), GRAMMAR_HASH) is None
+    assert ParseTable.load(str(tmp_path / "missing.lrt"), GRAMMAR_HASH) is None
+
+
+# ---------------- 优先级与结合性 ----------------
+
+OPERATORS = ("%nonassoc <\n%left + -\n%left * /\n%right ^\n%right UMINUS\n"
+             "E -> E + E | E - E | E * E | E / E | E ^ E | E < E | - E %prec UMINUS | ( E ) | id")
+
+
+# 把语法树写成带括号的形式，单孩子结点不加括号，如 id + id * id -> (id + (id * id))
+def bracketed(tree, node=None):
+    node = tree.root if node is None else node
+    if tree.isLeaf(node):
+        return tree.symbol(node)
+    children = [bracketed(tree, child) for child in tree.childrenOf(node)]
+    return children[0] if len(children) == 1 else f"({' '.join(children)})"
+
+
+# 没有优先级声明时二义文法有冲突，声明后冲突全部按优先级和结合性消解
+@pytest.mark.parametrize('mode', ['SLR1', 'LALR1', 'LR1'])
+def test_precedenceResolvesConflicts(mode):
+    ambiguous = OPERATORS.split('\n')[-1].replace(' %prec UMINUS', '')
+    assert buildTables(ambiguous, mode)[1]
+    parser, hasConflict = buildTables(OPERATORS, mode)
+    assert not hasConflict
+
+    table = parser.parseTable
+    expected = {
+        "id + id * id": "(id + (id * id))",
+        "id * id + id": "((id * id) + id)",
+        "id - id - id": "((id - id) - id)",
+        "id / id * id": "((id / id) * id)",
+        "id ^ id ^ id": "(id ^ (id ^ id))",
+        "- id ^ id": "((- id) ^ id)",
+        "- id * id": "((- id) * id)",
+        "id - - id + id": "((id - (- id)) + id)",
+        "( id + id ) * id": "((( (id + id) )) * id)",
+        "id + id < id * id": "((id + id) < (id * id))",
+    }
+    for text, tree in expected.items():
+        result = table.parse(text.split(), buildTree=True)
+        assert result.accepted, text
+        assert bracketed(result.tree) == tree, text
+
+
+# 非结合运算符连用时该表项置为出错，压缩表等各分析程序都不能用默认归约越过它
+def test_nonassocRejectsChain(tmp_path):
+    parser, hasConflict = buildTables(OPERATORS, 'LALR1')
+    assert not hasConflict
+    assert parser.parseTable.explicitErrors
+    path = str(tmp_path / "table.lrt")
+    parser.parseTable.save(path, GRAMMAR_HASH)
+    assert ParseTable.load(path, GRAMMAR_HASH).explicitErrors == parser.parseTable.explicitErrors
+    for driver, parse in allDrivers(parser).items():
+        result = parse("id < id < id".split())
+        assert not result, driver
+        assert parse("id < ( id < id )".split()), driver
+
+
+# %prec 只改变指定产生式的优先级：不加 %prec 时 - id * id 按 - (id * id) 归约
+def test_precOverridesLastTerminal():
+    withoutPrec = OPERATORS.replace(' %prec UMINUS', '').replace('%left + -', '%left + -\n%right UNUSED')
+    parser, hasConflict = buildTables(withoutPrec, 'LALR1')
+    assert not hasConflict
+    result = parser.parseTable.parse("- id * id".split(), buildTree=True)
+    assert bracketed(result.tree) == "(- (id * id))"
+
+
+# ---------------- 跳过单产生式归约 ----------------
+
+# 跳过单产生式归约后接受的串、出错位置、移进次数和语法树都不变，归约次数不增加
+@pytest.mark.parametrize('name', list(TABLE_GRAMMARS))
+def test_bypassUnitReductionsIsEquivalent(name):
+    text, mode = TABLE_GRAMMARS[name]
+    table = buildTables(text, mode)[0].parseTable
+    bypassed = ParseTable.fromBuffer(table.toBytes())
+    bypassed.bypassUnitReductions()
+
+    for symbols in shortInputs(table):
+        result, shifts, reduces = table.parseCounted(symbols)
+        bypassResult, bypassShifts, bypassReduces = bypassed.parseCounted(symbols)
+        assert outcome(bypassResult) == outcome(result), symbols
+        assert outcome(bypassed.parse(symbols)) == outcome(result), symbols
+        assert outcome(bypassed.parseStream(iter(symbols))) == outcome(table.parseStream(iter(symbols))), symbols
+        assert bypassShifts == shifts and bypassReduces <= reduces, symbols
+        if result:
+            tree = table.parse(symbols, buildTree=True).tree
+            assert bracketed(bypassed.parse(symbols, buildTree=True).tree) == bracketed(tree), symbols
+
+
+# 表达式文法的 E -> T、T -> F 归约链被跳过
+def test_bypassUnitReductionsSkipsChains():
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.bypassUnits = True
+    parser.loadGrammar(EXPRESSION)
+    assert not parser.buildTables('SLR1')
+    table = parser.parseTable
+    assert table.unitGoto is not None
+
+    symbols = "id + id * id".split()
+    plain = ParseTable.fromBuffer(table.toBytes())
+    result, _, reduces = plain.parseCounted(symbols)
+    bypassResult, _, bypassReduces = table.parseCounted(symbols)
+    assert result and bypassResult
+    # 不跳过时为3次F->id、2次T->F、1次E->T以及T->T*F、E->E+T；跳过后只剩3次F->id和两次二元归约
+    assert (reduces, bypassReduces) == (8, 5)
+
+
+# ---------------- 生成的分析器模块 ----------------
+
+# 从文件导入生成的模块
+def importModule(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# 写出的模块与ParseTable.parseStream的结果相同，跳过单产生式归约时也一样
+@pytest.mark.parametrize('bypassUnits', [False, True])
+@pytest.mark.parametrize('name', list(TABLE_GRAMMARS))
+def test_generatedModuleMatchesTable(name, bypassUnits, tmp_path):
+    text, mode = TABLE_GRAMMARS[name]
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.bypassUnits = bypassUnits
+    parser.loadGrammar(text)
+    assert not parser.buildTables(mode)
+    table = parser.parseTable
+    assert (table.unitGoto is not None) == bypassUnits
+
+    path = tmp_path / f"{name}parser.py"
+    assert parser.emitParser(str(path)) == path.stat().st_size
+    module = importModule(str(path), f"{name}parser")
+    for symbols in shortInputs(table):
+        expected = outcome(table.parseStream(iter(symbols)))
+        assert outcome(module.parse(list(symbols))) == expected, symbols
+        assert outcome(module.parse(iter(symbols))) == expected, symbols
+        assert module.accepts(' '.join(symbols)) == expected[0], symbols
+
+
+# 生成的模块只依赖标准库，在隔离的解释器中也能导入和分析
+def test_generatedModuleIsStandalone(tmp_path):
+    parser = buildTables(EXPRESSION, 'SLR1')[0]
+    parser.emitParser(str(tmp_path / "exprparser.py"))
+    script = "import exprparser; print([bool(exprparser.parse(s)) for s in ['id + id * id', '( id', 'id # id']])"
+    output = subprocess.run([sys.executable, '-I', '-c', f"import sys; sys.path.insert(0, {str(tmp_path)!r}); {script}"],
+                            capture_output=True, text=True, check=True, cwd=str(tmp_path)).stdout
+    assert output.strip() == "[True, False, False]"
+
+
+# ---------------- 文法化简 ----------------
+
+# C、D、G推导不出终结符串；B只从不可达的E出发可达；A只出现在S -> A G中，删除该产生式后不再可达
+USELESS = "S -> H b | C d | D | A G\nH -> a H | a\nC -> c C\nD -> D e\nB -> b\nE -> B f | x\nA -> y\nG -> G g"
+
+
+# 先删无用符号再删不可达符号，其余产生式保持原来的顺序
+def test_reduceGrammarRemovesUselessSymbols():
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar(USELESS)
+    reduction = parser.reduceGrammar()
+
+    assert reduction
+    assert reduction.unproductive == {'C', 'D', 'G'}
+    assert reduction.unreachable == {'A', 'B', 'E'}
+    assert reduction.removedTerminals == {'c', 'd', 'e', 'f', 'g', 'x', 'y'}
+    assert reduction.duplicates == 0
+    assert len(reduction.removedProductions) == 10
+    assert [(p.left, p.right) for p in parser.productions[1:]] == [('S', ['H', 'b']), ('H', ['a', 'H']), ('H', ['a'])]
+    assert parser.nonterminals == {"S'", 'S', 'H'}
+
+
+# 化简前后的文法接受同样的输入串
+def test_reduceGrammarPreservesLanguage():
+    original = buildTables(USELESS, 'LALR1')[0].parseTable
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar(USELESS)
+    parser.reduceGrammar()
+    assert not parser.buildTables('LALR1')
+    reduced = parser.parseTable
+    assert reduced.stateCount < original.stateCount
+    for symbols in shortInputs(original):
+        assert reduced.parse(symbols).accepted == original.parse(symbols).accepted, symbols
+
+
+# 重复的选择只在dedupe时删除；没有可删除的产生式时文法不变
+def test_reduceGrammarDedupe():
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar("S -> a | b | a")
+    assert not parser.reduceGrammar()
+    assert len(parser.productions) == 4
+
+    reduction = parser.reduceGrammar(dedupe=True)
+    assert reduction and reduction.duplicates == 1
+    assert not reduction.removedProductions and not reduction.removedSymbols
+    assert [p.right for p in parser.productions[1:]] == [['a'], ['b']]
+
+    parser.loadGrammar(EXPRESSION)
+    productions = [(p.left, p.right) for p in parser.productions]
+    assert not parser.reduceGrammar(dedupe=True)
+    assert [(p.left, p.right) for p in parser.productions] == productions
+
+
+# 开始符号推导不出终结符串时无法化简
+def test_reduceGrammarRejectsUnproductiveStart():
+    parser = lrparser.LR0Parser(verbose=False)
+    parser.loadGrammar("S -> S a | A\nA -> A b")
+    with pytest.raises(ValueError):
+        parser.reduceGrammar()
+
+
+if __name__ == "__main__":
+    # 供snapshotWithSeed调用：输出指定示例文法的项目集族快照
+    print(repr(snapshot(buildParser(SNAPSHOTS[sys.argv[1]]['grammar']))))
@@ -0,0 +1,243 @@
+import sys
+from enum import IntEnum
+
+from regexdfa import compilePatterns
+
+
+# 词法单元类型及其对应的种别码，与 Lexical Analysis.cpp 中的 TokenType 相同
+class TokenType(IntEnum):
+    # 关键字
+    MAIN = 1
+    INT = 2
+    CHAR = 3
+    IF = 4
+    ELSE = 5
+    FOR = 6
+    WHILE = 7
+    RETURN = 8
+    VOID = 9
+
+    # 标识符
+    ID = 10
+
+    # 双引号
+    QUOTE_LEFT = 11
+    QUOTE_RIGHT = 12
+
+    # 常量
+    NUM = 20
+
+    # 运算符和标点
+    ASSIGN = 21     # =
+    PLUS = 22       # +
+    MINUS = 23      # -
+    MULTIPLY = 24   # *
+    DIVIDE = 25     # /
+    LPAREN = 26     # (
+    RPAREN = 27     # )
+    LBRACKET = 28   # [
+    RBRACKET = 29   # ]
+    LBRACE = 30     # {
+    RBRACE = 31     # }
+    COMMA = 32      # ,
+    COLON = 33      # :
+    SEMICOLON = 34  # ;
+    GT = 35         # >
+    LT = 36         # <
+    GE = 37         # >=
+    LE = 38         # <=
+    EQ = 39         # ==
+    NE = 40         # !=
+
+    # 字符串常量
+    STRING = 50
+
+    # 错误标记
+    ERROR = 100
+
+
+KEYWORDS = {
+    'main': TokenType.MAIN,
+    'int': TokenType.INT,
+    'char': TokenType.CHAR,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'for': TokenType.FOR,
+    'while': TokenType.WHILE,
+    'return': TokenType.RETURN,
+    'void': TokenType.VOID,
+}
+
+OPERATORS = {
+    '==': TokenType.EQ, '>=': TokenType.GE, '<=': TokenType.LE, '!=': TokenType.NE,
+    '=': TokenType.ASSIGN, '+': TokenType.PLUS, '-': TokenType.MINUS, '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE, '(': TokenType.LPAREN, ')': TokenType.RPAREN, '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET, '{': TokenType.LBRACE, '}': TokenType.RBRACE, ',': TokenType.COMMA,
+    ':': TokenType.COLON, ';': TokenType.SEMICOLON, '>': TokenType.GT, '<': TokenType.LT,
+}
+
+DIGITS = r'[0-9]+'
+MANTISSA = rf'({DIGITS}(\.[0-9]*)?|\.{DIGITS})'
+
+# 单词的正规式，(类型, 正规式)，类型为None的单词（空白、注释）被跳过。
+# 多个规则匹配同样长的串时先定义的优先，所以关键字在标识符之前；
+# 每次取最长的匹配，与C++版逐字符判断的结果相同。ERROR规则对应C++版报错的几种情况：
+# 未闭合的注释和字符串、指数后缺少正负号或数字。与C++版的stoi一样，0x后没有数字时值为0
+TOKEN_SPECS = [
+    (None, r'[ \t\n\r\f\v]+'),
+    (None, r'//[^\n]*'),
+    (None, r'/\*([^*]|\*+[^*/])*\*+/'),
+    (TokenType.ERROR, r'/\*([^*]|\*+[^*/])*\**'),
+    *[(kind, word) for word, kind in KEYWORDS.items()],
+    (TokenType.ID, r'[A-Za-z_][A-Za-z0-9_]*'),
+    (TokenType.NUM, rf'0[xX][0-9A-Fa-f]*|{MANTISSA}([eE][+\-]{DIGITS})?'),
+    (TokenType.ERROR, rf'{MANTISSA}[eE][+\-]?'),
+    (TokenType.STRING, r'"[^"\n]*"'),
+    (TokenType.ERROR, r'"[^"\n]*'),
+    *[(kind, ''.join('\\' + c for c in op)) for op, kind in OPERATORS.items()],
+]
+
+# 送给语法分析器的终结符名：关键字和运算符为其本身，其余按类型
+TERMINAL_NAMES = {
+    TokenType.ID: 'id',
+    TokenType.NUM: 'num',
+    TokenType.STRING: 'string',
+}
+
+
+# 把字符逐个换成字符类编号的str.translate映射，非ASCII字符第一次出现时再查找
+class ClassTranslation(dict):
+    def __init__(self, classes):
+        super().__init__((code, chr(classes.ascii[code])) for code in range(128))
+        self.classes = classes
+
+    def __missing__(self, code):
+        value = self[code] = chr(self.classes.lookup(code))
+        return value
+
+
+# 表驱动的词法分析器
+# 全部单词的正规式合并为一个最简DFA（见regexdfa），扫描时先把整个源程序换成字符类编号的字节串，
+# 之后每个字符只需一次bytes下标和一次转换表下标
+class Lexer:
+    def __init__(self, specs=TOKEN_SPECS, cacheDir=None):
+        """cacheDir为自动机缓存目录，单词定义未改变时直接载入上次构造的DFA，见regexdfa.compilePatterns"""
+        self.types = [kind for kind, _ in specs]
+        self.dfa = compilePatterns([pattern for _, pattern in specs], cacheDir)
+        if self.dfa.classes.count >= 256:
+            raise ValueError("字符类超过255个，无法编码为字节串")
+        self.translation = ClassTranslation(self.dfa.classes)
+
+    # 词法分析
+    def tokens(self, text):
+        """逐个产生 (类型, 词素, 行号, 列号)，行号从1开始、列号从0开始，与C++版相同
+
+        字符串常量的词素不含两端的双引号；无法识别的字符产生只含该字符的ERROR单词，然后继续分析
+        """
+        codes = text.translate(self.translation).encode('latin-1')
+        transitions = self.dfa.transitions
+        accept = self.dfa.accept
+        types = self.types
+        width = self.dfa.classes.count
+        length = len(codes)
+
+        pos = 0
+        line = 1
+        lineStart = 0
+        while pos < length:
+            # 最长匹配：记录最后一次经过接受状态的位置
+            state = 1
+            end = pos
+            rule = 0
+            i = pos
+            while i < length:
+                state = transitions[state * width + codes[i]]
+                if not state:
+                    break
+                i += 1
+                if accept[state]:
+                    end = i
+                    rule = accept[state]
+
+            if rule:
+                kind = types[rule - 1]
+            else:
+                kind = TokenType.ERROR
+                end = pos + 1
+
+            if kind is not None:
+                lexeme = text[pos:end]
+                if kind == TokenType.STRING:
+                    lexeme = lexeme[1:-1]
+                yield kind, lexeme, line, pos - lineStart
+
+            # 更新行号
+            newlines = text.count('\n', pos, end)
+            if newlines:
+                line += newlines
+                lineStart = text.rindex('\n', pos, end) + 1
+            pos = end
+
+    # 送给语法分析器的终结符
+    def symbols(self, text):
+        """逐个产生终结符名，可直接交给LR0Parser.parseStream；错误单词原样产生，分析器会在该处报错"""
+        names = TERMINAL_NAMES
+        for kind, lexeme, _, _ in self.tokens(text):
+            yield names.get(kind, lexeme)
+
+
+defaultLexer = None
+
+
+# 使用默认单词定义的分析器，第一次调用时构造
+def getLexer():
+    global defaultLexer
+    if defaultLexer is None:
+        defaultLexer = Lexer()
+    return defaultLexer
+
+
+# 词法分析
+def tokenize(text):
+    """用默认单词定义逐个产生 (类型, 词素, 行号, 列号)，见Lexer.tokens"""
+    return getLexer().tokens(text)
+
+
+# 数值常量的值
+def numberValue(lexeme):
+    if lexeme[:2] in ('0x', '0X'):
+        return int(lexeme[2:] or '0', 16)
+    if any(c in lexeme for c in '.eE'):
+        return float(lexeme)
+    return int(lexeme)
+
+
+# 按C++版printTokens的格式输出，错误单词不输出
+def formatTokens(tokens):
+    parts = []
+    for kind, lexeme, _, _ in tokens:
+        if kind == TokenType.ERROR:
+            continue
+        value = f"{numberValue(lexeme):g}" if kind == TokenType.NUM else lexeme
+        parts.append(f"({int(kind)},{value})")
+    return "  ".join(parts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            print(formatTokens(tokenize(f.read())))
+    else:
+        # 与C++版main相同的测试用例
+        tests = [
+            "if x>9 x=2*x+1/3;",
+            "int main() {\n    // 这是一个注释\n    int x = 10;\n    /* 这是一个\n       多行注释 */\n"
+            "    if(x > 0) {\n        return x;\n    }\n    return 0;\n}",
+            "int test() {\n    int a = 123;\n    int b = 0x1A;\n    double c = 3.14;\n"
+            "    double d = 2.5E+2;\n    return 0;\n}",
+            "void print() {\n    string msg = \"Hello, World!\";\n    string error = \"Unclosed string;\n"
+            "    char @invalid = 'c';\n}",
+        ]
+        for k, test in enumerate(tests, 1):
+            print(f"测试{k}：")
+            print("Token序列是：" + formatTokens(tokenize(test)))
@@ -0,0 +1,744 @@
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# 正规式 -> NFA（Thompson构造）-> DFA（子集构造）-> 最简DFA（Hopcroft算法）
+#
+# 支持的正规式语法：
+#     a          普通字符；\n \t \r \\ \. \* 等转义，\d \w \s 为常用字符类
+#     [a-z_]     字符类，[^...] 为补集
+#     .          除换行符外的任意字符
+#     ( )        分组
+#     |  * + ?   选择、闭包、正闭包、可选
+#
+# 字符不直接作为输入符号，而是先把所有正规式中出现的字符集合划分为互不相交的字符类：
+# 两个字符属于同一类，当且仅当它们在每个字符集合中的归属都相同。
+# 转换表的列数是字符类的个数，而不是字符的个数，表的规模与字符集无关。
+
+MAX_CODE = 0x110000     # Unicode码点上限
+ANY = ((0, MAX_CODE),)  # 任意字符
+DOT = ((0, 10), (11, MAX_CODE))  # 除换行符外的任意字符
+
+# 转义的字符类
+ESCAPE_CLASSES = {
+    'd': ((48, 58),),
+    'w': ((48, 58), (65, 91), (95, 96), (97, 123)),
+    's': ((9, 14), (32, 33)),
+}
+ESCAPE_CHARS = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', '0': '\0'}
+
+
+# 自动机缓存文件格式，与分析表缓存（lrtable）相同的组织方式
+# 文件头：魔数、格式版本、保留位、正规式组的哈希(sha256)、数据长度、数据的CRC32
+# 数据区：JSON元数据（字符类个数、各数组的类型码和元素个数），之后依次为
+#         starts、segmentClass、transitions、accept 四个小端数组
+MAGIC = b'RDFA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH32sII')
+COUNT = struct.Struct('<I')
+
+
+# 正规式语法错误
+class RegexError(ValueError):
+    pass
+
+
+# ---------------- 字符集合（按码点排序、互不相交的左闭右开区间元组） ----------------
+
+# 规范化区间：排序并合并相交或相邻的区间
+def normalize(intervals):
+    result = []
+    for low, high in sorted(intervals):
+        if result and low <= result[-1][1]:
+            result[-1][1] = max(result[-1][1], high)
+        else:
+            result.append([low, high])
+    return tuple((low, high) for low, high in result)
+
+
+# 补集
+def complement(intervals):
+    result = []
+    start = 0
+    for low, high in intervals:
+        if start < low:
+            result.append((start, low))
+        start = high
+    if start < MAX_CODE:
+        result.append((start, MAX_CODE))
+    return tuple(result)
+
+
+# 字符集合的显示形式，如 [A-Za-z_]；包含大部分码点时显示为补集 [^...]
+def formatIntervals(intervals):
+    def show(code):
+        c = chr(code)
+        if c in '\\]^-[':
+            return '\\' + c
+        if c.isprintable() and c != ' ':
+            return c
+        return f"\\x{code:02x}" if code < 0x100 else f"\\u{code:04x}" if code < 0x10000 else f"\\U{code:08x}"
+
+    def body(intervals):
+        parts = []
+        for low, high in intervals:
+            if high - low == 1:
+                parts.append(show(low))
+            elif high - low == 2:
+                parts.append(show(low) + show(low + 1))
+            else:
+                parts.append(f"{show(low)}-{show(high - 1)}")
+        return ''.join(parts)
+
+    if intervals and intervals[-1][1] == MAX_CODE:
+        rest = complement(intervals)
+        return f"[^{body(rest)}]" if rest else "任意字符"
+    if len(intervals) == 1 and intervals[0][1] - intervals[0][0] == 1:
+        return show(intervals[0][0])
+    return f"[{body(intervals)}]"
+
+
+# DOT字符串中的转义
+def dotString(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+# ---------------- 正规式语法分析 ----------------
+
+# 语法树结点：
+#     ('set', 区间元组)  ('cat', a, b)  ('alt', a, b)  ('star', a)  ('plus', a)  ('opt', a)  ('eps',)
+class RegexParser:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    # 解析整个正规式
+    def parse(self):
+        node = self.alternation()
+        if self.pos < len(self.pattern):
+            raise self.error("多余的 ')'")
+        return node
+
+    def error(self, message):
+        return RegexError(f"{message}（位置 {self.pos}）：{self.pattern}")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    # 选择：concat ('|' concat)*
+    def alternation(self):
+        node = self.concatenation()
+        while self.peek() == '|':
+            self.pos += 1
+            node = ('alt', node, self.concatenation())
+        return node
+
+    # 连接：repeat*
+    def concatenation(self):
+        node = None
+        while self.peek() not in (None, '|', ')'):
+            item = self.repetition()
+            node = item if node is None else ('cat', node, item)
+        return ('eps',) if node is None else node
+
+    # 闭包：atom ('*' | '+' | '?')*
+    def repetition(self):
+        node = self.atom()
+        while self.peek() in ('*', '+', '?'):
+            node = ({'*': 'star', '+': 'plus', '?': 'opt'}[self.peek()], node)
+            self.pos += 1
+        return node
+
+    # 原子：字符、转义、字符类、'.'、分组
+    def atom(self):
+        c = self.peek()
+        if c == '(':
+            self.pos += 1
+            node = self.alternation()
+            if self.peek() != ')':
+                raise self.error("缺少 ')'")
+            self.pos += 1
+            return node
+        if c in ('*', '+', '?'):
+            raise self.error(f"'{c}' 前没有可重复的内容")
+        self.pos += 1
+        if c == '.':
+            return ('set', DOT)
+        if c == '[':
+            return ('set', self.charClass())
+        if c == '\\':
+            return ('set', self.escape())
+        return ('set', ((ord(c), ord(c) + 1),))
+
+    # 转义字符，返回区间元组
+    def escape(self):
+        c = self.peek()
+        if c is None:
+            raise self.error("'\\' 后缺少字符")
+        self.pos += 1
+        if c in ESCAPE_CLASSES:
+            return ESCAPE_CLASSES[c]
+        c = ESCAPE_CHARS.get(c, c)
+        return ((ord(c), ord(c) + 1),)
+
+    # 字符类 [...]，返回区间元组
+    def charClass(self):
+        negate = self.peek() == '^'
+        if negate:
+            self.pos += 1
+        intervals = []
+        first = True
+        while True:
+            c = self.peek()
+            if c is None:
+                raise self.error("缺少 ']'")
+            if c == ']' and not first:
+                self.pos += 1
+                break
+            first = False
+            self.pos += 1
+            if c == '\\':
+                part = self.escape()
+                if len(part) != 1 or part[0][1] - part[0][0] != 1:    # \d 等字符类不能作为范围的端点
+                    intervals.extend(part)
+                    continue
+                low = part[0][0]
+            else:
+                low = ord(c)
+
+            # 范围 a-z，'-' 在末尾时为普通字符
+            if self.peek() == '-' and self.pos + 1 < len(self.pattern) and self.pattern[self.pos + 1] != ']':
+                self.pos += 1
+                c = self.peek()
+                self.pos += 1
+                high = self.escape()[0][0] if c == '\\' else ord(c)
+                if high < low:
+                    raise self.error(f"范围的端点顺序错误：{chr(low)}-{chr(high)}")
+                intervals.append((low, high + 1))
+            else:
+                intervals.append((low, low + 1))
+        intervals = normalize(intervals)
+        return complement(intervals) if negate else intervals
+
+
+# 解析正规式
+def parseRegex(pattern):
+    """解析正规式，返回语法树，语法错误时抛出RegexError"""
+    return RegexParser(pattern).parse()
+
+
+# 收集语法树中的字符集合
+def collectSets(node, result):
+    kind = node[0]
+    if kind == 'set':
+        result.add(node[1])
+    elif kind in ('cat', 'alt'):
+        collectSets(node[1], result)
+        collectSets(node[2], result)
+    elif kind in ('star', 'plus', 'opt'):
+        collectSets(node[1], result)
+
+
+# ---------------- 字符类划分 ----------------
+
+# 字符类
+# 把码点轴按所有字符集合的区间端点切成若干段，归属相同的段合并为一类。
+# 类0是不属于任何字符集合的字符，DFA在类0上总是转到死状态。
+class CharClasses:
+    def __init__(self, starts, segmentClass, count):
+        self.starts = starts                # 各段的起始码点
+        self.segmentClass = segmentClass    # 各段的字符类
+        self.count = count                  # 字符类个数（含类0）
+
+        # ASCII字符直接查表
+        self.ascii = bytes(self.lookup(code) for code in range(128)) if self.count < 256 else None
+
+    # 由字符集合划分字符类
+    @classmethod
+    def fromSets(cls, sets):
+        sets = list(sets)
+        points = {0, MAX_CODE}
+        for intervals in sets:
+            for low, high in intervals:
+                points.add(low)
+                points.add(high)
+        points = sorted(points)
+
+        # 每一段属于哪些字符集合
+        membership = [[] for _ in range(len(points) - 1)]
+        for k, intervals in enumerate(sets):
+            for low, high in intervals:
+                for segment in range(bisect.bisect_left(points, low), bisect.bisect_left(points, high)):
+                    membership[segment].append(k)
+
+        starts = array('I')
+        segmentClass = array('H')
+        signatures = {(): 0}
+        for segment, start in enumerate(points[:-1]):
+            classId = signatures.setdefault(tuple(membership[segment]), len(signatures))
+            if segmentClass and segmentClass[-1] == classId:
+                continue    # 与前一段同类，合并
+            starts.append(start)
+            segmentClass.append(classId)
+        return cls(starts, segmentClass, len(signatures))
+
+    # 码点所属的字符类
+    def lookup(self, code):
+        return self.segmentClass[bisect.bisect_right(self.starts, code) - 1]
+
+    # 字符集合包含的字符类
+    def classesOf(self, intervals):
+        result = set()
+        for low, high in intervals:
+            k = bisect.bisect_right(self.starts, low) - 1
+            while k < len(self.starts) and self.starts[k] < high:
+                result.add(self.segmentClass[k])
+                k += 1
+        return frozenset(result)
+
+    # 字符类的代表区间（用于显示）
+    def intervalsOf(self, classId):
+        result = []
+        for k, start in enumerate(self.starts):
+            if self.segmentClass[k] == classId:
+                end = self.starts[k + 1] if k + 1 < len(self.starts) else MAX_CODE
+                result.append((start, end))
+        return tuple(result)
+
+
+# ---------------- Thompson构造 ----------------
+
+# NFA：状态为整数，epsilon[s] 为ε转移的目标列表，moves[s] 为 (字符类集合, 目标) 列表，
+# accept[s] 为接受的规则编号（不接受为None）
+class NFA:
+    def __init__(self):
+        self.epsilon = []
+        self.moves = []
+        self.accept = []
+
+    def newState(self):
+        self.epsilon.append([])
+        self.moves.append([])
+        self.accept.append(None)
+        return len(self.accept) - 1
+
+    # 由语法树构造片段，返回 (开始状态, 结束状态)
+    def fragment(self, node, classes):
+        kind = node[0]
+        start = self.newState()
+        if kind == 'set':
+            end = self.newState()
+            self.moves[start].append((classes.classesOf(node[1]), end))
+        elif kind == 'eps':
+            end = self.newState()
+            self.epsilon[start].append(end)
+        elif kind == 'cat':
+            s1, e1 = self.fragment(node[1], classes)
+            s2, end = self.fragment(node[2], classes)
+            self.epsilon[start].append(s1)
+            self.epsilon[e1].append(s2)
+        elif kind == 'alt':
+            s1, e1 = self.fragment(node[1], classes)
+            s2, e2 = self.fragment(node[2], classes)
+            end = self.newState()
+            self.epsilon[start] += [s1, s2]
+            self.epsilon[e1].append(end)
+            self.epsilon[e2].append(end)
+        else:    # star / plus / opt
+            s1, e1 = self.fragment(node[1], classes)
+            end = self.newState()
+            self.epsilon[start].append(s1)
+            self.epsilon[e1].append(end)
+            if kind in ('star', 'opt'):
+                self.epsilon[start].append(end)
+            if kind in ('star', 'plus'):
+                self.epsilon[e1].append(s1)
+        return start, end
+
+    # ε闭包
+    def closure(self, states):
+        result = set(states)
+        stack = list(states)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in result:
+                    result.add(target)
+                    stack.append(target)
+        return frozenset(result)
+
+
+# ---------------- DFA ----------------
+
+# 转换表形式的DFA
+# 状态0为死状态，状态1为开始状态；transitions按状态行优先存放，每行classes.count列；
+# accept[s] 为状态s接受的规则编号+1，0表示不接受
+class DFA:
+    DEAD = 0
+    START = 1
+
+    def __init__(self, classes, transitions, accept):
+        self.classes = classes
+        self.transitions = transitions
+        self.accept = accept
+        self.stateCount = len(accept)
+
+    # 状态s在字符类c上的转移
+    def step(self, state, classId):
+        return self.transitions[state * self.classes.count + classId]
+
+    # 从pos开始的最长匹配
+    def longestMatch(self, text, pos=0):
+        """返回 (结束位置, 规则编号)，没有匹配时返回 (pos, -1)"""
+        width = self.classes.count
+        transitions = self.transitions
+        accept = self.accept
+        state = DFA.START
+        end, rule = pos, accept[state] - 1
+        for i in range(pos, len(text)):
+            state = transitions[state * width + self.classes.lookup(ord(text[i]))]
+            if state == DFA.DEAD:
+                break
+            if accept[state]:
+                end, rule = i + 1, accept[state] - 1
+        return end, rule
+
+    # 是否完整匹配
+    def fullMatch(self, text):
+        end, rule = self.longestMatch(text)
+        return rule >= 0 and end == len(text)
+
+    # 转换图的边
+    def edges(self):
+        """产生 (状态, 目标状态, 字符区间元组)，同一对状态之间的全部字符类合并为一条边，不含到死状态的边"""
+        width = self.classes.count
+        for state in range(DFA.START, self.stateCount):
+            targets = {}
+            for c in range(width):
+                target = self.transitions[state * width + c]
+                if target != DFA.DEAD:
+                    targets.setdefault(target, []).extend(self.classes.intervalsOf(c))
+            for target, intervals in sorted(targets.items()):
+                yield state, target, normalize(intervals)
+
+    # Graphviz格式的状态转换图
+    def toDot(self, names=None):
+        """返回DOT格式的状态转换图，可用 dot -Tpng 渲染；接受状态画双圈并标出接受的规则（names为规则名列表）"""
+        lines = ["digraph DFA {", "    rankdir=LR;", '    node [shape=circle, fontname="Helvetica"];',
+                 '    start [shape=point];', f"    start -> {DFA.START};"]
+        for state in range(DFA.START, self.stateCount):
+            rule = self.accept[state] - 1
+            if rule < 0:
+                lines.append(f'    {state} [label="{state}"];')
+            else:
+                name = dotString(names[rule] if names else str(rule))
+                lines.append(f'    {state} [shape=doublecircle, label="{state}\\n{name}"];')
+        for state, target, intervals in self.edges():
+            lines.append(f'    {state} -> {target} [label="{dotString(formatIntervals(intervals))}"];')
+        lines.append("}")
+        return "\n".join(lines)
+
+    # 文本形式的状态转换表
+    def format(self, names=None):
+        """每个状态一行，列出各条边及接受的规则，死状态不列出"""
+        lines = []
+        outgoing = {}
+        for state, target, intervals in self.edges():
+            outgoing.setdefault(state, []).append(f"{formatIntervals(intervals)} -> {target}")
+        for state in range(DFA.START, self.stateCount):
+            rule = self.accept[state] - 1
+            mark = "" if rule < 0 else f"  接受 {names[rule] if names else rule}"
+            start = "开始 " if state == DFA.START else ""
+            lines.append(f"{start}状态 {state}{mark}")
+            for edge in outgoing.get(state, ()):
+                lines.append(f"    {edge}")
+        return "\n".join(lines)
+
+    # 序列化
+    def toBytes(self, specHash):
+        """序列化为缓存文件格式
+
+        参数:
+            specHash: 正规式组的sha256摘要（32字节），见specHash
+        """
+        arrays = (self.classes.starts, self.classes.segmentClass, self.transitions, self.accept)
+        meta = json.dumps({
+            'classCount': self.classes.count,
+            'arrays': [(a.typecode, len(a)) for a in arrays],
+        }).encode('utf-8')
+        parts = [COUNT.pack(len(meta)), meta]
+        for values in arrays:
+            data = array(values.typecode, values)
+            if sys.byteorder == 'big':
+                data.byteswap()
+            parts.append(data.tobytes())
+        payload = b''.join(parts)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, specHash, len(payload), zlib.crc32(payload))
+        return header + payload
+
+    # 反序列化
+    @classmethod
+    def fromBuffer(cls, buffer, specHash):
+        """从缓存文件内容构造DFA；魔数、版本、哈希不符或数据损坏时返回None"""
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            return None
+        magic, version, _, storedHash, length, crc = HEADER.unpack_from(view)
+        payload = view[HEADER.size:]
+        if magic != MAGIC or version != FORMAT_VERSION or storedHash != specHash:
+            return None
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return None
+
+        try:
+            (metaLength,) = COUNT.unpack_from(payload, 0)
+            offset = COUNT.size
+            meta = json.loads(bytes(payload[offset:offset + metaLength]).decode('utf-8'))
+            offset += metaLength
+
+            arrays = []
+            for typecode, count in meta['arrays']:
+                values = array(typecode)
+                size = values.itemsize * count
+                values.frombytes(payload[offset:offset + size])
+                offset += size
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                arrays.append(values)
+            starts, segmentClass, transitions, accept = arrays
+            classes = CharClasses(starts, segmentClass, meta['classCount'])
+        except (ValueError, KeyError, TypeError, struct.error):
+            return None
+        return cls(classes, transitions, accept)
+
+    # 保存到文件
+    def save(self, path, specHash):
+        """写入缓存文件，先写临时文件再替换，避免留下写了一半的文件"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(self.toBytes(specHash))
+        os.replace(temp, path)
+
+    # 从文件载入
+    @classmethod
+    def load(cls, path, specHash):
+        """载入缓存文件，文件不存在、过期或损坏时返回None"""
+        try:
+            with open(path, 'rb') as f:
+                buffer = f.read()
+        except OSError:
+            return None
+        return cls.fromBuffer(buffer, specHash)
+
+
+# 子集构造
+def subsetConstruction(nfa, start, classCount):
+    """返回 (转换表列表, 接受规则列表)，状态0为死状态，状态1为开始状态"""
+    startSet = nfa.closure([start])
+    index = {frozenset(): 0, startSet: 1}
+    order = [frozenset(), startSet]
+    transitions = [0] * classCount    # 死状态的一行
+
+    k = 1
+    while k < len(order):
+        current = order[k]
+        targets = {}
+        for s in current:
+            for classSet, target in nfa.moves[s]:
+                for c in classSet:
+                    targets.setdefault(c, set()).add(target)
+        row = [0] * classCount
+        closures = {}
+        for c, states in targets.items():
+            key = frozenset(states)
+            closure = closures.get(key)
+            if closure is None:
+                closure = closures[key] = nfa.closure(states)
+            target = index.get(closure)
+            if target is None:
+                target = index[closure] = len(order)
+                order.append(closure)
+            row[c] = target
+        transitions += row
+        k += 1
+
+    # 同时接受多个规则时取编号最小的（先定义的规则优先）
+    accept = [0]
+    for states in order[1:]:
+        rules = [nfa.accept[s] for s in states if nfa.accept[s] is not None]
+        accept.append(min(rules) + 1 if rules else 0)
+    return transitions, accept
+
+
+# Hopcroft最小化
+def minimize(transitions, accept, classCount):
+    """按接受的规则划分初始等价类，用Hopcroft算法细分，返回 (转换表列表, 接受规则列表)
+
+    死状态0仍为新的状态0，开始状态1仍为新的状态1
+    """
+    stateCount = len(accept)
+
+    # 逆转移：inverse[c][t] 为在字符类c上转到t的状态列表
+    inverse = [{} for _ in range(classCount)]
+    for s in range(stateCount):
+        base = s * classCount
+        for c in range(classCount):
+            inverse[c].setdefault(transitions[base + c], []).append(s)
+
+    groups = {}
+    for s in range(stateCount):
+        groups.setdefault(accept[s], set()).add(s)
+    partition = list(groups.values())
+    blockOf = [0] * stateCount
+    for b, block in enumerate(partition):
+        for s in block:
+            blockOf[s] = b
+
+    # 待处理的分割块，初始时除最大的块外全部加入
+    largest = max(range(len(partition)), key=lambda b: len(partition[b]))
+    pending = {b for b in range(len(partition)) if b != largest} or {0}
+    while pending:
+        splitter = partition[pending.pop()]
+        for c in range(classCount):
+            sources = set()
+            for t in splitter:
+                sources.update(inverse[c].get(t, ()))
+            if not sources:
+                continue
+
+            # 按源状态所在的块细分
+            touched = {}
+            for s in sources:
+                touched.setdefault(blockOf[s], set()).add(s)
+            for b, inside in touched.items():
+                block = partition[b]
+                if len(inside) == len(block):
+                    continue
+                outside = block - inside
+                partition[b] = inside
+                partition.append(outside)
+                newBlock = len(partition) - 1
+                for s in outside:
+                    blockOf[s] = newBlock
+                if b in pending:
+                    pending.add(newBlock)
+                else:
+                    pending.add(b if len(inside) <= len(outside) else newBlock)
+
+    if blockOf[0] == blockOf[1]:
+        raise RegexError("正规式不接受任何串")
+
+    # 重新编号：死状态所在的块为0，开始状态所在的块为1，其余按最小状态编号排序
+    order = sorted(range(len(partition)), key=lambda b: (b != blockOf[0], b != blockOf[1], min(partition[b])))
+    newId = {b: k for k, b in enumerate(order)}
+    newTransitions = [0] * (len(order) * classCount)
+    newAccept = [0] * len(order)
+    for b in order:
+        s = min(partition[b])
+        base = newId[b] * classCount
+        for c in range(classCount):
+            newTransitions[base + c] = newId[blockOf[transitions[s * classCount + c]]]
+        newAccept[newId[b]] = accept[s]
+    return newTransitions, newAccept
+
+
+# 选择能容纳所有状态编号的最小无符号数组类型
+def stateArray(values):
+    values = list(values)
+    for typecode in ('B', 'H', 'I'):
+        if max(values, default=0) < 1 << (array(typecode).itemsize * 8):
+            return array(typecode, values)
+    return array('L', values)
+
+
+# 由一组正规式构造NFA
+def buildNFA(patterns):
+    """解析各正规式、划分字符类并用Thompson构造合并为一个NFA，规则按顺序编号为0、1、2……
+
+    返回:
+        (NFA, 开始状态, CharClasses)
+    """
+    trees = [parseRegex(pattern) for pattern in patterns]
+    sets = set()
+    for tree in trees:
+        collectSets(tree, sets)
+    classes = CharClasses.fromSets(sorted(sets))
+
+    nfa = NFA()
+    start = nfa.newState()
+    for rule, tree in enumerate(trees):
+        s, e = nfa.fragment(tree, classes)
+        nfa.epsilon[start].append(s)
+        nfa.accept[e] = rule
+    return nfa, start, classes
+
+
+# 正规式组的哈希
+def specHash(patterns):
+    """对正规式列表计算sha256摘要，作为自动机缓存的键；正规式的顺序决定规则的优先级，也计入哈希"""
+    text = json.dumps({'version': FORMAT_VERSION, 'patterns': list(patterns)}, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+# 由一组正规式构造最简DFA
+def compilePatterns(patterns, cacheDir=None):
+    """把一组正规式合并为一个最简DFA，各正规式按顺序编号为规则0、1、2……
+
+    同一个串被多个正规式接受时取编号最小的规则，因此关键字应放在标识符之前
+
+    参数:
+        patterns: 正规式列表
+        cacheDir: 自动机缓存目录，正规式组未改变时直接载入上次构造的DFA，为None时不使用缓存
+
+    返回:
+        DFA
+    """
+    patterns = list(patterns)
+    if cacheDir:
+        digest = specHash(patterns)
+        path = os.path.join(cacheDir, digest.hex() + '.dfa')
+        dfa = DFA.load(path, digest)
+        if dfa is not None:
+            return dfa
+
+    nfa, start, classes = buildNFA(patterns)
+    transitions, accept = subsetConstruction(nfa, start, classes.count)
+    transitions, accept = minimize(transitions, accept, classes.count)
+    dfa = DFA(classes, stateArray(transitions), stateArray(accept))
+
+    if cacheDir:
+        dfa.save(path, digest)
+    return dfa
+
+
+# 标识符的正规式，即实验扩展要求中的例子
+IDENTIFIER = r'[A-Za-z_][A-Za-z0-9_]*'
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(description="由正规式构造最简DFA并输出状态转换图")
+    argParser.add_argument("patterns", nargs="*", default=[IDENTIFIER],
+                           help=f"正规式，多个时合并为一个DFA，靠前的优先；默认为标识符 {IDENTIFIER}")
+    argParser.add_argument("--dot", metavar="FILE", help="把状态转换图以Graphviz DOT格式写入FILE")
+    argParser.add_argument("--cache", metavar="DIR", help="自动机缓存目录")
+    args = argParser.parse_args()
+
+    nfa, start, classes = buildNFA(args.patterns)
+    transitions, accept = subsetConstruction(nfa, start, classes.count)
+    print(f"NFA状态数：{len(nfa.accept)}  字符类数：{classes.count}  子集构造得到的DFA状态数：{len(accept) - 1}")
+
+    dfa = compilePatterns(args.patterns, args.cache)
+    print(f"最简DFA状态数：{dfa.stateCount - 1}（不含死状态）\n")
+    names = args.patterns if len(args.patterns) > 1 else None
+    print(dfa.format(names))
+
+    if args.dot:
+        with open(args.dot, 'w', encoding='utf-8') as f:
+            f.write(dfa.toDot(names) + "\n")
+        print(f"\n状态转换图已写入 {args.dot}，可用 dot -Tpng {args.dot} -o dfa.png 渲染")
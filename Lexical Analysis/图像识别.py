@@ -1,11 +1,31 @@
 import cv2
 import pytesseract
 import argparse
+import glob
 import os
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-# 在Windows上，可能需要设置Tesseract的路径
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+from lexer import formatTokens, tokenize
+
+# Tesseract的路径：优先使用--tesseract-cmd参数，其次是环境变量TESSERACT_CMD，
+# 都没有时在Windows上使用默认安装位置，其他系统使用PATH中的tesseract
+WINDOWS_TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# 针对代码识别优化的OCR配置
+OCR_CONFIG = r'--oem 3 --psm 6 -l eng -c preserve_interword_spaces=1'
+
+# 批量模式识别的图片扩展名
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+def configure_tesseract(tesseract_cmd=None):
+    """设置pytesseract使用的Tesseract程序路径"""
+    tesseract_cmd = tesseract_cmd or os.environ.get('TESSERACT_CMD')
+    if not tesseract_cmd and os.name == 'nt' and os.path.exists(WINDOWS_TESSERACT_CMD):
+        tesseract_cmd = WINDOWS_TESSERACT_CMD
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
 def preprocess_image(image_path):
     """预处理图像以提高OCR识别率"""
@@ -27,23 +47,29 @@ def preprocess_image(image_path):
     
     return denoised
 
-def recognize_text(image):
+def recognize_text(image, config=OCR_CONFIG):
     """使用Tesseract OCR识别图像中的文本"""
-    # 针对代码识别优化的配置
-    custom_config = r'--oem 3 --psm 6 -l eng -c preserve_interword_spaces=1'
-    
     # 执行OCR识别
-    text = pytesseract.image_to_string(image, config=custom_config)
+    text = pytesseract.image_to_string(image, config=config)
     return text
 
-def save_to_file(text, output_path):
+def save_to_file(text, output_path, verbose=True):
     """将识别结果保存到文件"""
     # 确保输出目录存在
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
     
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(text)
-    print(f"识别结果已保存到: {output_path}")
+    if verbose:
+        print(f"识别结果已保存到: {output_path}")
+
+def analyze_code(code):
+    """用Python词法分析器（lexer.py）直接分析识别出的代码，不需要启动C++程序
+    
+    返回:
+        (种别码, 词素, 行号, 列号) 列表
+    """
+    return list(tokenize(code))
 
 def run_lexer(recognized_code_path, lexer_path):
     """运行C++词法分析器处理识别出的代码"""
@@ -60,11 +86,150 @@ def run_lexer(recognized_code_path, lexer_path):
         print(f"执行词法分析器时出错: {e}")
         return None
 
-def main():
-    # 设置固定的参数
-    image_path = r"D:\test\img\2.png"
-    output_dir = r"D:\test\out"
+def glob_base(pattern):
+    """返回通配符模式中不含通配符的前缀目录，如 scans/**/*.png 为 scans"""
+    base = pattern
+    while glob.escape(base) != base:
+        base = os.path.dirname(base)
+    return base or '.'
+
+def find_images(inputs):
+    """逐个产生 (图片路径, 相对路径主干)，见collect_images"""
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        yield path, os.path.splitext(os.path.relpath(path, pattern))[0]
+        elif os.path.isfile(pattern):
+            yield pattern, os.path.splitext(os.path.basename(pattern))[0]
+        else:
+            base = glob_base(pattern)
+            for path in sorted(glob.iglob(pattern, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield path, os.path.splitext(os.path.relpath(path, base))[0]
+
+def collect_images(inputs):
+    """逐个产生 (图片路径, 输出文件名主干)
+    
+    inputs中的每一项可以是图片文件、目录（递归查找其中的图片）或通配符模式（如 scans/*.png）。
+    目录中的图片保留相对于该目录的子目录结构，通配符模式中的图片保留相对于模式中
+    第一个通配符之前的目录的结构，避免不同子目录中的同名图片互相覆盖。
+    不同输入项仍可能得到相同的主干（如两个目录中都有 1.png），此时后出现的加上 _2、_3 等后缀
+    """
+    seen = set()
+    for path, stem in find_images(inputs):
+        unique = stem
+        suffix = 1
+        while os.path.normcase(unique) in seen:
+            suffix += 1
+            unique = f"{stem}_{suffix}"
+        if unique != stem:
+            print(f"输出文件名重复: {path} 的结果保存为 {unique}.txt")
+        seen.add(os.path.normcase(unique))
+        yield path, unique
+
+def init_ocr_worker(tesseract_cmd):
+    """工作进程初始化：设置Tesseract路径，并让OpenCV在每个进程中只用一个线程，避免多进程时线程数过多"""
+    configure_tesseract(tesseract_cmd)
+    cv2.setNumThreads(1)
+
+def ocr_image(image_path, stem, output_dir, config=OCR_CONFIG, save_debug=False, lex=False):
+    """处理一张图片并把结果写入输出目录，供批量模式的工作进程调用
+    
+    输出文件为 <stem>.txt；lex为真时另写 <stem>.tokens.txt（词法分析结果）；
+    save_debug为真时另存预处理后的图像 <stem>.processed.png
     
+    返回:
+        (图片路径, 输出文件路径, 识别出的字符数, 错误信息)，成功时错误信息为None
+    """
+    try:
+        processed_image = preprocess_image(image_path)
+        if processed_image is None:
+            return image_path, None, 0, "无法读取图像"
+        
+        base = os.path.join(output_dir, stem)
+        os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+        if save_debug:
+            cv2.imwrite(base + ".processed.png", processed_image)
+        
+        text = recognize_text(processed_image, config)
+        save_to_file(text, base + ".txt", verbose=False)
+        if lex:
+            save_to_file(formatTokens(tokenize(text)) + "\n", base + ".tokens.txt", verbose=False)
+        return image_path, base + ".txt", len(text), None
+    except Exception as e:
+        return image_path, None, 0, f"{type(e).__name__}: {e}"
+
+def run_batch(inputs, output_dir, workers=None, tesseract_cmd=None, config=OCR_CONFIG,
+              save_debug=False, lex=False, report_every=100):
+    """批量识别图片：预处理和OCR在进程池中并行执行，每张图片完成后立即写出结果文件
+    
+    在途任务数不超过工作进程数的两倍，图片列表按需读取，成千上万张图片也不会一次全部提交
+    
+    参数:
+        inputs: 图片文件、目录或通配符模式的列表，见collect_images
+        output_dir: 输出目录
+        workers: 工作进程数，None为CPU核数
+        tesseract_cmd: Tesseract程序路径，见configure_tesseract
+        config: Tesseract的配置参数
+        save_debug: 是否保存预处理后的图像
+        lex: 是否同时对识别结果做词法分析
+        report_every: 每完成多少张图片输出一次进度
+        
+    返回:
+        (成功的图片数, 失败的图片数, 用时秒数)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    images = collect_images(inputs)
+    done = failed = 0
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_ocr_worker,
+                             initargs=(tesseract_cmd,)) as pool:
+        pending = set()
+        exhausted = False
+        
+        while True:
+            # 补充在途任务
+            while not exhausted and len(pending) < 2 * workers:
+                item = next(images, None)
+                if item is None:
+                    exhausted = True
+                    break
+                path, stem = item
+                pending.add(pool.submit(ocr_image, path, stem, output_dir, config, save_debug, lex))
+            
+            if not pending:
+                break
+            
+            # 按完成的先后取回结果，慢的图片不会阻塞其他结果的输出
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                image_path, output_path, chars, error = future.result()
+                if error is None:
+                    done += 1
+                else:
+                    failed += 1
+                    print(f"处理失败: {image_path}（{error}）")
+                
+                total = done + failed
+                if report_every and total % report_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"已处理 {total} 张图片，{total / elapsed:.2f} 张/秒")
+    
+    elapsed = time.perf_counter() - start
+    total = done + failed
+    rate = total / elapsed if elapsed else 0.0
+    print(f"完成：成功 {done} 张，失败 {failed} 张，用时 {elapsed:.2f} 秒，{rate:.2f} 张/秒")
+    print(f"识别结果已保存到: {output_dir}")
+    return done, failed, elapsed
+
+def process_image(image_path, output_dir, config=OCR_CONFIG):
+    """处理单张图片：保存预处理图像和识别结果，并输出识别结果和词法分析结果"""
     # 确保输出目录存在
     os.makedirs(output_dir, exist_ok=True)
     
@@ -84,7 +249,7 @@ def main():
     
     # OCR识别
     print("正在进行OCR识别...")
-    recognized_text = recognize_text(processed_image)
+    recognized_text = recognize_text(processed_image, config)
     
     # 显示识别结果
     print("\n--- 识别结果 ---")
@@ -94,16 +259,37 @@ def main():
     # 保存到文件
     save_to_file(recognized_text, output_file)
     
-    # 词法分析器部分保留，但默认不执行
-    # 如果需要执行词法分析，请提供词法分析器路径作为参数
+    # 词法分析：直接在进程内分析识别出的文本，输出格式与C++版相同
+    print("\n正在执行词法分析...")
+    print("\n--- 词法分析结果 ---")
+    print("Token序列是：" + formatTokens(analyze_code(recognized_text)))
+    print("--------------------")
+    
+    # 也可以改用编译好的C++词法分析器
     # lexer_path = r"path_to_your_lexer.exe"
     # if lexer_path and os.path.exists(lexer_path):
-    #     print("\n正在执行词法分析...")
     #     lexer_output = run_lexer(output_file, lexer_path)
-    #     if lexer_output:
-    #         print("\n--- 词法分析结果 ---")
-    #         print(lexer_output)
-    #         print("--------------------")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="识别代码截图中的文本并进行词法分析")
+    arg_parser.add_argument("inputs", nargs="+",
+                            help="图片文件、目录或通配符模式（如 \"scans/**/*.png\"）；只给一个图片文件时输出识别过程")
+    arg_parser.add_argument("-o", "--output", default="out", help="输出目录，默认为 out")
+    arg_parser.add_argument("--batch", action="store_true", help="即使只有一个图片文件也使用批量模式")
+    arg_parser.add_argument("--workers", type=int, default=None, help="批量模式的工作进程数，默认为CPU核数")
+    arg_parser.add_argument("--tesseract-cmd", default=None,
+                            help="Tesseract程序路径，默认取环境变量TESSERACT_CMD，Windows上为默认安装位置")
+    arg_parser.add_argument("--ocr-config", default=OCR_CONFIG, help=f"Tesseract配置参数，默认为 {OCR_CONFIG}")
+    arg_parser.add_argument("--debug-images", action="store_true", help="批量模式中同时保存预处理后的图像")
+    arg_parser.add_argument("--lex", action="store_true", help="批量模式中同时把词法分析结果写入 <名称>.tokens.txt")
+    args = arg_parser.parse_args()
+    
+    configure_tesseract(args.tesseract_cmd)
+    if len(args.inputs) == 1 and os.path.isfile(args.inputs[0]) and not args.batch:
+        process_image(args.inputs[0], args.output, args.ocr_config)
+    else:
+        run_batch(args.inputs, args.output, args.workers, args.tesseract_cmd, args.ocr_config,
+                  args.debug_images, args.lex)
 
 if __name__ == "__main__":
     main()